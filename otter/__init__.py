@@ -1,9 +1,36 @@
 """Otter's Python API"""
 
-from . import api
-from .check import logs
-from .check.notebook import Notebook
+import importlib
+
+from typing import Any
+
 from .version import __version__
 
 
 __all__ = ["api", "logs", "Notebook", "__version__"]
+
+
+# the API is imported lazily so that importing Otter (e.g. in a student's notebook) doesn't load
+# dependencies that aren't needed
+_LAZY_ATTRIBUTES = {
+    "api": (".api", None),
+    "logs": (".check.logs", None),
+    "Notebook": (".check.notebook", "Notebook"),
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    module_name, attr = _LAZY_ATTRIBUTES[name]
+    value = importlib.import_module(module_name, __name__)
+    if attr is not None:
+        value = getattr(value, attr)
+
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -1,15 +1,24 @@
 """A programmatic API for using Otter-Grader"""
 
-__all__ = ["export_notebook", "grade_submission"]
+__all__ = ["export_notebook", "grade_submission", "grade_submissions"]
 
+import dill
+import json
 import os
+import shutil
+import tempfile
+import zipfile
 
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
 from contextlib import nullcontext, redirect_stdout
 from typing import Optional
 
 from .export import export_notebook
 from .run import main as run_grader
 from .test_files import GradingResults
+from .utils import OTTER_CONFIG_FILENAME
 
 
 def grade_submission(
@@ -33,7 +42,8 @@ def grade_submission(
 
     Args:
         submission_path (``str``): path to submission file
-        ag_path (``str``): path to autograder zip file
+        ag_path (``str``): path to autograder zip file or to a directory containing its extracted
+            contents
         quiet (``bool``): whether to suppress print statements during grading; default
             ``False``
         debug (``bool``): whether to run the submission in debug mode (without ignoring
@@ -65,3 +75,149 @@ def grade_submission(
         f.close()
 
     return results
+
+
+def _init_worker(ag_dir: str):
+    """
+    Initialize a worker process of ``grade_submissions``.
+
+    For R assignments, the embedded R session is started and ottr and the other R packages used for
+    grading are loaded, so that the worker's R session is reused for every submission it grades
+    instead of paying for R's startup and package loading on each one.
+
+    Args:
+        ag_dir (``str``): path to the directory containing the extracted autograder zip file
+    """
+    config_path = os.path.join(ag_dir, OTTER_CONFIG_FILENAME)
+    if not os.path.isfile(config_path):
+        return
+
+    with open(config_path) as f:
+        lang = json.load(f).get("lang", "python")
+
+    if lang == "r":
+        from .run.run_autograder.runners.r_session import start_session
+
+        start_session()
+
+
+def _grade_submission_in_worker(
+    submission_path: str, ag_dir: str, quiet: bool, debug: bool
+) -> bytes:
+    """
+    Grade a submission in a worker process of ``grade_submissions``.
+
+    The results are returned pickled with dill because they may contain objects (e.g. the functions
+    of exception-based test cases) that can't be pickled by ``multiprocessing``.
+
+    Args:
+        submission_path (``str``): path to submission file
+        ag_dir (``str``): path to the directory containing the extracted autograder zip file
+        quiet (``bool``): whether to suppress print statements during grading
+        debug (``bool``): whether to run the submission in debug mode
+
+    Returns:
+        ``bytes``: the pickled results
+    """
+    return dill.dumps(grade_submission(submission_path, ag_dir, quiet=quiet, debug=debug))
+
+
+def grade_submissions(
+    submission_paths: Iterable[str],
+    ag_path: str = "autograder.zip",
+    *,
+    workers: Optional[int] = None,
+    ordered: bool = False,
+    max_pending: Optional[int] = None,
+    quiet: bool = False,
+    debug: bool = False,
+) -> Iterator[tuple[str, GradingResults]]:
+    """
+    Runs non-containerized grading on multiple submissions concurrently, yielding the results of
+    each submission as a tuple of its path and its ``GradingResults``.
+
+    The autograder zip file is extracted once, and each submission is graded with
+    ``grade_submission`` in a pool of ``workers`` processes. For R assignments, each worker keeps a
+    persistent R session with ottr loaded, which is reset after each submission. If ``ordered`` is
+    true, results are yielded in the order of ``submission_paths``; otherwise, they are yielded as
+    soon as grading completes. At most ``max_pending`` submissions (which defaults to twice the
+    number of workers) are queued or being graded at once, so ``submission_paths`` can be a lazy
+    iterable of any length.
+
+    If grading a submission raises an error, the error is captured in the results for that
+    submission (see ``otter.test_files.GradingResults.without_results``) and grading continues.
+
+    As with ``grade_submission``, environment setup files are not run, so any requirements should
+    be available in the environment being used for grading.
+
+    Args:
+        submission_paths (``Iterable[str]``): paths to submission files
+        ag_path (``str``): path to autograder zip file
+        workers (``int | None``): the number of worker processes; defaults to the number of CPUs
+        ordered (``bool``): whether to yield results in the order of ``submission_paths``
+        max_pending (``int | None``): the maximum number of submissions being graded or waiting
+            to be graded at once
+        quiet (``bool``): whether to suppress print statements during grading; default
+            ``False``
+        debug (``bool``): whether to run the submissions in debug mode (without ignoring
+            errors)
+
+    Returns:
+        ``Iterator[tuple[str, otter.test_files.GradingResults]]``: an iterator over the path and
+            results of each submission
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if max_pending is None:
+        max_pending = 2 * workers
+    if workers < 1 or max_pending < 1:
+        raise ValueError("workers and max_pending must be positive")
+
+    ag_dir = tempfile.mkdtemp()
+    executor = None
+    try:
+        ag_zip = zipfile.ZipFile(ag_path)
+        ag_zip.extractall(ag_dir)
+        ag_zip.close()
+
+        executor = ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(ag_dir,)
+        )
+        pending: deque[tuple[str, Future[bytes]]] = deque()
+        paths = iter(submission_paths)
+
+        def submit_next() -> bool:
+            path = next(paths, None)
+            if path is None:
+                return False
+            future = executor.submit(_grade_submission_in_worker, path, ag_dir, quiet, debug)
+            pending.append((path, future))
+            return True
+
+        def get_results(path: str, future: Future[bytes]) -> tuple[str, GradingResults]:
+            try:
+                return path, dill.loads(future.result())
+            except Exception as e:
+                return path, GradingResults.without_results(e)
+
+        while len(pending) < max_pending and submit_next():
+            pass
+
+        while pending:
+            if ordered:
+                path, future = pending.popleft()
+
+            else:
+                wait([f for _, f in pending], return_when=FIRST_COMPLETED)
+                path, future = next((p, f) for p, f in pending if f.done())
+                pending.remove((path, future))
+
+            # queue the next submission before yielding so that the workers stay busy while the
+            # caller handles these results
+            submit_next()
+            yield get_results(path, future)
+
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+        shutil.rmtree(ag_dir)
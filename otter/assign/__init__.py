@@ -4,10 +4,13 @@ import os
 import pathlib
 import warnings
 
-from typing import Optional
+from typing import Literal, Optional
 
 from .assignment import Assignment
-from .output import write_output_directories
+from .batch import assign_many, AssignResult, format_results, read_batch_file
+from .manifest import BuildManifest, get_pdf_key, get_tests_key
+from .output import read_master_notebook, write_output_directories
+from .tasks import TaskGraph
 from .utils import run_generate_autograder, run_tests, write_otter_config_file
 from .. import logging
 from ..export import export_notebook
@@ -15,13 +18,85 @@ from ..plugins import PluginCollection
 from ..utils import chdir, get_relpath, knit_rmd_file, qmd_to_pdf
 
 
-__all__ = ["Assignment", "main"]
+__all__ = ["Assignment", "AssignResult", "assign_many", "assign_notebook", "main"]
 
 
 LOGGER = logging.get_logger(__name__)
 
 
 def main(
+    master: Optional[str] = None,
+    result: Optional[str] = None,
+    *,
+    no_pdfs: bool = False,
+    no_run_tests: bool = False,
+    username: Optional[str] = None,
+    password: Optional[str] = None,
+    debug: Optional[str] = False,
+    no_cache: bool = False,
+    batch: Optional[str] = None,
+    jobs: Optional[int] = None,
+):
+    """
+    Runs Otter Assign on a master notebook, or on each master notebook listed in a batch file.
+
+    If ``batch`` is provided, the master notebooks and result directories listed in it (see
+    ``otter.assign.batch.read_batch_file``) are processed concurrently with ``assign_many``, and
+    the summary of each assignment is printed followed by a table of the outcomes of all of them;
+    an error is raised after all of the assignments have been processed if any of them failed.
+
+    Args:
+        master (``str | None``): path to master notebook; required unless ``batch`` is provided
+        result (``str | None``): path to result directory; required unless ``batch`` is provided
+        no_pdfs (``bool``): whether to ignore any configurations indicating PDF generation for this run
+        no_run_tests (``bool``): prevents Otter tests from being automatically run on the solutions
+            notebook
+        username (``str | None``): a username for Gradescope for generating a token
+        password (``str | None``): a password for Gradescope for generating a token
+        debug (``bool``): whether to run in debug mode (without ignoring errors during testing)
+        no_cache (``bool``): whether to ignore the build manifest and rerun every stage
+        batch (``str | None``): path to a batch file listing master notebooks and result
+            directories
+        jobs (``int | None``): the number of assignments in the batch file to process concurrently;
+            defaults to the number of CPUs
+
+    Raises:
+        ``ValueError``: if both or neither of ``batch`` and ``master`` and ``result`` are provided
+        ``RuntimeError``: if any of the assignments in the batch file failed
+    """
+    kwargs = dict(
+        no_pdfs=no_pdfs,
+        no_run_tests=no_run_tests,
+        username=username,
+        password=password,
+        debug=debug,
+        no_cache=no_cache,
+    )
+
+    if batch is None:
+        if master is None or result is None:
+            raise ValueError("A master notebook and result directory must be provided")
+
+        assign_notebook(master, result, **kwargs)
+        return
+
+    if master is not None or result is not None:
+        raise ValueError("A master notebook and result directory can't be used with a batch file")
+
+    results = assign_many(read_batch_file(batch), jobs=jobs, **kwargs)
+
+    for res in results:
+        if res.summary is not None:
+            print(f"{res.master}:\n{res.summary}\n")
+
+    print(format_results(results))
+
+    failed = sum(not r.ok for r in results)
+    if failed:
+        raise RuntimeError(f"{failed} of {len(results)} assignments failed")
+
+
+def assign_notebook(
     master: str,
     result: str,
     *,
@@ -30,10 +105,18 @@ def main(
     username: Optional[str] = None,
     password: Optional[str] = None,
     debug: Optional[str] = False,
-):
+    no_cache: bool = False,
+) -> AssignResult:
     """
     Runs Otter Assign on a master notebook.
 
+    Unless ``no_cache`` is true, a build manifest recording the inputs to the expensive stages of
+    the run is kept between runs on the same master notebook and result directory (see
+    ``otter.assign.manifest.BuildManifest``). PDFs aren't exported again if the cells they contain
+    haven't changed and the tests aren't run again if neither the tests nor the solution code have
+    changed since the last successful run. The output directories and the autograder zip file are
+    always deleted and written again.
+
     Args:
         master (``str``): path to master notebook
         result (``str``): path to result directory
@@ -43,6 +126,10 @@ def main(
         username (``str | None``): a username for Gradescope for generating a token
         password (``str | None``): a password for Gradescope for generating a token
         debug (``bool``): whether to run in debug mode (without ignoring errors during testing)
+        no_cache (``bool``): whether to ignore the build manifest and rerun every stage
+
+    Returns:
+        ``otter.assign.batch.AssignResult``: the outcome of the run
     """
     LOGGER.debug(f"User-specified master path: {master}")
     LOGGER.debug(f"User-specified result path: {result}")
@@ -63,6 +150,11 @@ def main(
         if not assignment.suppress_no_tests_warning and not any_tests:
             LOGGER.warning("No autograded tests were found in the assignment")
 
+        manifest = None
+        if not no_cache:
+            manifest = BuildManifest(assignment.master, assignment.result)
+            manifest.update_cells(read_master_notebook(assignment))
+
         # update seed variables
         if assignment.seed.variable:
             LOGGER.debug("Processing seed dict")
@@ -85,69 +177,80 @@ def main(
             LOGGER.debug("Adding plugin configurations to Otter Generate configuration")
             assignment.generate.plugins = assignment.generate.plugins + plugins
 
-        if assignment.generate_enabled:
-            LOGGER.info("Generating autograder zipfile")
-            run_generate_autograder(assignment, username, password, plugin_collection=pc)
+        # compute the key for running the tests before Otter Generate removes the temporary tests
+        # directory
+        tests_key = None
+        if manifest is not None:
+            tests_key = get_tests_key(assignment)
 
-        # generate PDF of solutions
-        if assignment.solutions_pdf and not no_pdfs:
-            LOGGER.info("Generating solutions PDF")
-            filtering = assignment.solutions_pdf == "filtered"
-
-            src = os.path.abspath(str(assignment.get_ag_path(assignment.master.name)))
-            dst = os.path.abspath(str(assignment.get_ag_path(assignment.master.stem + "-sol.pdf")))
-
-            if not assignment.is_rmd:
-                LOGGER.debug(f"Exporting {src} as notebook to {dst}")
-                LOGGER.debug("Attempting PDF via HTML export")
-                export_notebook(
-                    src,
-                    dest=dst,
-                    filtering=filtering,
-                    pagebreaks=filtering,
-                    exporter_type="html",
+        if assignment.is_rmd and not no_pdfs:
+            if assignment.solutions_pdf == "filtered":
+                raise ValueError(
+                    "Filtering is not supported with "
+                    + ("Quarto" if assignment.is_quarto else "RMarkdown")
+                    + " assignments"
+                )
+            if assignment.template_pdf:
+                raise ValueError(
+                    f"Filtering is not supported with RMarkdown assignments; use "
+                    + "solutions_pdf to generate a Gradescope template instead."
                 )
-                LOGGER.debug("PDF via HTML export successful")
 
-            elif assignment.is_quarto:
-                LOGGER.debug(f"Exporting {src} to {dst}")
-                if filtering:
-                    raise ValueError("Filtering is not supported with Quarto assignments")
+        outcome = AssignResult(master, result, summary=assignment.summary)
 
-                qmd_to_pdf(src, dst)
+        def generate_stage():
+            LOGGER.info("Generating autograder zipfile")
+            run_generate_autograder(assignment, username, password, plugin_collection=pc)
 
-            else:
-                LOGGER.debug(f"Knitting {src} to {dst}")
-                if filtering:
-                    raise ValueError("Filtering is not supported with RMarkdown assignments")
+        # Otter Generate and Otter Run change the working directory of the process, so the PDFs
+        # are exported after the autograder zip file is generated and while the tests are run in a
+        # separate process; R is run in-process and isn't thread-safe, so R assignments are
+        # processed one stage at a time
+        graph = TaskGraph(max_workers=1 if assignment.is_r or assignment.is_rmd else 4)
+        after_generate = ()
+        if assignment.generate_enabled:
+            graph.add("generate", generate_stage)
+            after_generate = ("generate",)
+
+        # resolve the paths used by the PDF stages before any stages run
+        src = os.path.abspath(str(assignment.get_ag_path(assignment.master.name)))
+        sol_dst = os.path.abspath(str(assignment.get_ag_path(assignment.master.stem + "-sol.pdf")))
+        template_dst = os.path.abspath(
+            str(assignment.get_ag_path(assignment.master.stem + "-template.pdf"))
+        )
 
-                knit_rmd_file(src, dst)
+        if assignment.solutions_pdf and not no_pdfs:
+            graph.add(
+                "solutions_pdf",
+                lambda: _export_solutions_pdf(assignment, src, sol_dst, manifest),
+                depends_on=after_generate,
+            )
 
-        # generate a tempalte PDF for Gradescope
         if assignment.template_pdf and not no_pdfs:
-            LOGGER.info("Generating template PDF")
+            graph.add(
+                "template_pdf",
+                lambda: _export_template_pdf(assignment, src, template_dst, manifest),
+                depends_on=after_generate,
+            )
 
-            src = os.path.abspath(str(assignment.get_ag_path(assignment.master.name)))
-            dst = os.path.abspath(
-                str(assignment.get_ag_path(assignment.master.stem + "-template.pdf"))
+        if assignment.run_tests and not no_run_tests and any_tests:
+            # the tests only need to be run in a separate process if PDFs are being exported
+            in_subprocess = graph.max_workers > 1 and bool(
+                not no_pdfs and (assignment.solutions_pdf or assignment.template_pdf)
             )
 
-            if not assignment.is_rmd:
-                LOGGER.debug("Attempting PDF via LaTeX export")
-                export_notebook(
-                    src,
-                    dest=dst,
-                    filtering=True,
-                    pagebreaks=True,
-                    exporter_type="latex",
+            def run_tests_stage():
+                outcome.tests = _run_tests(
+                    assignment, manifest, tests_key, debug, in_subprocess=in_subprocess
                 )
-                LOGGER.debug("PDF via LaTeX export successful")
 
-            else:
-                raise ValueError(
-                    f"Filtering is not supported with RMarkdown assignments; use "
-                    + "solutions_pdf to generate a Gradescope template instead."
-                )
+            graph.add("run_tests", run_tests_stage, depends_on=after_generate)
+
+        else:
+            LOGGER.info("Skipping tests")
+
+        graph.run()
+        outcome.stage_durations = graph.durations
 
         # generate the .otter file if needed
         if not assignment.is_rmd and assignment.save_environment:
@@ -160,13 +263,130 @@ def main(
             else:
                 write_otter_config_file(assignment)
 
-        # run tests on autograder notebook
-        if assignment.run_tests and not no_run_tests and any_tests:
-            LOGGER.info("Running tests against the solutions notebook")
+    return outcome
 
-            run_tests(assignment, debug=debug)
 
-            LOGGER.info("All autograder tests passed.")
+def _export_solutions_pdf(
+    assignment: Assignment, src: str, dst: str, manifest: Optional[BuildManifest]
+):
+    """
+    Export the solutions PDF, reusing the PDF from the last run if the exported cells haven't
+    changed.
 
-        else:
-            LOGGER.info("Skipping tests")
+    Args:
+        assignment (``otter.assign.assignment.Assignment``): the assignment config
+        src (``str``): the absolute path to the autograder notebook
+        dst (``str``): the absolute path at which to write the PDF
+        manifest (``otter.assign.manifest.BuildManifest | None``): the build manifest, if any
+    """
+    filtering = assignment.solutions_pdf == "filtered"
+
+    pdf_key = None
+    if manifest is not None:
+        pdf_key = get_pdf_key(assignment, src, "html", filtering=filtering, pagebreaks=filtering)
+        if manifest.is_current("solutions_pdf", pdf_key, dst):
+            LOGGER.info("Reusing solutions PDF because the exported cells haven't changed")
+            return
+
+    LOGGER.info("Generating solutions PDF")
+
+    if not assignment.is_rmd:
+        LOGGER.debug(f"Exporting {src} as notebook to {dst}")
+        LOGGER.debug("Attempting PDF via HTML export")
+        export_notebook(
+            src,
+            dest=dst,
+            filtering=filtering,
+            pagebreaks=filtering,
+            exporter_type="html",
+        )
+        LOGGER.debug("PDF via HTML export successful")
+
+    elif assignment.is_quarto:
+        LOGGER.debug(f"Exporting {src} to {dst}")
+        qmd_to_pdf(src, dst)
+
+    else:
+        LOGGER.debug(f"Knitting {src} to {dst}")
+        knit_rmd_file(src, dst)
+
+    if manifest is not None:
+        manifest.record("solutions_pdf", pdf_key, dst)
+
+
+def _export_template_pdf(
+    assignment: Assignment, src: str, dst: str, manifest: Optional[BuildManifest]
+):
+    """
+    Export the Gradescope template PDF, reusing the PDF from the last run if the exported cells
+    haven't changed.
+
+    Args:
+        assignment (``otter.assign.assignment.Assignment``): the assignment config
+        src (``str``): the absolute path to the autograder notebook
+        dst (``str``): the absolute path at which to write the PDF
+        manifest (``otter.assign.manifest.BuildManifest | None``): the build manifest, if any
+    """
+
+    pdf_key = None
+    if manifest is not None:
+        pdf_key = get_pdf_key(assignment, src, "latex", filtering=True, pagebreaks=True)
+        if manifest.is_current("template_pdf", pdf_key, dst):
+            LOGGER.info("Reusing template PDF because the exported cells haven't changed")
+            return
+
+    LOGGER.info("Generating template PDF")
+    LOGGER.debug("Attempting PDF via LaTeX export")
+    export_notebook(
+        src,
+        dest=dst,
+        filtering=True,
+        pagebreaks=True,
+        exporter_type="latex",
+    )
+    LOGGER.debug("PDF via LaTeX export successful")
+
+    if manifest is not None:
+        manifest.record("template_pdf", pdf_key, dst)
+
+
+def _run_tests(
+    assignment: Assignment,
+    manifest: Optional[BuildManifest],
+    tests_key: Optional[str],
+    debug: bool,
+    in_subprocess: bool = False,
+) -> Literal["passed", "unchanged"]:
+    """
+    Run the tests against the autograder notebook, unless they passed in the last run and their
+    inputs haven't changed.
+
+    Args:
+        assignment (``otter.assign.assignment.Assignment``): the assignment config
+        manifest (``otter.assign.manifest.BuildManifest | None``): the build manifest, if any
+        tests_key (``str | None``): the key for running the tests in the build manifest
+        debug (``bool``): whether to run in debug mode (without ignoring errors during testing)
+        in_subprocess (``bool``): whether to run the tests in a separate process
+
+    Returns:
+        ``str``: ``"unchanged"`` if the tests were skipped or ``"passed"`` otherwise
+
+    Raises:
+        ``otter.assign.utils.AutograderTestsFailedException``: if the tests fail
+    """
+    if manifest is not None and manifest.is_current("run_tests", tests_key):
+        LOGGER.info(
+            "Skipping tests because the tests and solutions haven't changed since they last passed"
+        )
+        return "unchanged"
+
+    LOGGER.info("Running tests against the solutions notebook")
+
+    run_tests(assignment, debug=debug, in_subprocess=in_subprocess)
+
+    LOGGER.info("All autograder tests passed.")
+
+    if manifest is not None:
+        manifest.record("run_tests", tests_key)
+
+    return "passed"
@@ -259,6 +259,9 @@ class Assignment(fica.Config, Loggable):
     generate_tests_dir: Optional[str] = None
     """the path to a directory of test files for Otter Generate"""
 
+    summary: Optional[str] = None
+    """a summary of the assignment's questions and their point values"""
+
     _ag_zip_name: Optional[str] = None
     """
     the file name for the autograder zip file; this value is generated the first time it is accessed
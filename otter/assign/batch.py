@@ -0,0 +1,195 @@
+"""Running Otter Assign on many master notebooks concurrently"""
+
+import os
+import time
+import yaml
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Literal, Optional
+
+from .utils import AutograderTestsFailedException
+from .. import logging
+
+
+LOGGER = logging.get_logger(__name__)
+
+
+@dataclass
+class AssignResult:
+    """
+    The outcome of running Otter Assign on a master notebook.
+    """
+
+    master: str
+    """the path to the master notebook"""
+
+    result: str
+    """the path to the result directory"""
+
+    tests: Literal["passed", "unchanged", "failed", "not run"] = "not run"
+    """
+    the outcome of running the tests against the autograder notebook; ``"unchanged"`` indicates
+    that the tests were skipped because they passed in the last run and their inputs haven't changed
+    """
+
+    summary: Optional[str] = None
+    """the summary of the assignment's questions, if the output directories were written"""
+
+    error: Optional[str] = None
+    """the error that caused Otter Assign to fail, if any"""
+
+    duration: float = 0
+    """the time it took to run Otter Assign, in seconds"""
+
+    stage_durations: dict[str, float] = field(default_factory=dict)
+    """the time it took to run each stage of Otter Assign, in seconds"""
+
+    @property
+    def ok(self) -> bool:
+        """whether Otter Assign succeeded"""
+        return self.error is None
+
+
+def read_batch_file(path: str) -> list[tuple[str, str]]:
+    """
+    Read a batch file listing master notebooks and their result directories.
+
+    A batch file is a YAML file containing a list of mappings with ``master`` and ``result`` keys;
+    relative paths are interpreted relative to the directory containing the batch file:
+
+    .. code-block:: yaml
+
+        - master: hw01/hw01.ipynb
+          result: hw01/dist
+        - master: hw02/hw02.ipynb
+          result: hw02/dist
+
+    Args:
+        path (``str``): the path to the batch file
+
+    Returns:
+        ``list[tuple[str, str]]``: the paths to the master notebooks and their result directories
+
+    Raises:
+        ``ValueError``: if the batch file is malformed
+    """
+    with open(path) as f:
+        entries = yaml.safe_load(f)
+
+    if not isinstance(entries, list) or not all(
+        isinstance(e, dict) and {"master", "result"} <= e.keys() for e in entries
+    ):
+        raise ValueError(f"{path} must contain a list of mappings with 'master' and 'result' keys")
+
+    base_dir = os.path.dirname(os.path.abspath(path))
+    return [
+        (os.path.join(base_dir, str(e["master"])), os.path.join(base_dir, str(e["result"])))
+        for e in entries
+    ]
+
+
+def _assign_in_worker(master: str, result: str, kwargs: dict[str, Any]) -> AssignResult:
+    """
+    Run Otter Assign on a master notebook in a worker process of ``assign_many``, capturing any
+    errors in the returned result.
+
+    Args:
+        master (``str``): the path to the master notebook
+        result (``str``): the path to the result directory
+        kwargs (``dict[str, object]``): keyword arguments for ``otter.assign.assign_notebook``
+
+    Returns:
+        ``AssignResult``: the outcome
+    """
+    from . import assign_notebook
+
+    start = time.perf_counter()
+    try:
+        res = assign_notebook(master, result, **kwargs)
+
+    except Exception as e:
+        LOGGER.debug(f"Otter Assign failed on {master}", exc_info=True)
+        tests = "failed" if isinstance(e, AutograderTestsFailedException) else "not run"
+        res = AssignResult(master, result, tests=tests, error=f"{type(e).__name__}: {e}")
+
+    res.duration = time.perf_counter() - start
+    return res
+
+
+def assign_many(
+    assignments: list[tuple[str, str]], *, jobs: Optional[int] = None, **kwargs: Any
+) -> list[AssignResult]:
+    """
+    Run Otter Assign on many master notebooks concurrently.
+
+    Each master notebook is processed by ``otter.assign.assign_notebook`` in a pool of ``jobs``
+    processes, so that each one has its own working directory. Errors are captured in the results
+    instead of being raised, so that one failing assignment doesn't stop the others.
+
+    Args:
+        assignments (``list[tuple[str, str]]``): the paths to the master notebooks and their result
+            directories
+        jobs (``int | None``): the number of assignments to process concurrently; defaults to the
+            number of CPUs
+        **kwargs: keyword arguments passed to ``otter.assign.assign_notebook``
+
+    Returns:
+        ``list[AssignResult]``: the outcome of each assignment, in the order of ``assignments``
+
+    Raises:
+        ``ValueError``: if more than one assignment would be written to the same result directory
+    """
+    results = [os.path.abspath(r) for _, r in assignments]
+    if len(set(results)) != len(results):
+        raise ValueError("Multiple assignments would be written to the same result directory")
+
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    if jobs < 1:
+        raise ValueError("jobs must be positive")
+
+    with ProcessPoolExecutor(
+        max_workers=min(jobs, max(len(assignments), 1)),
+        initializer=logging.set_level,
+        initargs=(logging.get_level(),),
+    ) as executor:
+        futures = [
+            executor.submit(_assign_in_worker, master, result, kwargs)
+            for master, result in assignments
+        ]
+
+        outcomes = []
+        for (master, result), future in zip(assignments, futures):
+            try:
+                outcomes.append(future.result())
+            except Exception as e:
+                # the worker process died
+                outcomes.append(AssignResult(master, result, error=f"{type(e).__name__}: {e}"))
+
+    return outcomes
+
+
+def format_results(results: list[AssignResult]) -> str:
+    """
+    Format the outcomes of running Otter Assign on many master notebooks as a table.
+
+    Args:
+        results (``list[AssignResult]``): the outcomes
+
+    Returns:
+        ``str``: the table
+    """
+    import pandas as pd
+
+    rows = [
+        {
+            "master": os.path.relpath(r.master),
+            "tests": r.tests,
+            "status": "ok" if r.ok else "failed",
+            "time (s)": round(r.duration, 1),
+            "error": (r.error or "").split("\n")[0],
+        }
+        for r in results
+    ]
+    return pd.DataFrame(rows).to_string(index=False)
@@ -0,0 +1,293 @@
+"""Build manifests for incremental Otter Assign runs"""
+
+import hashlib
+import json
+import nbformat as nbf
+import os
+import shutil
+import threading
+
+from typing import Any, Optional, TYPE_CHECKING, Union
+
+from .. import logging
+from ..utils import get_cache_dir, write_file_atomically
+from ..version import __version__
+
+
+LOGGER = logging.get_logger(__name__)
+
+ASSIGN_CACHE_NAME = "assign"
+"""the name of the cache in which build manifests and the artifacts they record are stored"""
+
+MANIFEST_FILENAME = "manifest.json"
+
+
+def hash_data(data: Any) -> str:
+    """
+    Compute the SHA-256 hash of a JSON-serializable object.
+
+    Args:
+        data (``object``): the object to hash; values that can't be serialized are hashed using
+            their ``repr``
+
+    Returns:
+        ``str``: the hex digest of the hash
+    """
+    encoded = json.dumps(data, sort_keys=True, default=repr).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def hash_path(path: Union[str, os.PathLike]) -> Optional[str]:
+    """
+    Compute the SHA-256 hash of the contents of a file or, recursively, a directory.
+
+    Args:
+        path (``str | os.PathLike``): the path to the file or directory
+
+    Returns:
+        ``str | None``: the hex digest of the hash, or ``None`` if the path doesn't exist
+    """
+    if os.path.isdir(path):
+        contents = {}
+        for dirpath, _, filenames in os.walk(path):
+            for filename in filenames:
+                file_path = os.path.join(dirpath, filename)
+                contents[os.path.relpath(file_path, path)] = hash_path(file_path)
+        return hash_data(contents)
+
+    if not os.path.isfile(path):
+        return None
+
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def hash_cell(cell: nbf.NotebookNode) -> str:
+    """
+    Compute the hash of a notebook cell, ignoring its ID and execution timing metadata.
+
+    Args:
+        cell (``nbformat.NotebookNode``): the cell
+
+    Returns:
+        ``str``: the hex digest of the hash
+    """
+    cell = {k: v for k, v in cell.items() if k != "id"}
+    cell["metadata"] = {k: v for k, v in cell.get("metadata", {}).items() if k != "execution"}
+    return hash_data(cell)
+
+
+def get_pdf_key(
+    assignment: "Assignment", src: str, exporter_type: Optional[str] = None, **options: Any
+) -> str:
+    """
+    Compute the key for exporting a PDF of the notebook at ``src``.
+
+    For notebooks, the key is the exporter's PDF cache key, which only depends on the cells that
+    are exported (after filtering), the local files they reference, and the exporter's options.
+    For RMarkdown and Quarto documents, the key is a hash of the entire document.
+
+    Args:
+        assignment (``otter.assign.assignment.Assignment``): the assignment config
+        src (``str``): the path to the notebook or document being exported
+        exporter_type (``str | None``): the type of exporter used to export notebooks
+        **options: the options passed to the exporter
+
+    Returns:
+        ``str``: the key
+    """
+    if assignment.is_rmd:
+        return hash_data({"document": hash_path(src), "options": options, "otter": __version__})
+
+    from ..export.exporters import get_exporter
+
+    Exporter = get_exporter(exporter_type)
+    options = {**Exporter.default_options, **options}
+    nb = Exporter.load_notebook(
+        src, filtering=options["filtering"], pagebreaks=options["pagebreaks"]
+    )
+    return Exporter.get_cache_key(nb, options, os.path.dirname(os.path.abspath(src)))
+
+
+def get_tests_key(assignment: "Assignment") -> str:
+    """
+    Compute the key for running the tests against the autograder notebook.
+
+    The key depends on the code cells and metadata (which may contain the tests) of the autograder
+    notebook, the test files, the contents of the autograder directory other than PDFs and zip
+    files, the autograder configuration, and the autograder-only support files, so changes to
+    Markdown cells don't cause the tests to be run again. This function should be called after the
+    output directories are written and before Otter Generate is run.
+
+    Args:
+        assignment (``otter.assign.assignment.Assignment``): the assignment config
+
+    Returns:
+        ``str``: the key
+    """
+    nb_path = str(assignment.ag_notebook_path)
+    if assignment.is_rmd:
+        notebook = hash_path(nb_path)
+    else:
+        nb = nbf.read(nb_path, as_version=nbf.NO_CONVERT)
+        notebook = {
+            "code": [c.source for c in nb.cells if c.cell_type == "code"],
+            "metadata": nb.metadata,
+        }
+
+    ag_dir = str(assignment.get_ag_path())
+    outputs = {}
+    for name in sorted(os.listdir(ag_dir)):
+        if name != assignment.notebook_basename and os.path.splitext(name)[1] not in {
+            ".pdf",
+            ".zip",
+        }:
+            outputs[name] = hash_path(os.path.join(ag_dir, name))
+
+    return hash_data(
+        {
+            "notebook": notebook,
+            "outputs": outputs,
+            "tests": hash_path(assignment.generate_tests_dir or ""),
+            "config": assignment.get_otter_config() if assignment.generate_enabled else None,
+            "autograder_files": {f: hash_path(f) for f in assignment.autograder_files},
+            "otter": __version__,
+        }
+    )
+
+
+class BuildManifest:
+    """
+    A record of the stages of the last Otter Assign run on a master notebook that produced
+    expensive outputs (like PDFs) or checked the outputs (like running the tests), keyed by a hash
+    of the inputs each stage depends on.
+
+    Each stage's key is computed by the caller from the content hashes of the inputs to that stage
+    (the master notebook's cells, tests, configurations, and support files). If a stage's key is the
+    same as the one recorded by the last run, the stage can be skipped and its output, if any,
+    restored from the copy stored alongside the manifest.
+
+    Manifests are stored in a subdirectory of ``cache_dir`` keyed by the paths to the master
+    notebook and the result directory, so that the output directories don't contain any extra
+    files. Manifests written by a different version of Otter are ignored.
+
+    Args:
+        master (``str | os.PathLike``): the path to the master notebook
+        result (``str | os.PathLike``): the path to the result directory
+        cache_dir (``str | None``): the directory in which to store manifests; defaults to the
+            per-user ``assign`` cache directory (see ``otter.utils.get_cache_dir``)
+    """
+
+    path: str
+    """the directory containing the manifest and its artifacts"""
+
+    cells: list[str]
+    """the hashes of the cells of the master notebook in the last run"""
+
+    stages: dict[str, str]
+    """the keys of the stages completed by the last run"""
+
+    _lock: threading.Lock
+    """a lock that allows stages to be recorded from multiple threads"""
+
+    def __init__(
+        self,
+        master: Union[str, os.PathLike],
+        result: Union[str, os.PathLike],
+        cache_dir: Optional[str] = None,
+    ):
+        name = hash_data([os.path.abspath(master), os.path.abspath(result)])[:16]
+        self.path = os.path.join(cache_dir or get_cache_dir(ASSIGN_CACHE_NAME), name)
+        self.cells, self.stages = [], {}
+        self._lock = threading.Lock()
+
+        try:
+            with open(os.path.join(self.path, MANIFEST_FILENAME)) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        if manifest.get("version") != __version__:
+            LOGGER.debug("Ignoring build manifest from a different version of Otter")
+            return
+
+        self.cells, self.stages = manifest["cells"], manifest["stages"]
+
+    def update_cells(self, nb: nbf.NotebookNode):
+        """
+        Record the hashes of the cells of the master notebook, logging which cells have changed
+        since the last run.
+
+        Args:
+            nb (``nbformat.NotebookNode``): the master notebook
+        """
+        cells = [hash_cell(c) for c in nb.cells]
+        if self.cells:
+            previous = set(self.cells)
+            changed = [i + 1 for i, h in enumerate(cells) if h not in previous]
+            LOGGER.debug(f"Cells changed since the last run: {changed or 'none'}")
+
+        self.cells = cells
+
+    def is_current(self, stage: str, key: str, artifact: Optional[str] = None) -> bool:
+        """
+        Determine whether a stage was completed by the last run with the same key.
+
+        If ``artifact`` is provided, the stage's stored output is copied to that path, and the stage
+        is only considered current if the output could be restored.
+
+        Args:
+            stage (``str``): the name of the stage
+            key (``str``): the key of the stage in this run
+            artifact (``str | None``): the path at which to restore the stage's output
+
+        Returns:
+            ``bool``: whether the stage can be skipped
+        """
+        if self.stages.get(stage) != key:
+            return False
+
+        if artifact is not None:
+            try:
+                shutil.copyfile(os.path.join(self.path, stage), artifact)
+            except OSError:
+                return False
+
+        return True
+
+    def record(self, stage: str, key: str, artifact: Optional[str] = None):
+        """
+        Record that a stage was completed with the specified key and write the manifest.
+
+        Args:
+            stage (``str``): the name of the stage
+            key (``str``): the key of the stage in this run
+            artifact (``str | None``): the path to the stage's output, which is stored so that it
+                can be restored by later runs
+        """
+        os.makedirs(self.path, exist_ok=True)
+        if artifact is not None:
+            shutil.copyfile(artifact, os.path.join(self.path, stage))
+
+        with self._lock:
+            self.stages[stage] = key
+            self.save()
+
+    def save(self):
+        """
+        Write the manifest atomically.
+        """
+        os.makedirs(self.path, exist_ok=True)
+        write_file_atomically(
+            os.path.join(self.path, MANIFEST_FILENAME),
+            json.dumps(
+                {"version": __version__, "cells": self.cells, "stages": self.stages}, indent=2
+            ),
+        )
+
+
+if TYPE_CHECKING:
+    from .assignment import Assignment
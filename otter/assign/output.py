@@ -99,6 +99,21 @@ def write_output_dir(
             shutil.copy(file, str(output_dir / rel_path))
 
 
+def read_master_notebook(assignment: Assignment) -> nbformat.NotebookNode:
+    """
+    Read the master notebook, converting it to a notebook if it is an RMarkdown or Quarto document.
+
+    Args:
+        assignment (``otter.assign.assignment.Assignment``): the assignment config
+
+    Returns:
+        ``nbformat.NotebookNode``: the master notebook
+    """
+    if assignment.is_rmd:
+        return rmarkdown_converter.read_as_notebook(assignment.master)
+    return nbformat.read(assignment.master, as_version=NBFORMAT_VERSION)
+
+
 def write_output_directories(assignment: Assignment) -> bool:
     """
     Process a master notebook and write the results to the output directories.
@@ -109,10 +124,7 @@ def write_output_directories(assignment: Assignment) -> bool:
     Returns:
         ``bool``: whether there are any autograded questions
     """
-    if assignment.is_rmd:
-        nb = rmarkdown_converter.read_as_notebook(assignment.master)
-    else:
-        nb = nbformat.read(assignment.master, as_version=NBFORMAT_VERSION)
+    nb = read_master_notebook(assignment)
 
     if assignment.lang is None:
         assignment.lang = get_notebook_language(nb)
@@ -141,6 +153,7 @@ def write_output_directories(assignment: Assignment) -> bool:
     write_output_dir(transformed_nb, student_dir, assignment, True)
 
     # print assignment summary
-    LOGGER.info(nb_transformer.tests_mgr.generate_assignment_summary())
+    assignment.summary = nb_transformer.tests_mgr.generate_assignment_summary()
+    LOGGER.info(assignment.summary)
 
     return tests_mgr.any_tests()
@@ -0,0 +1,122 @@
+"""A task graph for running the stages of Otter Assign concurrently"""
+
+import time
+
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Optional
+
+from .. import logging
+
+
+LOGGER = logging.get_logger(__name__)
+
+
+class TaskGraph:
+    """
+    A set of tasks with dependencies between them that runs each task as soon as the tasks it
+    depends on have finished.
+
+    Every task whose dependencies succeed is run, even if another task has already failed, so the
+    tasks that are run don't depend on the order in which they finish. If any tasks fail, the error
+    of the first failed task in the order in which the tasks were added is raised after all of the
+    tasks that can run have finished.
+
+    Args:
+        max_workers (``int``): the maximum number of tasks to run at once; if 1, the tasks are run
+            one at a time in the calling thread in the order in which they were added
+    """
+
+    max_workers: int
+    """the maximum number of tasks to run at once"""
+
+    durations: dict[str, float]
+    """the time it took to run each task that has finished, in seconds"""
+
+    _tasks: dict[str, tuple[Callable[[], Any], tuple[str, ...]]]
+    """the function and dependencies of each task"""
+
+    def __init__(self, max_workers: int = 4):
+        if max_workers < 1:
+            raise ValueError("max_workers must be positive")
+
+        self.max_workers = max_workers
+        self.durations = {}
+        self._tasks = {}
+
+    def add(self, name: str, func: Callable[[], Any], depends_on: tuple[str, ...] = ()):
+        """
+        Add a task to the graph.
+
+        Args:
+            name (``str``): the name of the task
+            func (``callable[[], object]``): the function to call to run the task
+            depends_on (``tuple[str, ...]``): the names of tasks that must succeed before this task
+                can run; these must already have been added
+
+        Raises:
+            ``ValueError``: if a task with the same name has already been added or a dependency
+                hasn't been added
+        """
+        if name in self._tasks:
+            raise ValueError(f"Task {name} has already been added")
+
+        for dep in depends_on:
+            if dep not in self._tasks:
+                raise ValueError(f"Task {name} depends on unknown task {dep}")
+
+        self._tasks[name] = (func, tuple(depends_on))
+
+    def _run_task(self, name: str):
+        """
+        Run a task and record its duration.
+        """
+        LOGGER.debug(f"Starting task {name}")
+        start = time.perf_counter()
+        try:
+            self._tasks[name][0]()
+        finally:
+            self.durations[name] = time.perf_counter() - start
+            LOGGER.info(f"Finished {name} in {self.durations[name]:.2f}s")
+
+    def run(self):
+        """
+        Run the tasks in the graph.
+
+        Raises:
+            ``Exception``: the error raised by the first failed task, if any
+        """
+        errors: dict[str, Optional[BaseException]] = {}
+
+        def ready(name: str) -> bool:
+            return name not in errors and all(
+                d in errors and errors[d] is None for d in self._tasks[name][1]
+            )
+
+        if self.max_workers == 1:
+            for name in self._tasks:
+                if not ready(name):
+                    continue
+                try:
+                    self._run_task(name)
+                    errors[name] = None
+                except Exception as e:
+                    errors[name] = e
+
+        else:
+            with ThreadPoolExecutor(self.max_workers, thread_name_prefix="otter-assign") as pool:
+                running: dict[Future[None], str] = {}
+                while True:
+                    for name in self._tasks:
+                        if name not in running.values() and ready(name):
+                            running[pool.submit(self._run_task, name)] = name
+
+                    if not running:
+                        break
+
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        errors[running.pop(future)] = future.exception()
+
+        for name in self._tasks:
+            if errors.get(name) is not None:
+                raise errors[name]
@@ -1,7 +1,9 @@
 """Utilities for Otter Assign"""
 
 import copy
+import dill
 import json
+import multiprocessing
 import nbformat as nbf
 import os
 import pathlib
@@ -9,6 +11,7 @@ import re
 import shutil
 import warnings
 
+from concurrent.futures import ProcessPoolExecutor
 from textwrap import indent
 from typing import Any, Optional, TYPE_CHECKING
 
@@ -29,6 +32,12 @@ class EmptyCellException(Exception):
     """
 
 
+class AutograderTestsFailedException(RuntimeError):
+    """
+    Exception raised when the autograder notebook doesn't pass all of the assignment's tests
+    """
+
+
 class AssignNotebookFormatException(Exception):
     """
     An exception representing an error in the formatting of an Otter Assign master notebook.
@@ -219,29 +228,82 @@ def str_to_doctest(code_lines: list[str], lines: list[str]) -> list[str]:
         return str_to_doctest(code_lines, lines + [">>> " + line])
 
 
-def run_tests(assignment: "Assignment", debug: bool = False) -> None:
+def _grade_in_worker(
+    nb_path: str, ag_path: str, debug: bool, extra_submission_files: list[str], log_level: int
+) -> tuple[bytes, str]:
     """
-    Grade a notebook and throw an error if it does not receive a perfect score.
+    Grade the autograder notebook in the worker process of ``run_tests``.
+
+    The results are returned pickled with dill because they may contain objects (e.g. the functions
+    of exception-based test cases) that can't be pickled by ``multiprocessing``.
 
     Args:
-        assignment (``otter.assign.assignment.Assignment``): the assignment config
+        nb_path (``str``): the absolute path to the autograder notebook
+        ag_path (``str``): the absolute path to the autograder zip file
         debug (``bool``): whether to throw errors instead of swallowing them during grading
+        extra_submission_files (``list[str]``): absolute paths of extra files to copy into the
+            submission directory
+        log_level (``int``): the log level of the parent process
 
-    Raises:
-        ``RuntimeError``: if the grade received by the notebook is not 100%
+    Returns:
+        ``tuple[bytes, str]``: the pickled results and the output of Otter Run
     """
+    logging.set_level(log_level)
     with capture_run_output() as run_output:
         results = grade_submission(
-            str(assignment.ag_notebook_path),
-            str(assignment.ag_zip_path),
-            debug=debug,
-            extra_submission_files=assignment.student_files,
+            nb_path, ag_path, debug=debug, extra_submission_files=extra_submission_files
         )
 
-    LOGGER.debug(f"Otter Run output:\n{run_output.getvalue()}")
+    return dill.dumps(results), run_output.getvalue()
+
+
+def run_tests(assignment: "Assignment", debug: bool = False, in_subprocess: bool = False) -> None:
+    """
+    Grade a notebook and throw an error if it does not receive a perfect score.
+
+    Otter Run changes the working directory of the process, so if the tests are being run while
+    other stages of Otter Assign are running in other threads, ``in_subprocess`` should be set to
+    grade the notebook in a separate process.
+
+    Args:
+        assignment (``otter.assign.assignment.Assignment``): the assignment config
+        debug (``bool``): whether to throw errors instead of swallowing them during grading
+        in_subprocess (``bool``): whether to grade the notebook in a separate process
+
+    Raises:
+        ``AutograderTestsFailedException``: if the grade received by the notebook is not 100%
+    """
+    nb_path = os.path.abspath(assignment.ag_notebook_path)
+    ag_path = os.path.abspath(assignment.ag_zip_path)
+    extra_submission_files = [os.path.abspath(f) for f in assignment.student_files]
+
+    if in_subprocess:
+        # the process is spawned instead of forked because other threads are running
+        with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("spawn")) as executor:
+            future = executor.submit(
+                _grade_in_worker,
+                nb_path,
+                ag_path,
+                debug,
+                extra_submission_files,
+                logging.get_level(),
+            )
+            pickled_results, run_output = future.result()
+
+        results = dill.loads(pickled_results)
+
+    else:
+        with capture_run_output() as output:
+            results = grade_submission(
+                nb_path, ag_path, debug=debug, extra_submission_files=extra_submission_files
+            )
+
+        run_output = output.getvalue()
+
+    LOGGER.debug(f"Otter Run output:\n{run_output}")
 
     if results.total != results.possible:
-        raise RuntimeError(
+        raise AutograderTestsFailedException(
             f"Some autograder tests failed in the autograder notebook:\n"
             + indent(results.summary(), "    ")
         )
@@ -1,7 +1,6 @@
 """Logging for Otter Check"""
 
 import datetime as dt
-import dill
 import os
 import tempfile
 import types
@@ -148,6 +147,8 @@ class LogEntry:
         Args:
             filename (``str``): the path to the file to append this entry
         """
+        import dill
+
         try:
             file = open(filename, "ab+")
             dill.dump(self, file)
@@ -190,6 +191,8 @@ class LogEntry:
         Returns:
             ``LogEntry``: this entry
         """
+        import dill
+
         # delete old entry without reading entire log
         if delete:
             assert filename, "old env deletion indicated but no log filename provided"
@@ -250,6 +253,8 @@ class LogEntry:
         Returns:
             ``dict[str, Any]``: the shelved environment
         """
+        import dill
+
         if not self.shelf:
             raise ValueError("There is no shelf in this entry")
 
@@ -300,6 +305,8 @@ class LogEntry:
         Returns:
             ``list[LogEntry]``: the sorted log
         """
+        import dill
+
         try:
             file = open(filename, "rb")
 
@@ -340,6 +347,8 @@ class LogEntry:
             ``tuple[bytes, list[str]``: the pickled environment and list of variable names that were
                 not shelved
         """
+        import dill
+
         from .notebook import Notebook
 
         if ignore_modules is None:
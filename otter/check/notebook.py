@@ -3,7 +3,6 @@
 import datetime as dt
 import inspect
 import json
-import nbformat as nbf
 import os
 import sys
 import warnings
@@ -138,9 +137,7 @@ class Notebook(Loggable):
             self._notebook = self._config["notebook"]
 
         if self._notebook:
-            self._nbmeta_config = NBMetadataConfig.from_notebook(
-                nbf.read(self._notebook, nbf.NO_CONVERT)
-            )
+            self._nbmeta_config = NBMetadataConfig.from_notebook_path(self._notebook)
         else:
             self._nbmeta_config = NBMetadataConfig()
 
@@ -355,7 +352,9 @@ class Notebook(Loggable):
             else:
                 self._logger.debug("Force-save successful")
 
-        pdf_path = export_notebook(nb_path, filtering=filtering, pagebreaks=pagebreaks)
+        # cache the PDF so that it isn't rendered again if the notebook is exported again without
+        # changes
+        pdf_path = export_notebook(nb_path, filtering=filtering, pagebreaks=pagebreaks, cache=True)
         self._logger.debug(f"Wrote PDF to zip file: {pdf_path}")
 
         if display_link:
@@ -482,7 +481,9 @@ class Notebook(Loggable):
         pdf_path, pdf_created, pdf_error = None, True, None
         if pdf:
             try:
-                pdf_path = export_notebook(nb_path, filtering=filtering, pagebreaks=pagebreaks)
+                pdf_path = export_notebook(
+                    nb_path, filtering=filtering, pagebreaks=pagebreaks, cache=True
+                )
             except Exception as e:
                 pdf_error = e
             if pdf_path and os.path.isfile(pdf_path):
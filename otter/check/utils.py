@@ -1,6 +1,5 @@
 """Utilities for Otter Check"""
 
-import ipylab
 import nbformat as nbf
 import os
 import sys
@@ -14,7 +13,6 @@ from enum import Enum
 from glob import glob
 from IPython.core.getipython import get_ipython
 from IPython.display import display, Javascript
-from ipywidgets import Button, HTML, Output, VBox
 from subprocess import PIPE, run
 from typing import Any, Callable, Generic, Optional, TYPE_CHECKING, TypeVar, Union
 
@@ -38,6 +36,8 @@ def save_notebook(filename: str, timeout: Union[int, float] = 10) -> bool:
         ``bool``: whether the notebook was saved successfully
     """
     if get_ipython() is not None:
+        import ipylab
+
         orig_mod_time = os.path.getmtime(filename)
         start = time.time()
 
@@ -367,6 +367,8 @@ def display_pdf_confirmation_widget(
         message (``str | None``): a custom message to use
         callback (``callable``): a callback function to execute after the user ACKs
     """
+    from ipywidgets import Button, HTML, Output, VBox
+
     o = Output()
 
     def wrapped_callback(*_: tuple[Any]):
@@ -2,16 +2,13 @@
 
 import click
 import functools
+import importlib
+import inspect
+import os
 
 from typing import Any, Callable
 
 from . import logging
-from .assign import main as assign
-from .check import main as check
-from .export import main as export
-from .generate import main as generate
-from .grade import ALLOWED_EXTENSIONS, main as grade
-from .run import main as run
 from .version import print_version_info
 
 
@@ -22,6 +19,54 @@ _VERBOSITY_LEVELS = {
 }
 
 
+def _get_main(command: str) -> Callable[..., Any]:
+    """
+    Import the module that implements a subcommand and return its ``main`` function.
+
+    Subcommands are only imported when they are invoked so that starting the CLI doesn't import all
+    of Otter and its dependencies.
+
+    Args:
+        command (``str``): the name of the subcommand's module in the ``otter`` package
+
+    Returns:
+        ``callable``: the subcommand's ``main`` function
+    """
+    return importlib.import_module(f".{command}", __package__).main
+
+
+def _default(command: str, argument: str) -> Callable[[], Any]:
+    """
+    Create a click default that lazily retrieves the default value of a keyword argument of a
+    subcommand's ``main`` function.
+
+    Args:
+        command (``str``): the name of the subcommand's module in the ``otter`` package
+        argument (``str``): the name of the keyword argument
+
+    Returns:
+        ``callable[[], Any]``: a function that returns the default value
+    """
+    return lambda: inspect.signature(_get_main(command)).parameters[argument].default
+
+
+class _LazyChoice(click.Choice):
+    """
+    A ``click.Choice`` whose choices are retrieved when they are first needed.
+
+    Args:
+        get_choices (``callable[[], list[str]]``): a function that returns the choices
+    """
+
+    def __init__(self, get_choices: Callable[[], list[str]]):
+        self._get_choices = get_choices
+        self.case_sensitive = True
+
+    @functools.cached_property
+    def choices(self) -> tuple[str, ...]:
+        return tuple(self._get_choices())
+
+
 def _verbosity(f: Callable[..., Any]):
     @click.option("-v", "--verbose", "verbosity", count=True, help="Verbosity of the logged output")
     @functools.wraps(f)
@@ -47,13 +92,10 @@ def cli(version: bool):
         return
 
 
-defaults = assign.__kwdefaults__
-
-
 @cli.command("assign")
 @_verbosity
-@click.argument("master", type=click.Path(exists=True, dir_okay=False))
-@click.argument("result", type=click.Path())
+@click.argument("master", required=False, type=click.Path(exists=True, dir_okay=False))
+@click.argument("result", required=False, type=click.Path())
 @click.option(
     "--no-run-tests", is_flag=True, help="Do not run the tests against the autograder notebook"
 )
@@ -61,15 +103,37 @@ defaults = assign.__kwdefaults__
 @click.option("--username", help="Gradescope username for generating a token")
 @click.option("--password", help="Gradescope password for generating a token")
 @click.option("--debug", is_flag=True, help="Do not ignore errors in running tests for debugging")
+@click.option(
+    "--no-cache",
+    is_flag=True,
+    help="Export PDFs and run tests even if their inputs haven't changed since the last run",
+)
+@click.option(
+    "-b",
+    "--batch",
+    type=click.Path(exists=True, dir_okay=False),
+    help="A YAML file listing master notebooks and result directories to process concurrently",
+)
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    help="Number of assignments in the batch file to process concurrently",
+)
 def assign_cli(*args: Any, **kwargs: Any):
     """
     Create distribution versions of the Otter Assign formatted notebook MASTER and write the
     results to the directory RESULT, which will be created if it does not already exist.
-    """
-    return assign(*args, **kwargs)
 
+    Alternatively, use --batch to process each master notebook and result directory listed in a
+    batch file instead of passing MASTER and RESULT.
+    """
+    if kwargs["batch"] is None and (kwargs["master"] is None or kwargs["result"] is None):
+        raise click.UsageError("MASTER and RESULT are required unless --batch is used")
+    if kwargs["batch"] is not None and kwargs["master"] is not None:
+        raise click.UsageError("MASTER and RESULT can't be used with --batch")
 
-defaults = check.__kwdefaults__
+    return _get_main("assign")(*args, **kwargs)
 
 
 @cli.command("check")
@@ -79,7 +143,7 @@ defaults = check.__kwdefaults__
 @click.option(
     "-t",
     "--tests-path",
-    default=defaults["tests_path"],
+    default=_default("check", "tests_path"),
     type=click.Path(exists=True, file_okay=False),
     help="Path to the directory of test files",
 )
@@ -88,16 +152,18 @@ def check_cli(*args: Any, **kwargs: Any):
     """
     Check the Python script or Jupyter Notebook FILE against tests.
     """
-    return check(*args, **kwargs)
-
-
-defaults = export.__kwdefaults__
+    return _get_main("check")(*args, **kwargs)
 
 
 @cli.command("export")
 @_verbosity
-@click.argument("src", type=click.Path(exists=True, dir_okay=False))
-@click.argument("dest", required=False, type=click.Path())
+@click.argument("paths", nargs=-1, required=True, type=click.Path(), metavar="SRC... [DEST]")
+@click.option(
+    "-o",
+    "--output-dir",
+    type=click.Path(exists=True, file_okay=False),
+    help="Directory in which to write the PDFs",
+)
 @click.option("--filtering", is_flag=True, help="Whether the PDF should be filtered")
 @click.option(
     "--pagebreaks", is_flag=True, help="Whether the PDF should have pagebreaks between questions"
@@ -106,21 +172,58 @@ defaults = export.__kwdefaults__
 @click.option(
     "-e",
     "--exporter",
-    default=defaults["exporter"],
+    default=_default("export", "exporter"),
     type=click.Choice(["latex", "html"]),
     help="Type of PDF exporter to use",
 )
 @click.option("--xecjk", is_flag=True, help="Enable xeCJK in Otter's LaTeX template")
+@click.option(
+    "-j",
+    "--jobs",
+    default=_default("export", "jobs"),
+    type=click.IntRange(min=1),
+    help="Number of notebooks to export concurrently",
+)
+@click.option(
+    "--cache", is_flag=True, help="Cache PDFs so that unchanged notebooks aren't exported again"
+)
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False),
+    help="Directory in which to cache PDFs instead of Otter's cache directory; implies --cache",
+)
+@click.option(
+    "--max-image-size",
+    type=click.IntRange(min=1),
+    help="Downscale images larger than this many pixels in either dimension",
+)
+@click.option(
+    "--dedupe-images", is_flag=True, help="Omit image outputs identical to an earlier output"
+)
 def export_cli(*args: Any, **kwargs: Any):
     """
-    Export a Jupyter Notebook SRC as a PDF at DEST with optional filtering.
+    Export Jupyter Notebooks SRC as PDFs with optional filtering.
 
-    If unspecified, DEST is assumed to be the basename of SRC with a .pdf extension.
+    SRC can be one or more notebooks or directories of notebooks. When exporting a single notebook,
+    the path at which to write the PDF can be given as DEST (any path that isn't a notebook or a
+    directory); otherwise, each PDF is written next to its notebook with a .pdf extension, or in the
+    directory given by --output-dir.
     """
-    return export(*args, **kwargs)
+    paths = list(kwargs.pop("paths"))
+    dest = None
+    if len(paths) > 1 and paths[-1].lower().endswith(".pdf"):
+        dest = paths.pop()
+
+    # for compatibility with "otter export SRC DEST", the second of two paths is DEST unless it is
+    # a notebook or a directory
+    elif len(paths) == 2 and not (os.path.isdir(paths[1]) or paths[1].endswith(".ipynb")):
+        dest = paths.pop()
 
+    for path in paths:
+        if not os.path.exists(path):
+            raise click.BadParameter(f"Path '{path}' does not exist.", param_hint="'SRC...'")
 
-defaults = generate.__kwdefaults__
+    return _get_main("export")(*args, src=paths, dest=dest, **kwargs)
 
 
 @cli.command("generate")
@@ -128,14 +231,14 @@ defaults = generate.__kwdefaults__
 @click.option(
     "-t",
     "--tests-dir",
-    default=defaults["tests_dir"],
+    default=_default("generate", "tests_dir"),
     type=click.Path(exists=True, file_okay=False),
     help="Path to test files",
 )
 @click.option(
     "-o",
     "--output-path",
-    default=defaults["output_path"],
+    default=_default("generate", "output_path"),
     type=click.Path(),
     help="Path at which to write autograder zip file",
 )
@@ -187,15 +290,25 @@ defaults = generate.__kwdefaults__
     is_flag=True,
     help="Whether to set conda's channel_priority to strict in the setup.sh file",
 )
+@click.option(
+    "--lock",
+    is_flag=True,
+    help=(
+        "Resolve the grading environment into a lockfile that is installed without solving; "
+        "requires conda-lock"
+    ),
+)
+@click.option(
+    "--relock",
+    is_flag=True,
+    help="Resolve the grading environment again instead of using a cached lockfile; implies --lock",
+)
 @click.argument("files", nargs=-1)
 def generate_cli(*args: Any, **kwargs: Any):
     """
     Generate a zip file to configure an Otter autograder, including FILES as support files.
     """
-    return generate(*args, **kwargs)
-
-
-defaults = grade.__kwdefaults__
+    return _get_main("generate")(*args, **kwargs)
 
 
 @cli.command("grade")
@@ -203,15 +316,21 @@ defaults = grade.__kwdefaults__
 @click.argument("paths", nargs=-1, type=click.Path(exists=True))
 @click.option("-n", "--name", help="An assignment name to use in the Docker image tag")
 @click.option(
-    "-a", "--autograder", default=defaults["autograder"], help="Path to autograder zip file"
+    "-a",
+    "--autograder",
+    default=_default("grade", "autograder"),
+    help="Path to autograder zip file",
 )
 @click.option(
-    "-o", "--output-dir", default=defaults["output_dir"], help="Directory to which to write output"
+    "-o",
+    "--output-dir",
+    default=_default("grade", "output_dir"),
+    help="Directory to which to write output",
 )
 @click.option(
     "--ext",
-    default=defaults["ext"],
-    type=click.Choice(ALLOWED_EXTENSIONS),
+    default=_default("grade", "ext"),
+    type=_LazyChoice(lambda: importlib.import_module(".grade", __package__).ALLOWED_EXTENSIONS),
     help="The extension to glob for submissions",
 )
 @click.option(
@@ -220,14 +339,26 @@ defaults = grade.__kwdefaults__
     help="Whether to write the otter run results for each graded notebook",
 )
 @click.option("--pdfs", is_flag=True, help="Whether to copy notebook PDFs out of containers")
+@click.option(
+    "--cell-profiles",
+    is_flag=True,
+    help="Whether to write per-cell execution times and memory usage for each graded notebook",
+)
+@click.option(
+    "--test-timings",
+    is_flag=True,
+    help="Whether to write per-test-case execution times and memory usage for each submission",
+)
 @click.option(
     "--containers",
-    default=defaults["containers"],
+    default=_default("grade", "containers"),
     type=click.INT,
     help="Specify number of containers to run in parallel",
 )
 @click.option(
-    "--image", default=defaults["image"], help="A Docker image tag to use as the base image"
+    "--image",
+    default=_default("grade", "image"),
+    help="A Docker image tag to use as the base image",
 )
 @click.option("--timeout", type=click.INT, help="Submission execution timeout in seconds")
 @click.option("--no-network", is_flag=True, help="Disable networking in the containers")
@@ -245,41 +376,41 @@ def grade_cli(*args: Any, **kwargs: Any):
     or directories containing submissions ending with extension EXT.
     """
     kwargs["result_queue"] = None
-    g = grade(*args, **kwargs)
+    g = _get_main("grade")(*args, **kwargs)
     if g is not None:
         click.echo(g)
     return g
 
 
-defaults = run.__kwdefaults__
-
-
 @cli.command("run")
 @_verbosity
 @click.argument("submission")
 @click.option(
     "-a",
     "--autograder",
-    default=defaults["autograder"],
+    default=_default("run", "autograder"),
     type=click.Path(exists=True, dir_okay=False),
     help="Path to autograder zip file",
 )
 @click.option(
     "-o",
     "--output-dir",
-    default=defaults["output_dir"],
+    default=_default("run", "output_dir"),
     type=click.Path(exists=True, file_okay=False),
     help="Directory to which to write output",
 )
 @click.option("--no-logo", is_flag=True, help="Suppress Otter logo in stdout")
 @click.option("--debug", is_flag=True, help="Do not ignore errors when running submission")
 @click.option("-p", "--pickle-results", is_flag=True, help="Output GradingResults pickle file")
+@click.option(
+    "--no-cache", is_flag=True, help="Extract the autograder zip file without using the cache"
+)
 def run_cli(*args: Any, **kwargs: Any):
     """
     Run non-containerized Otter on a single submission, writing results to a JSON file.
     """
     write_pkl = kwargs.pop("pickle_results", False)
-    results = run(*args, **kwargs)
+    results = _get_main("run")(*args, **kwargs)
     if write_pkl:
         import dill
 
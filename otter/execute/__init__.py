@@ -9,13 +9,14 @@ from traitlets.config import Config
 from typing import Optional, TYPE_CHECKING
 
 from .checker import Checker
-from .logging import start_server
+from .logging import get_log_collector
+from .profiling import CellProfile
 from ..plugins import PluginCollection
 from ..test_files import GradingResults
-from ..utils import NBFORMAT_VERSION
+from ..utils import read_notebook_without_outputs
 
 
-__all__ = ["Checker", "grade_notebook"]
+__all__ = ["CellProfile", "Checker", "grade_notebook"]
 
 
 def grade_notebook(
@@ -32,6 +33,9 @@ def grade_notebook(
     variables: Optional[dict[str, str]] = None,
     plugin_collection: Optional[PluginCollection] = None,
     force_python3_kernel: bool = True,
+    validate_notebook: bool = True,
+    max_cell_output_size: Optional[int] = None,
+    max_notebook_output_size: Optional[int] = None,
 ):
     """
     Grade an assignment file and return grade information.
@@ -54,19 +58,26 @@ def grade_notebook(
             checking values deserialized from ``log``
         plugin_collection (``otter.plugins.PluginCollection | None``): a set of plugins to run the
             ``before_execution`` and ``after_grading`` events on this submission
+        force_python3_kernel (``bool``): whether to force the notebook to be executed with the
+            ``python3`` kernel
+        validate_notebook (``bool``): whether to validate the submission against the notebook
+            format schema when reading it
+        max_cell_output_size (``int | None``): the maximum number of characters of output to store
+            for each cell of the executed notebook; outputs past this limit are truncated
+        max_notebook_output_size (``int | None``): the maximum number of characters of output to
+            store for the entire executed notebook; outputs past this limit are truncated
 
     Returns:
         ``otter.test_files.GradingResults``: the results of grading
     """
-    from nbconvert.preprocessors import ExecutePreprocessor
-
-    from .preprocessor import GradingPreprocessor
+    from .preprocessor import GradingExecutePreprocessor, GradingPreprocessor
 
     if tests_glob is None:
         tests_glob = []
 
     if not script:
-        nb = nbformat.read(submission_path, as_version=NBFORMAT_VERSION)
+        # outputs are regenerated during execution, so don't load them into memory
+        nb = read_notebook_without_outputs(submission_path, validate=validate_notebook)
 
     else:
         with open(submission_path) as f:
@@ -82,7 +93,7 @@ def grade_notebook(
     try:
         c = Config()
 
-        (host, port), stop_server = start_server()
+        log_collector = get_log_collector()
 
         try:
             # GradingPreprocessor config
@@ -94,21 +105,32 @@ def grade_notebook(
             c.GradingPreprocessor.seed_variable = seed_variable
             c.GradingPreprocessor.otter_log = log
             c.GradingPreprocessor.variables = variables
-            c.GradingPreprocessor.logging_server_host = host
-            c.GradingPreprocessor.logging_server_port = port
+            c.GradingPreprocessor.logging_server_host = log_collector.host
+            c.GradingPreprocessor.logging_server_port = log_collector.port
             c.GradingPreprocessor.force_python3_kernel = force_python3_kernel
 
             # ExecutePreprocessor config
             c.ExecutePreprocessor.allow_errors = ignore_errors
+            c.GradingExecutePreprocessor.max_cell_output_size = max_cell_output_size
+            c.GradingExecutePreprocessor.max_notebook_output_size = max_notebook_output_size
 
             gp = GradingPreprocessor(config=c)
-            ep = ExecutePreprocessor(config=c)
+            ep = GradingExecutePreprocessor(config=c)
+
+            # track the indices of the submission's cells so that they can be identified in the
+            # cell profiles after Otter adds its own cells
+            submission_cell_indices = {id(cell): i for i, cell in enumerate(nb.cells)}
 
             nb, _ = gp.preprocess(nb)
             executed_nb, _ = ep.preprocess(nb)
 
+            cell_profiles = ep.cell_profiles
+            for profile in cell_profiles:
+                profile.submission_index = submission_cell_indices.get(
+                    id(executed_nb.cells[profile.index])
+                )
+
         finally:
-            stop_server()
             gp.cleanup()
 
         os.close(results_handle)
@@ -125,6 +147,7 @@ def grade_notebook(
             )
 
         results.notebook = executed_nb
+        results.cell_profiles = cell_profiles
 
         if plugin_collection is not None:
             plugin_collection.run("after_grading", results)
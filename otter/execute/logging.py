@@ -1,18 +1,25 @@
-"""A logging server for receiving logs from the grading process"""
+"""A log collector for receiving logs from the grading process"""
 
+import atexit
 import logging
-import logging.handlers
+import os
 import pickle
+import selectors
+import shutil
 import socket
-import socketserver
 import struct
+import tempfile
 import threading
 
+from typing import Optional
+
 from ..logging import get_level, get_logger
 
 
 LOGGER = get_logger(__name__)
 
+_HEADER = struct.Struct(">L")
+
 
 class LogLevelFilter(logging.Filter):
     """
@@ -24,35 +31,170 @@ class LogLevelFilter(logging.Filter):
         return record.levelno >= get_level()
 
 
-class LogRecordStreamHandler(socketserver.StreamRequestHandler):
+class LogCollector:
     """
-    A handler for a streaming logging request.
+    A service that receives batches of logs sent by ``otter.logging.BatchSocketHandler`` and
+    forwards them to Otter's loggers.
 
-    Copied from https://docs.python.org/3/howto/logging-cookbook.html#sending-and-receiving-logging-events-across-a-network.
+    The collector listens on a unix domain socket (or a TCP socket on localhost on platforms
+    without unix domain sockets) and serves all connections from a single background thread, so one
+    collector can be shared by any number of notebook executions. Stopping the collector wakes the
+    thread immediately, handles any logs that have already been received, and closes the socket.
     """
 
+    host: str
+    """the path to the unix domain socket, or the host of the TCP socket"""
+
+    port: Optional[int]
+    """the port of the TCP socket, or ``None`` if the collector uses a unix domain socket"""
+
     filter = LogLevelFilter()
 
-    def handle(self):
+    _socket_dir: Optional[str]
+    """the temporary directory containing the unix domain socket"""
+
+    _server: socket.socket
+    """the listening socket"""
+
+    _wake_reader: socket.socket
+    """the socket used to wake the background thread when the collector is stopped"""
+
+    _wake_writer: socket.socket
+    """the socket written to to wake the background thread"""
+
+    _selector: selectors.BaseSelector
+    """the selector monitoring the sockets"""
+
+    _buffers: dict[socket.socket, bytearray]
+    """the data received from each open connection that hasn't been handled yet"""
+
+    _thread: Optional[threading.Thread]
+    """the background thread"""
+
+    def __init__(self):
+        if hasattr(socket, "AF_UNIX"):
+            self._socket_dir = tempfile.mkdtemp()
+            self.host, self.port = os.path.join(self._socket_dir, "logs.sock"), None
+            self._server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._server.bind(self.host)
+
+        else:
+            self._socket_dir = None
+            self._server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self._server.bind(("localhost", 0))
+            self.host, self.port = self._server.getsockname()
+
+        self._server.listen()
+        self._server.setblocking(False)
+
+        self._wake_reader, self._wake_writer = socket.socketpair()
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self._server, selectors.EVENT_READ)
+        self._selector.register(self._wake_reader, selectors.EVENT_READ)
+        self._buffers = {}
+        self._thread = None
+
+    @property
+    def running(self) -> bool:
+        """whether the collector's background thread is running"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """
+        Start receiving logs in a background thread.
+        """
+        LOGGER.debug(f"Starting execution log collector at {self.host}:{self.port}")
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    def stop(self):
         """
-        Handle multiple requests - each expected to be a 4-byte length,
-        followed by the LogRecord in pickle format. Logs the record
-        according to whatever policy is configured locally.
+        Stop receiving logs, wait for the background thread to finish, and close the socket.
         """
-        while True:
-            chunk = self.connection.recv(4)
-            if len(chunk) < 4:
+        if self._thread is None:
+            return
+
+        self._wake_writer.send(b"\0")
+        self._thread.join()
+        self._thread = None
+
+        self._selector.close()
+        self._server.close()
+        self._wake_reader.close()
+        self._wake_writer.close()
+        if self._socket_dir is not None:
+            shutil.rmtree(self._socket_dir, ignore_errors=True)
+
+    def _serve(self):
+        """
+        Accept connections and handle the batches of logs sent over them until the collector is
+        stopped.
+        """
+        stopping = False
+        while not stopping:
+            for key, _ in self._selector.select():
+                if key.fileobj is self._wake_reader:
+                    stopping = True
+                elif key.fileobj is self._server:
+                    self._accept()
+                else:
+                    self._receive(key.fileobj)
+
+        # handle any logs that were sent before the collector was stopped
+        for key, _ in self._selector.select(timeout=0):
+            if key.fileobj not in (self._server, self._wake_reader):
+                self._receive(key.fileobj)
+
+        for conn in list(self._buffers):
+            self._disconnect(conn)
+
+    def _accept(self):
+        """
+        Accept a new connection.
+        """
+        try:
+            conn, _ = self._server.accept()
+        except BlockingIOError:
+            return
+
+        conn.setblocking(False)
+        self._buffers[conn] = bytearray()
+        self._selector.register(conn, selectors.EVENT_READ)
+
+    def _disconnect(self, conn: socket.socket):
+        """
+        Close a connection.
+        """
+        self._selector.unregister(conn)
+        self._buffers.pop(conn)
+        conn.close()
+
+    def _receive(self, conn: socket.socket):
+        """
+        Read the data available on a connection and handle any complete batches of logs.
+        """
+        try:
+            data = conn.recv(65536)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b""
+
+        if not data:
+            self._disconnect(conn)
+            return
+
+        buffer = self._buffers[conn]
+        buffer.extend(data)
+        while len(buffer) >= _HEADER.size:
+            (size,) = _HEADER.unpack_from(buffer)
+            if len(buffer) < _HEADER.size + size:
                 break
-            slen = struct.unpack(">L", chunk)[0]
-            chunk = self.connection.recv(slen)
-            while len(chunk) < slen:
-                chunk = chunk + self.connection.recv(slen - len(chunk))
-            obj = self.unpickle(chunk)
-            record = logging.makeLogRecord(obj)
-            self.handle_log_record(record)
 
-    def unpickle(self, data: bytes):
-        return pickle.loads(data)
+            batch = pickle.loads(buffer[_HEADER.size : _HEADER.size + size])
+            del buffer[: _HEADER.size + size]
+            for record_dict in batch:
+                self.handle_log_record(logging.makeLogRecord(record_dict))
 
     def handle_log_record(self, record: logging.LogRecord):
         logger = get_logger(record.name)
@@ -60,56 +202,26 @@ class LogRecordStreamHandler(socketserver.StreamRequestHandler):
             logger.handle(record)
 
 
-class LogRecordSocketReceiver(socketserver.ThreadingTCPServer):
-    """
-    Simple TCP socket-based logging receiver.
+_collector: Optional[LogCollector] = None
+"""the log collector shared by all notebook executions in this process"""
+
+_collector_lock = threading.Lock()
+"""a lock for starting the shared log collector"""
 
-    Copied from https://docs.python.org/3/howto/logging-cookbook.html#sending-and-receiving-logging-events-across-a-network.
-    """
 
-    allow_reuse_address = True
-    abort = False
-
-    def __init__(
-        self,
-        host: str = "localhost",
-        port: int = 0,
-        handler: type[logging.Handler] = LogRecordStreamHandler,
-    ):
-        super().__init__((host, port), handler)
-
-    def serve_until_stopped(self):
-        import select
-
-        abort = False
-        while not abort:
-            rd = None
-            try:
-                rd, _, _ = select.select([self.socket.fileno()], [], [], 1)
-            except socket.error:
-                pass
-            if rd:
-                self.handle_request()
-            abort = self.abort
-
-
-def start_server():
+def get_log_collector() -> LogCollector:
     """
-    Start a TCP socket for receiving logs from the notebook being executed. Returns a tuple of
-    ``((server host, server port), stop server callback)``.
+    Return the log collector shared by all notebook executions in this process, starting it if it
+    isn't running. The collector is stopped when the process exits.
 
     Returns:
-        ``tuple[tuple[str, int], callable]``: a tuple containing a tuple with the server host and
-            port as its first element and a callback to stop the server as its second
+        ``LogCollector``: the running log collector
     """
-    tcpserver = LogRecordSocketReceiver()
-    host, port = tcpserver.server_address
-    LOGGER.debug(f"Starting execution logging TCP server in background at {host}:{port}")
-    t = threading.Thread(target=tcpserver.serve_until_stopped)
-    t.start()
-
-    def stop_server():
-        LOGGER.debug("Stopping execution logging TCP server")
-        tcpserver.abort = True
-
-    return tcpserver.server_address, stop_server
+    global _collector
+    with _collector_lock:
+        if _collector is None or not _collector.running:
+            _collector = LogCollector()
+            _collector.start()
+            atexit.register(_collector.stop)
+
+        return _collector
@@ -3,15 +3,17 @@ import json
 import nbformat as nbf
 import os
 import tempfile
+import time
 
 from nbconvert.exporters import PythonExporter
-from nbconvert.preprocessors import Preprocessor
+from nbconvert.preprocessors import ExecutePreprocessor, Preprocessor
 from textwrap import dedent
 from traitlets import Bool, Dict, Instance, Integer, List, Unicode
-from typing import Optional, TypeVar
+from typing import Any, Optional, TypeVar
 
+from .profiling import CellProfile
 from ..check.logs import Log
-from ..utils import id_generator, NOTEBOOK_METADATA_KEY
+from ..utils import get_peak_rss, id_generator, NOTEBOOK_METADATA_KEY
 
 
 T = TypeVar("T")
@@ -27,7 +29,7 @@ from otter import Notebook as {notebook_name}
 import logging
 from otter import logging
 logging.set_level(logging.DEBUG)
-logging.send_logs("{logging_server_host}", {logging_server_port})
+logging.send_logs({logging_server_host!r}, {logging_server_port})
 """
 
 EXPORT_CELL_SOURCE = """\
@@ -68,7 +70,7 @@ class GradingPreprocessor(Preprocessor):
 
     logging_server_host = Unicode().tag(config=True)
 
-    logging_server_port = Integer().tag(config=True)
+    logging_server_port = Integer(allow_none=True).tag(config=True)
 
     force_python3_kernel = Bool().tag(config=True)
 
@@ -230,6 +232,235 @@ class GradingPreprocessor(Preprocessor):
             os.remove(self._log_temp_file[1])
 
 
+class GradingExecutePreprocessor(ExecutePreprocessor):
+    """
+    An ``ExecutePreprocessor`` that profiles the execution of each code cell and bounds the amount
+    of output stored in the executed notebook.
+
+    A :py:class:`otter.execute.profiling.CellProfile` is recorded in ``cell_profiles`` for each
+    code cell that is executed.
+
+    Output sizes are measured in characters of text (for streams and tracebacks) or of serialized
+    MIME bundle data (for rich outputs). Once a cell or the notebook exceeds its output budget, the
+    stream output that crossed the limit is truncated and followed by a marker, a rich output that
+    crossed the limit is replaced by a plain-text placeholder, and any further outputs from the cell
+    are dropped. Error outputs are always kept. Updates to displays (``update_display_data``) are
+    charged to the cells containing the updated outputs, and outputs captured by an output hook
+    (e.g. an ipywidgets ``Output`` widget) count against the budget of the cell that produced them.
+    """
+
+    max_cell_output_size = Integer(allow_none=True).tag(config=True)
+
+    max_notebook_output_size = Integer(allow_none=True).tag(config=True)
+
+    _cell_output_sizes: dict[int, int]
+
+    _captured_output_sizes: dict[int, int]
+
+    _notebook_output_size: int
+
+    _truncated_cells: set[int]
+
+    cell_profiles: list[CellProfile]
+    """the execution profiles of the code cells that have been executed"""
+
+    def reset_execution_trackers(self):
+        super().reset_execution_trackers()
+        self._cell_output_sizes = {}
+        self._captured_output_sizes = {}
+        self._notebook_output_size = 0
+        self._truncated_cells = set()
+        self.cell_profiles = []
+
+    def _get_kernel_pid(self) -> Optional[int]:
+        """
+        Get the process ID of the kernel, if it is running locally.
+        """
+        provisioner = getattr(self.km, "provisioner", None)
+        process = getattr(provisioner, "process", None)
+        return getattr(process, "pid", None)
+
+    def preprocess_cell(
+        self, cell: nbf.NotebookNode, resources: T, index: int
+    ) -> tuple[nbf.NotebookNode, T]:
+        if cell.cell_type != "code" or not cell.source.strip():
+            return super().preprocess_cell(cell, resources, index)
+
+        pid = self._get_kernel_pid()
+        peak_rss = get_peak_rss(pid)
+        errored = True
+        start = time.perf_counter()
+
+        try:
+            cell, resources = super().preprocess_cell(cell, resources, index)
+            errored = any(o.get("output_type") == "error" for o in cell.outputs)
+            return cell, resources
+
+        finally:
+            wall_time = time.perf_counter() - start
+            new_peak_rss = get_peak_rss(pid)
+            self.cell_profiles.append(
+                CellProfile(
+                    index=index,
+                    submission_index=None,
+                    wall_time=wall_time,
+                    peak_rss_delta=(
+                        new_peak_rss - peak_rss
+                        if peak_rss is not None and new_peak_rss is not None
+                        else None
+                    ),
+                    errored=errored,
+                )
+            )
+
+    @staticmethod
+    def _get_data_size(data: dict[str, Any]) -> int:
+        size = 0
+        for value in data.values():
+            size += len(value) if isinstance(value, str) else len(json.dumps(value))
+
+        return size
+
+    @classmethod
+    def _get_message_size(cls, msg: dict[str, Any]) -> int:
+        content = msg["content"]
+        if msg["msg_type"] == "stream":
+            return len(content.get("text", ""))
+
+        if msg["msg_type"] == "error":
+            return sum(len(l) for l in content.get("traceback", []))
+
+        return cls._get_data_size(content.get("data", {}))
+
+    def _get_remaining_budget(self, cell_index: int) -> tuple[Optional[int], str]:
+        """
+        Return the number of characters of output that can still be stored for the cell and the
+        name of the budget that limits it (``"cell"`` or ``"notebook"``).
+        """
+        remaining, budget = None, "cell"
+        if self.max_cell_output_size is not None:
+            remaining = (
+                self.max_cell_output_size
+                - self._cell_output_sizes.get(cell_index, 0)
+                - self._captured_output_sizes.get(cell_index, 0)
+            )
+
+        if self.max_notebook_output_size is not None:
+            nb_remaining = self.max_notebook_output_size - self._notebook_output_size
+            if remaining is None or nb_remaining < remaining:
+                remaining, budget = nb_remaining, "notebook"
+
+        return remaining if remaining is None else max(remaining, 0), budget
+
+    def _truncate_message(
+        self, msg: dict[str, Any], remaining: int, budget: str, size: int
+    ) -> dict[str, Any]:
+        """
+        Return a copy of ``msg`` truncated to fit within ``remaining`` characters.
+        """
+        limit = self.max_cell_output_size if budget == "cell" else self.max_notebook_output_size
+        marker = (
+            f"\n[Output truncated by Otter: the {budget} output limit of {limit} characters was "
+            "exceeded]\n"
+        )
+
+        content = msg["content"]
+        if msg["msg_type"] == "stream":
+            content = {**content, "text": content["text"][:remaining] + marker}
+
+        else:
+            mimetypes = ", ".join(content.get("data", {}).keys())
+            placeholder = f"[{mimetypes} output of {size} characters omitted]" + marker
+            content = {**content, "data": {"text/plain": placeholder}, "metadata": {}}
+
+        return {**msg, "content": content}
+
+    def _release_cell_output(self, cell_index: int):
+        """
+        Release the budget used by the outputs of a cell after they have been cleared. Outputs
+        captured by an output hook (e.g. an ipywidgets ``Output`` widget) aren't stored in the cell,
+        so the budget they use isn't released.
+        """
+        self._notebook_output_size -= self._cell_output_sizes.pop(cell_index, 0)
+        self._truncated_cells.discard(cell_index)
+
+    def output(
+        self,
+        outs: list[nbf.NotebookNode],
+        msg: dict[str, Any],
+        display_id: Optional[str],
+        cell_index: int,
+    ) -> Optional[nbf.NotebookNode]:
+        if msg["msg_type"] not in {"stream", "display_data", "execute_result", "error"}:
+            return super().output(outs, msg, display_id, cell_index)
+
+        # outputs captured by an output hook (e.g. an ipywidgets Output widget) aren't added to the
+        # cell's outputs, so the cell's outputs being empty doesn't mean that they were cleared
+        parent_msg_id = msg["parent_header"].get("msg_id")
+        captured = bool(self.output_hook_stack[parent_msg_id])
+
+        # release the budget if the outputs of the cell were cleared or will be cleared before this
+        # output is added
+        if not captured and (not outs or self.clear_before_next_output):
+            self._release_cell_output(cell_index)
+
+        size = self._get_message_size(msg)
+        remaining, budget = self._get_remaining_budget(cell_index)
+        if msg["msg_type"] != "error" and remaining is not None and size > remaining:
+            if cell_index in self._truncated_cells:
+                return None
+
+            # the truncated output uses the rest of the budget, not counting the marker
+            msg = self._truncate_message(msg, remaining, budget, size)
+            size = remaining
+            self._truncated_cells.add(cell_index)
+
+        sizes = self._captured_output_sizes if captured else self._cell_output_sizes
+        sizes[cell_index] = sizes.get(cell_index, 0) + size
+        self._notebook_output_size += size
+        return super().output(outs, msg, display_id, cell_index)
+
+    def _update_display_id(self, display_id: str, msg: dict[str, Any]):
+        # updating a display replaces the data of every output with the display ID, so the
+        # difference in size is charged to the cells containing them and the update is replaced by
+        # a placeholder if it doesn't fit in their budgets
+        if display_id not in self._display_id_map:
+            return super()._update_display_id(display_id, msg)
+
+        targets = self._display_id_map[display_id]
+        new_size = self._get_message_size(msg)
+
+        def get_size_deltas(size):
+            deltas = {}
+            for cell_idx, output_indices in targets.items():
+                outputs = self.nb.cells[cell_idx].outputs
+                deltas[cell_idx] = sum(
+                    size - self._get_data_size(outputs[i].get("data", {})) for i in output_indices
+                )
+            return deltas
+
+        deltas = get_size_deltas(new_size)
+        for cell_idx, delta in deltas.items():
+            remaining, budget = self._get_remaining_budget(cell_idx)
+            if remaining is not None and delta > remaining:
+                msg = self._truncate_message(msg, remaining, budget, new_size)
+                deltas = get_size_deltas(self._get_message_size(msg))
+                self._truncated_cells.add(cell_idx)
+                break
+
+        for cell_idx, delta in deltas.items():
+            self._cell_output_sizes[cell_idx] = self._cell_output_sizes.get(cell_idx, 0) + delta
+            self._notebook_output_size += delta
+
+        return super()._update_display_id(display_id, msg)
+
+    def clear_output(self, outs: list[nbf.NotebookNode], msg: dict[str, Any], cell_index: int):
+        captured = bool(self.output_hook_stack[msg["parent_header"].get("msg_id")])
+        super().clear_output(outs, msg, cell_index)
+        if not captured and not outs:
+            self._release_cell_output(cell_index)
+
+
 class ImportCollector(ast.NodeVisitor):
     imports = []
 
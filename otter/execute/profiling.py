@@ -0,0 +1,29 @@
+"""Execution profiling of submission cells"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class CellProfile:
+    """
+    A dataclass representing the execution profile of a single code cell.
+    """
+
+    index: int
+    """the index of the cell in the executed notebook"""
+
+    submission_index: Optional[int]
+    """the index of the cell in the submission, or ``None`` if the cell was added by Otter"""
+
+    wall_time: float
+    """the wall time of the cell's execution in seconds"""
+
+    peak_rss_delta: Optional[int]
+    """
+    the increase in the kernel's peak resident set size during the cell's execution in bytes, or
+    ``None`` if it could not be determined
+    """
+
+    errored: bool
+    """whether executing the cell raised an error"""
@@ -2,15 +2,16 @@
 
 import os
 
-from typing import Any, Optional
-
-from .exporters import ExporterType
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from glob import glob
+from typing import Any, Optional, TYPE_CHECKING, Union
 
 
 def export_notebook(
     nb_path: str,
     dest: Optional[str] = None,
-    exporter_type: Optional[ExporterType] = None,
+    exporter_type: Optional["ExporterType"] = None,
     **kwargs: Any,
 ):
     """
@@ -45,36 +46,202 @@ def export_notebook(
     return pdf_name
 
 
+def export_notebooks(
+    nb_paths: list[str],
+    dests: Optional[list[Optional[str]]] = None,
+    exporter_type: Optional["ExporterType"] = None,
+    *,
+    jobs: int = 4,
+    **kwargs: Any,
+) -> list[tuple[str, Optional[Exception]]]:
+    """
+    Exports the notebook files at ``nb_paths`` to PDFs concurrently in ``jobs`` threads. Accepts
+    other ``kwargs`` passed to the exporter class's ``convert_notebook`` class method.
+
+    When exporting via HTML, a single headless browser with a pool of ``jobs`` pages is launched
+    and shared by all of the notebooks instead of launching a browser for each notebook.
+
+    Errors raised while exporting a notebook don't stop the other notebooks from being exported;
+    they are returned with the path of the PDF that couldn't be written instead.
+
+    Args:
+        nb_paths (``list[str]``): paths to notebooks
+        dests (``list[str | None] | None``): paths to write the PDFs; a ``None`` path (or not
+            specifying ``dests``) writes the PDF next to its notebook
+        exporter_type (``"html" | "latex" | None``): the type of exporter to use
+        jobs (``int``): the number of notebooks to export concurrently
+        cache (``bool``): whether to cache exported PDFs so that unchanged notebooks aren't
+            rendered again
+        cache_dir (``str | None``): a directory in which to cache exported PDFs instead of Otter's
+            cache directory; implies ``cache``
+        **kwargs: additional configurations passed to exporter
+
+    Returns:
+        ``list[tuple[str, Exception | None]]``: the path at which each PDF was written and the
+            error raised while exporting it, if any, in the same order as ``nb_paths``
+
+    Raises:
+        ``ValueError``: if ``dests`` and ``nb_paths`` have different lengths or ``jobs`` isn't
+            positive
+    """
+    try:
+        import nbconvert as _
+    except:
+        raise ImportError("nbconvert is required for Otter Export but it could not be found")
+
+    from .exporters import get_exporter, PDFViaHTMLExporter
+    from .exporters.browser_pool import BrowserPool
+
+    if dests is None:
+        dests = [None] * len(nb_paths)
+    elif len(dests) != len(nb_paths):
+        raise ValueError("nb_paths and dests must have the same length")
+
+    if jobs < 1:
+        raise ValueError("jobs must be positive")
+
+    pdf_names = [
+        dest if dest is not None else os.path.splitext(nb_path)[0] + ".pdf"
+        for nb_path, dest in zip(nb_paths, dests)
+    ]
+
+    Exporter = get_exporter(exporter_type=exporter_type)
+
+    ctx = nullcontext()
+    if issubclass(Exporter, PDFViaHTMLExporter):
+        ctx = kwargs["browser_pool"] = BrowserPool(size=jobs)
+
+    with ctx, ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = [
+            executor.submit(Exporter.convert_notebook, nb_path, pdf_name, **kwargs)
+            for nb_path, pdf_name in zip(nb_paths, pdf_names)
+        ]
+
+        results: list[tuple[str, Optional[Exception]]] = []
+        for pdf_name, future in zip(pdf_names, futures):
+            try:
+                future.result()
+                results.append((pdf_name, None))
+            except Exception as e:
+                results.append((pdf_name, e))
+
+    return results
+
+
 def main(
-    src: str,
+    src: Union[str, list[str], tuple[str, ...]],
     *,
     dest: Optional[str] = None,
-    exporter: Optional[ExporterType] = None,
+    output_dir: Optional[str] = None,
+    exporter: Optional["ExporterType"] = None,
     filtering: bool = False,
     pagebreaks: bool = False,
     save: bool = False,
     xecjk: bool = False,
+    jobs: int = 4,
+    cache: bool = False,
+    cache_dir: Optional[str] = None,
+    max_image_size: Optional[int] = None,
+    dedupe_images: bool = False,
 ):
     """
     Runs Otter Export
 
+    ``src`` can be a single notebook or a list of notebooks and directories of notebooks. If more
+    than one notebook is provided, the notebooks are exported concurrently with
+    ``export_notebooks`` and whether each notebook was exported successfully is printed; an error
+    is raised after all of the notebooks have been processed if any of them failed.
+
     Args:
-        src (``str``): path to source notebook
-        dest (``str | None``): path at which to write PDF
+        src (``str | list[str] | tuple[str]``): path(s) to source notebooks or directories
+            containing them
+        dest (``str | None``): path at which to write PDF; can only be used when exporting a single
+            notebook
+        output_dir (``str | None``): directory in which to write the PDFs; if unspecified, each
+            PDF is written next to its notebook
         exporter (``str | None``): exporter name
         filtering (``bool``): whether to filter cells using HTML comments
         pagebreaks (``bool``): whether to pagebreak between filtered regions; ignored if ``filtering``
             is ``False``
         save (``bool``): whether to save any intermediate files (e.g. ``.tex``, ``.html``)
         xecjk (``bool``): whether to use xeCJK in the LaTeX template
+        jobs (``int``): the number of notebooks to export concurrently
+        cache (``bool``): whether to cache exported PDFs
+        cache_dir (``str | None``): directory in which to cache exported PDFs; implies ``cache``
+        max_image_size (``int | None``): the maximum width and height of images in the PDF, in
+            pixels; larger images are downscaled
+        dedupe_images (``bool``): whether to omit image outputs identical to an earlier output
+
+    Raises:
+        ``ValueError``: if ``dest`` is specified when exporting multiple notebooks, no notebooks
+            are found, or multiple PDFs would be written to the same path
+        ``otter.export.exporters.base_exporter.ExportFailedException``: if any of the notebooks
+            couldn't be exported when exporting multiple notebooks
+        ``ImportError``: if ``max_image_size`` is specified but Pillow isn't installed
     """
-    export_notebook(
-        src,
-        dest=dest,
+    if max_image_size is not None:
+        from .exporters.utils import check_pillow_installed
+
+        # fail before exporting any notebooks if images can't be downscaled
+        check_pillow_installed()
+
+    options = dict(
         exporter_type=exporter,
         filtering=filtering,
         pagebreaks=pagebreaks,
         save_tex=save,
         save_html=save,
         xecjk=xecjk,
+        cache=cache,
+        cache_dir=cache_dir,
+        max_image_size=max_image_size,
+        dedupe_images=dedupe_images,
     )
+
+    srcs = [src] if isinstance(src, str) else list(src)
+    if len(srcs) == 1 and not os.path.isdir(srcs[0]) and output_dir is None:
+        export_notebook(srcs[0], dest=dest, **options)
+        return
+
+    if dest is not None:
+        raise ValueError("A destination path can only be specified when exporting one notebook")
+
+    nb_paths = []
+    for path in srcs:
+        if os.path.isdir(path):
+            nb_paths.extend(sorted(glob(os.path.join(path, "*.ipynb"))))
+        else:
+            nb_paths.append(path)
+
+    if not nb_paths:
+        raise ValueError("No notebooks found to export")
+
+    dests = None
+    if output_dir is not None:
+        dests = [
+            os.path.join(output_dir, os.path.splitext(os.path.basename(p))[0] + ".pdf")
+            for p in nb_paths
+        ]
+        if len(set(dests)) != len(dests):
+            raise ValueError(
+                f"Multiple notebooks would be exported to the same path in {output_dir}"
+            )
+
+    results = export_notebooks(nb_paths, dests, jobs=jobs, **options)
+
+    failed = 0
+    for nb_path, (pdf_path, error) in zip(nb_paths, results):
+        if error is None:
+            print(f"Exported {nb_path} to {pdf_path}")
+        else:
+            failed += 1
+            print(f"Failed to export {nb_path}: {error}")
+
+    if failed:
+        from .exporters.base_exporter import ExportFailedException
+
+        raise ExportFailedException(f"{failed} of {len(nb_paths)} notebooks could not be exported")
+
+
+if TYPE_CHECKING:
+    from .exporters import ExporterType
@@ -1,18 +1,49 @@
 """ABC for Otter Export exporters"""
 
+import copy
+import hashlib
 import importlib.resources
+import json
 import nbformat
+import os
+import shutil
+import threading
 
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, Optional, TypeVar
 
 from . import __name__ as pkg_name
-from .utils import has_begin, has_end, sub_end_for_new_page
-from ...utils import NBFORMAT_VERSION
+from .utils import (
+    dedupe_image_outputs,
+    get_referenced_files,
+    has_begin,
+    has_end,
+    shrink_images,
+    sub_end_for_new_page,
+)
+from ...logging import get_logger
+from ...utils import evict_cache_entries, get_cache_dir, NBFORMAT_VERSION, write_file_atomically
+from ...version import __version__
 
 
+LOGGER = get_logger(__name__)
+
 TEMPLATE_DIR = importlib.resources.files(pkg_name) / "templates"
 
+PDF_CACHE_NAME = "pdfs"
+"""the name of the cache in which exported PDFs are stored"""
+
+MAX_CACHED_PDFS = 256
+"""the maximum number of PDFs to keep in the cache"""
+
+MAX_CACHE_AGE = 7 * 24 * 60 * 60
+"""the number of seconds since a cached PDF was last used after which it is evicted"""
+
+T = TypeVar("T")
+
+_nbconvert_exporters = threading.local()
+"""the nbconvert exporters created in each thread, keyed by their class and configuration"""
+
 
 class ExportFailedException(Exception):
     """
@@ -29,6 +60,22 @@ class BaseExporter(ABC):
     class method ``BaseExporter.convert_notebook`` does the heavy lifting of converting a notebook
     file path into a PDF file.
 
+    If the ``cache`` option is set, exported PDFs are cached in the per-user ``pdfs`` cache
+    directory (see ``otter.utils.get_cache_dir``), or in the directory given by the ``cache_dir``
+    option, keyed by a hash of the notebook being rendered (after filtering), the local files it
+    references (e.g. images in Markdown cells), the exporter, and the options that affect the PDF.
+    Subclasses should use ``get_cache_dir``, ``get_cache_key``, ``load_cached_pdf``, and
+    ``cache_pdf`` to reuse a cached PDF instead of rendering the notebook again.
+
+    Notebooks with many large images can be slow to render and produce large PDFs. If the
+    ``max_image_size`` option is set, the images in the notebook's outputs are downscaled so that
+    neither dimension exceeds that many pixels and re-encoded more compactly before rendering; if
+    the ``dedupe_images`` option is set, image outputs identical to an earlier output are replaced
+    with a short note.
+
+    If the ``notebook`` option is set, that notebook is exported instead of the one read from the
+    notebook path, which is still used to resolve the files the notebook references.
+
     Attributes:
         default_options (``dict``): the default options for all exporters
     """
@@ -36,8 +83,16 @@ class BaseExporter(ABC):
     default_options = {
         "filtering": False,
         "pagebreaks": True,
+        "cache": False,
+        "cache_dir": None,
+        "max_image_size": None,
+        "dedupe_images": False,
+        "notebook": None,
     }
 
+    uncached_options = {"cache", "cache_dir", "notebook", "save_html", "save_tex"}
+    """the options that don't affect the PDF, and so aren't included in cache keys"""
+
     @classmethod
     @abstractmethod
     def convert_notebook(cls, nb_path: str, dest: str, **kwargs: Any):
@@ -51,9 +106,165 @@ class BaseExporter(ABC):
         """
         ...
 
+    @staticmethod
+    def get_nbconvert_exporter(exporter_class: type[T], **config: Any) -> T:
+        """
+        Return an instance of the nbconvert exporter class ``exporter_class`` created with the
+        configurations in ``config``.
+
+        Instances are reused by later calls in the same thread with the same arguments, so each
+        thread only loads an exporter's templates once. Instances aren't shared between threads
+        because nbconvert's exporters aren't thread-safe.
+
+        Args:
+            exporter_class (``type[nbconvert.Exporter]``): the exporter class
+            **config: configurations passed to the exporter's constructor
+
+        Returns:
+            ``nbconvert.Exporter``: the exporter
+        """
+        if not hasattr(_nbconvert_exporters, "cache"):
+            _nbconvert_exporters.cache = {}
+
+        key = (exporter_class, repr(sorted(config.items())))
+        if key not in _nbconvert_exporters.cache:
+            _nbconvert_exporters.cache[key] = exporter_class(**config)
+
+        return _nbconvert_exporters.cache[key]
+
+    @staticmethod
+    def get_cache_dir(options: dict[str, Any]) -> Optional[str]:
+        """
+        Get the directory in which to cache PDFs exported with the options ``options``, if any.
+
+        Args:
+            options (``dict[str, object]``): the exporter's options
+
+        Returns:
+            ``str | None``: the cache directory, or ``None`` if PDFs shouldn't be cached
+        """
+        if options["cache_dir"]:
+            return options["cache_dir"]
+
+        if not options["cache"]:
+            return None
+
+        try:
+            return get_cache_dir(PDF_CACHE_NAME)
+        except OSError:
+            LOGGER.debug("Could not create the PDF cache directory", exc_info=True)
+            return None
+
+    @classmethod
+    def get_cache_key(cls, nb: nbformat.NotebookNode, options: dict[str, Any], nb_dir: str) -> str:
+        """
+        Compute the key for the PDF of a notebook in the PDF cache.
+
+        Cell IDs and execution timing metadata are ignored since they don't affect the PDF. The
+        contents of the local files referenced by the notebook (see
+        ``otter.export.exporters.utils.get_referenced_files``) are included so that the PDF is
+        rendered again if they change. The versions of Otter and nbconvert are included so that
+        PDFs are regenerated when the templates change.
+
+        Args:
+            nb (``nbformat.NotebookNode``): the notebook being exported, after filtering
+            options (``dict[str, object]``): the exporter's options
+            nb_dir (``str``): the directory relative to which the files referenced by the notebook
+                are resolved
+
+        Returns:
+            ``str``: the cache key
+        """
+        import nbconvert
+
+        cells = []
+        for cell in nb.get("cells", []):
+            cell = {k: v for k, v in cell.items() if k != "id"}
+            cell["metadata"] = {
+                k: v for k, v in cell.get("metadata", {}).items() if k != "execution"
+            }
+            cells.append(cell)
+
+        files = {}
+        for path in sorted(get_referenced_files(nb)):
+            try:
+                with open(os.path.join(nb_dir, path), "rb") as f:
+                    files[path] = hashlib.sha256(f.read()).hexdigest()
+            except OSError:
+                files[path] = None
+
+        data = {
+            "exporter": f"{cls.__module__}.{cls.__qualname__}",
+            "options": {k: v for k, v in options.items() if k not in cls.uncached_options},
+            "notebook": {**nb, "cells": cells},
+            "files": files,
+            "otter": __version__,
+            "nbconvert": nbconvert.__version__,
+        }
+        encoded = json.dumps(data, sort_keys=True, default=repr).encode("utf-8")
+        return hashlib.sha256(encoded).hexdigest()
+
+    @staticmethod
+    def load_cached_pdf(cache_dir: str, key: str, dest: str) -> bool:
+        """
+        Copy the PDF with key ``key`` in the PDF cache to ``dest``, if there is one.
+
+        Args:
+            cache_dir (``str``): the cache directory
+            key (``str``): the cache key
+            dest (``str``): the path at which to write the PDF
+
+        Returns:
+            ``bool``: whether the PDF was in the cache
+        """
+        cached_path = os.path.join(cache_dir, f"{key}.pdf")
+        try:
+            shutil.copyfile(cached_path, dest)
+
+            # mark the PDF as recently used
+            os.utime(cached_path)
+
+        except FileNotFoundError:
+            return False
+
+        return True
+
+    @staticmethod
+    def cache_pdf(cache_dir: str, key: str, pdf_path: str):
+        """
+        Add the PDF at ``pdf_path`` to the PDF cache with key ``key``. Stale PDFs are evicted from
+        the cache whenever a new one is added.
+
+        Errors writing to the cache are logged and ignored, since the PDF has already been
+        exported.
+
+        Args:
+            cache_dir (``str``): the cache directory; created if it doesn't exist
+            key (``str``): the cache key
+            pdf_path (``str``): the path to the PDF
+        """
+        cached_path = os.path.join(cache_dir, f"{key}.pdf")
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            with open(pdf_path, "rb") as f:
+                write_file_atomically(cached_path, f.read())
+
+            evict_cache_entries(
+                cache_dir, max_entries=MAX_CACHED_PDFS, max_age=MAX_CACHE_AGE, keep=cached_path
+            )
+
+        except OSError:
+            LOGGER.debug("Could not cache exported PDF", exc_info=True)
+
     @classmethod
     def load_notebook(
-        cls, nb_path: str, filtering: bool = False, pagebreaks: bool = True
+        cls,
+        nb_path: str,
+        filtering: bool = False,
+        pagebreaks: bool = True,
+        max_image_size: Optional[int] = None,
+        dedupe_images: bool = False,
+        notebook: Optional[nbformat.NotebookNode] = None,
     ) -> nbformat.NotebookNode:
         """
         Loads notebook at ``nb_path`` with nbformat and returns the parsed notebookly filtered
@@ -64,14 +275,27 @@ class BaseExporter(ABC):
             filtering (``bool``): whetheer cells should be filtered
             pagebreaks (``bool``): whether to include pagebreaks between each question; ignored
                 if ``filtering`` is ``False``
+            max_image_size (``int | None``): the maximum width and height of images in the
+                notebook, in pixels; if specified, images are downscaled and re-encoded
+            dedupe_images (``bool``): whether to replace image outputs identical to an earlier
+                output with a short note
+            notebook (``nbformat.NotebookNode | None``): the notebook to use instead of reading it
+                from ``nb_path``; it is copied before being filtered
 
         Returns:
             ``nbformat.NotebookNode``: the parsed and (optionally) filtered notebook
         """
-        with open(nb_path, encoding="utf-8") as f:
-            notebook = nbformat.read(f, as_version=NBFORMAT_VERSION)
+        if notebook is not None:
+            notebook = copy.deepcopy(notebook)
+        else:
+            with open(nb_path, encoding="utf-8") as f:
+                notebook = nbformat.read(f, as_version=NBFORMAT_VERSION)
         if filtering:
             notebook = cls.filter_cells(notebook, pagebreaks=pagebreaks)
+        if dedupe_images:
+            notebook = dedupe_image_outputs(notebook)
+        if max_image_size is not None:
+            notebook = shrink_images(notebook, max_image_size)
         return notebook
 
     @classmethod
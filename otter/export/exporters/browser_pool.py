@@ -0,0 +1,246 @@
+"""A shared headless browser for rendering HTML to PDFs"""
+
+import asyncio
+import contextlib
+import os
+import tempfile
+import threading
+
+from typing import Any, Coroutine, Optional, TypeVar
+
+from ...logging import get_logger
+
+
+LOGGER = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+class BrowserPool:
+    """
+    A headless Chromium browser with a pool of pages for rendering HTML documents to PDFs.
+
+    Launching Chromium is the slowest part of exporting a notebook via HTML, so the pool launches
+    the browser once and reuses its pages for every document it renders. The browser is driven by
+    Playwright's async API on an event loop running in a background thread, so ``render`` can be
+    called from any thread (and from several threads at once); at most ``size`` documents are
+    rendered concurrently.
+
+    The pool can be used as a context manager, which starts the browser on entry and closes it on
+    exit.
+
+    Args:
+        size (``int``): the number of pages in the pool
+        browser_args (``list[str] | None``): additional arguments to pass to Chromium
+        disable_sandbox (``bool``): whether to disable Chromium's sandbox, which is required in
+            most containers
+    """
+
+    size: int
+    """the number of pages in the pool"""
+
+    browser_args: list[str]
+    """additional arguments to pass to Chromium"""
+
+    _loop: Optional[asyncio.AbstractEventLoop]
+    """the event loop that the browser is driven from"""
+
+    _thread: Optional[threading.Thread]
+    """the thread running the event loop"""
+
+    _playwright: Any
+    """the Playwright instance"""
+
+    _browser: Any
+    """the Chromium browser"""
+
+    _pages: "Optional[asyncio.Queue[Any]]"
+    """the pages that aren't currently rendering a document"""
+
+    def __init__(
+        self,
+        size: int = 4,
+        browser_args: Optional[list[str]] = None,
+        disable_sandbox: bool = False,
+    ):
+        if size < 1:
+            raise ValueError("size must be positive")
+
+        self.size = size
+        self.browser_args = list(browser_args or [])
+        if disable_sandbox:
+            self.browser_args.append("--no-sandbox")
+
+        self._loop = None
+        self._thread = None
+        self._playwright = None
+        self._browser = None
+        self._pages = None
+
+    @property
+    def running(self) -> bool:
+        """whether the browser has been started and not yet closed"""
+        return self._browser is not None
+
+    def __enter__(self) -> "BrowserPool":
+        self.start()
+        return self
+
+    def __exit__(self, *args: Any):
+        self.close()
+
+    def _run(self, coro: Coroutine[Any, Any, T]) -> T:
+        """
+        Run a coroutine on the pool's event loop and wait for its result.
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def start(self):
+        """
+        Launch the browser and open the pool's pages.
+
+        Raises:
+            ``RuntimeError``: if Playwright isn't installed or Chromium couldn't be launched
+        """
+        if self.running:
+            return
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+
+        try:
+            self._run(self._start())
+        except BaseException:
+            self._stop_loop()
+            raise
+
+    async def _start(self):
+        try:
+            from playwright.async_api import async_playwright
+        except ModuleNotFoundError as e:
+            raise RuntimeError(
+                "Playwright is not installed; please install it by running 'pip install playwright'"
+            ) from e
+
+        LOGGER.debug(f"Launching Chromium with {self.size} pages")
+        self._playwright = await async_playwright().start()
+        try:
+            self._browser = await self._playwright.chromium.launch(
+                handle_sigint=False,
+                handle_sigterm=False,
+                handle_sighup=False,
+                args=self.browser_args,
+            )
+        except Exception as e:
+            await self._playwright.stop()
+            self._playwright = None
+            raise RuntimeError(
+                "No suitable version of chromium was found; please install chromium by running "
+                "'playwright install chromium'"
+            ) from e
+
+        self._pages = asyncio.Queue()
+        for _ in range(self.size):
+            self._pages.put_nowait(await self._new_page())
+
+    async def _new_page(self) -> Any:
+        page = await self._browser.new_page()
+        await page.emulate_media(media="print")
+        return page
+
+    def close(self):
+        """
+        Close the browser and stop the pool's event loop.
+        """
+        if not self.running:
+            return
+
+        try:
+            self._run(self._close())
+        finally:
+            self._stop_loop()
+
+    async def _close(self):
+        LOGGER.debug("Closing Chromium")
+        browser, playwright = self._browser, self._playwright
+        self._browser, self._playwright, self._pages = None, None, None
+        try:
+            await browser.close()
+        finally:
+            await playwright.stop()
+
+    def _stop_loop(self):
+        """
+        Stop the event loop and wait for its thread to finish.
+        """
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._loop, self._thread = None, None
+
+    def render(self, html: str, *, paginate: bool = True, page_render_timeout: int = 100) -> bytes:
+        """
+        Render an HTML document to a PDF using one of the pool's pages, waiting for a page to
+        become available if they are all in use.
+
+        Args:
+            html (``str``): the HTML document
+            paginate (``bool``): whether to split the PDF into pages; if false, the PDF has a single
+                page as tall as the document
+            page_render_timeout (``int``): the time to wait for the page to render before
+                converting it to a PDF, in milliseconds
+
+        Returns:
+            ``bytes``: the PDF
+
+        Raises:
+            ``RuntimeError``: if the pool hasn't been started
+        """
+        if not self.running:
+            raise RuntimeError("The browser pool has not been started")
+
+        # write the HTML to a file so that the browser can load it like nbconvert's WebPDFExporter
+        # does; the file is closed before the browser loads it so that this works on Windows
+        fd, path = tempfile.mkstemp(suffix=".html")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(html.encode("utf-8"))
+
+            return self._run(self._render(path, paginate, page_render_timeout))
+
+        finally:
+            os.remove(path)
+
+    async def _render(self, path: str, paginate: bool, page_render_timeout: int) -> bytes:
+        page = await self._pages.get()
+        try:
+            await page.goto(f"file://{path}", wait_until="networkidle")
+            await page.wait_for_timeout(page_render_timeout)
+
+            pdf_params: dict[str, Any] = {"print_background": True}
+            if not paginate:
+                dimensions = await page.evaluate(
+                    """() => {
+                        const rect = document.body.getBoundingClientRect();
+                        return {
+                            width: Math.ceil(rect.width) + 1,
+                            height: Math.ceil(rect.height) + 1,
+                        }
+                    }"""
+                )
+                # 200 inches is the maximum page size for Adobe Acrobat Reader
+                pdf_params["width"] = min(dimensions["width"], 200 * 72)
+                pdf_params["height"] = min(dimensions["height"], 200 * 72)
+
+            return await page.pdf(**pdf_params)
+
+        except Exception:
+            # replace the page in case the error left it in a bad state
+            with contextlib.suppress(Exception):
+                await page.close()
+            page = await self._new_page()
+            raise
+
+        finally:
+            self._pages.put_nowait(page)
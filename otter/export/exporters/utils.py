@@ -1,6 +1,12 @@
 """Utilities for Otter Export exporters"""
 
+import base64
+import binascii
+import hashlib
+import io
+import nbformat
 import re
+import urllib.parse
 
 
 BEGIN_QUESTION_REGEX = r"<!--\s*BEGIN QUESTION\s*-->"
@@ -9,6 +15,14 @@ NEW_PAGE_REGEX = r"<!--\s*NEW PAGE\s*-->"
 NEW_PAGE_MARKER = "#newpage"
 NEW_PAGE_CELL_SOURCE = f"<!-- {NEW_PAGE_MARKER} -->"
 NEW_PAGE_CLASS_NAME = "otter-page-break-after"
+IMAGE_MIME_TYPES = {"image/png": "PNG", "image/jpeg": "JPEG"}
+DUPLICATE_IMAGE_TEXT = "[image omitted: identical to an earlier output]"
+FILE_REFERENCE_REGEXES = [
+    r"!\[[^\]]*\]\(\s*<?([^)\s>]+)",  # Markdown images
+    r"^\s{0,3}\[[^\]]+\]:\s*<?([^\s>]+)",  # Markdown link reference definitions
+    r"<(?:img|source|embed)\b[^>]*?\ssrc\s*=\s*[\"']([^\"']+)[\"']",  # HTML sources
+    r"\\(?:includegraphics|input|include)\s*(?:\[[^\]]*\])?\s*\{([^}]+)\}",  # LaTeX files
+]
 
 
 def has_begin(line: str) -> bool:
@@ -69,3 +83,173 @@ def sub_end_for_new_page(line: str) -> str:
         ``str``: the line with the end question match substituted for the newpage comment
     """
     return re.sub(END_QUESTION_REGEX, NEW_PAGE_CELL_SOURCE, line)
+
+
+def shrink_image(data: str, mime_type: str, max_size: int) -> str:
+    """
+    Downscale a base64-encoded image so that neither of its dimensions is larger than ``max_size``
+    pixels and re-encode it.
+
+    PNGs with at most 256 colors (which includes most plots) are converted to palette images, and
+    the image is re-encoded with the encoder's optimizations enabled. The original image is
+    returned if it can't be decoded or if re-encoding it doesn't make it smaller.
+
+    Args:
+        data (``str``): the base64-encoded image
+        mime_type (``str``): the MIME type of the image; one of the keys of ``IMAGE_MIME_TYPES``
+        max_size (``int``): the maximum width and height of the image, in pixels
+
+    Returns:
+        ``str``: the base64-encoded image
+    """
+    from PIL import Image, UnidentifiedImageError
+
+    try:
+        raw = base64.b64decode(data)
+        image = Image.open(io.BytesIO(raw))
+        image.load()
+    except (binascii.Error, OSError, UnidentifiedImageError, ValueError):
+        return data
+
+    fmt = IMAGE_MIME_TYPES[mime_type]
+    if fmt == "PNG" and image.mode not in {"L", "RGB", "RGBA"}:
+        image = image.convert("RGBA")
+    elif fmt == "JPEG" and image.mode not in {"L", "RGB"}:
+        image = image.convert("RGB")
+
+    image.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
+    if fmt == "PNG" and image.getcolors(256) is not None:
+        image = image.convert("RGBA").quantize(256, method=Image.Quantize.FASTOCTREE)
+
+    buf = io.BytesIO()
+    image.save(buf, format=fmt, optimize=True)
+    if buf.tell() >= len(raw):
+        return data
+
+    return base64.b64encode(buf.getvalue()).decode("ascii")
+
+
+def _image_bundles(nb: nbformat.NotebookNode):
+    """
+    Yield the MIME bundles containing images in the notebook's outputs and cell attachments.
+    """
+    for cell in nb.get("cells", []):
+        for output in cell.get("outputs", []):
+            if "data" in output:
+                yield output["data"]
+        for bundle in cell.get("attachments", {}).values():
+            yield bundle
+
+
+def check_pillow_installed():
+    """
+    Check that Pillow, which is needed to downscale images, is installed.
+
+    Raises:
+        ``ImportError``: if Pillow isn't installed
+    """
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        raise ImportError(
+            "Pillow is required to downscale images but it could not be found; install it with "
+            "'pip install otter-grader[export]'"
+        )
+
+
+def shrink_images(nb: nbformat.NotebookNode, max_size: int) -> nbformat.NotebookNode:
+    """
+    Re-encode the PNG and JPEG images in a notebook's outputs and cell attachments with
+    ``shrink_image``, downscaling those larger than ``max_size`` pixels in either dimension, in
+    place.
+
+    Args:
+        nb (``nbformat.NotebookNode``): the notebook
+        max_size (``int``): the maximum width and height of images, in pixels
+
+    Returns:
+        ``nbformat.NotebookNode``: the notebook
+
+    Raises:
+        ``ImportError``: if Pillow isn't installed
+    """
+    check_pillow_installed()
+
+    for bundle in _image_bundles(nb):
+        for mime_type in IMAGE_MIME_TYPES:
+            if isinstance(bundle.get(mime_type), str):
+                bundle[mime_type] = shrink_image(bundle[mime_type], mime_type, max_size)
+
+    return nb
+
+
+def dedupe_image_outputs(nb: nbformat.NotebookNode) -> nbformat.NotebookNode:
+    """
+    Replace the image outputs in a notebook that are identical to an earlier output with a short
+    note, in place.
+
+    Only ``display_data`` and ``execute_result`` outputs whose data contains an image are
+    deduplicated; the note is a plain text output so that the notebook still renders the same way
+    otherwise.
+
+    Args:
+        nb (``nbformat.NotebookNode``): the notebook
+
+    Returns:
+        ``nbformat.NotebookNode``: the notebook
+    """
+    seen = set()
+    for cell in nb.get("cells", []):
+        for output in cell.get("outputs", []):
+            data = output.get("data", {})
+            if not any(m in data for m in IMAGE_MIME_TYPES):
+                continue
+
+            digest = hashlib.sha256(
+                "".join(f"{m}:{data[m]}" for m in sorted(data)).encode("utf-8")
+            ).hexdigest()
+            if digest in seen:
+                output["data"] = {"text/plain": DUPLICATE_IMAGE_TEXT}
+                output["metadata"] = {}
+            else:
+                seen.add(digest)
+
+    return nb
+
+
+def get_referenced_files(nb: nbformat.NotebookNode) -> set[str]:
+    """
+    Find the local files referenced by the Markdown cells and the HTML and Markdown outputs of a
+    notebook, like images that are rendered in the PDF.
+
+    URLs and cell attachments are ignored. The paths are returned as they are written in the
+    notebook, so relative paths are relative to the notebook's directory.
+
+    Args:
+        nb (``nbformat.NotebookNode``): the notebook
+
+    Returns:
+        ``set[str]``: the paths of the referenced files
+    """
+    texts = []
+    for cell in nb.get("cells", []):
+        if cell.get("cell_type") == "markdown":
+            texts.append(cell.get("source", ""))
+        for output in cell.get("outputs", []):
+            for mime_type in ["text/html", "text/markdown", "text/latex"]:
+                texts.append(output.get("data", {}).get(mime_type, ""))
+
+    paths = set()
+    for text in texts:
+        if isinstance(text, list):
+            text = "".join(text)
+
+        for regex in FILE_REFERENCE_REGEXES:
+            for match in re.finditer(regex, text, flags=re.IGNORECASE | re.MULTILINE):
+                path = match.group(1).strip()
+                if urllib.parse.urlsplit(path).scheme or path.startswith(("#", "//")):
+                    continue
+                paths.add(urllib.parse.unquote(path.split("#")[0].split("?")[0]))
+
+    paths.discard("")
+    return paths
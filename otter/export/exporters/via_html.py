@@ -2,9 +2,10 @@
 
 import os
 
-from typing import Any
+from typing import Any, Optional
 
 from .base_exporter import BaseExporter, TEMPLATE_DIR
+from .browser_pool import BrowserPool
 
 
 # nbconvert can't be used on jupyterlite, so try importing it and raise an error if it's not found
@@ -29,7 +30,23 @@ class PDFViaHTMLExporter(BaseExporter):
     default_options.update({"save_html": False, "template": "via_html"})
 
     @classmethod
-    def convert_notebook(cls, nb_path: str, dest: str, **kwargs: Any):
+    def convert_notebook(
+        cls, nb_path: str, dest: str, *, browser_pool: Optional[BrowserPool] = None, **kwargs: Any
+    ):
+        """
+        Convert the notebook at ``nb_path`` to a PDF at ``dest``.
+
+        If ``browser_pool`` is provided, the PDF is rendered by one of its pages; otherwise, a new
+        browser is launched to render it. If the ``save_html`` option is set, the HTML that is
+        rendered is also written next to ``dest`` with a ``.html`` extension, even if the PDF is
+        in the cache.
+
+        Args:
+            nb_path (``str``): the path to the notebook
+            dest (``str``): the path at which to write the PDF
+            browser_pool (``BrowserPool | None``): a running browser pool to render the PDF with
+            **kwargs: options that override the ``default_options`` of this exporter
+        """
         if nbconvert is None:
             raise _NBCONVERT_ERROR
 
@@ -37,17 +54,49 @@ class PDFViaHTMLExporter(BaseExporter):
         options.update(kwargs)
 
         nb = cls.load_notebook(
-            nb_path, filtering=options["filtering"], pagebreaks=options["pagebreaks"]
+            nb_path,
+            filtering=options["filtering"],
+            pagebreaks=options["pagebreaks"],
+            max_image_size=options["max_image_size"],
+            dedupe_images=options["dedupe_images"],
+            notebook=options["notebook"],
         )
 
-        nbconvert.TemplateExporter.extra_template_basedirs = [str(TEMPLATE_DIR)]
-        orig_template_name = nbconvert.TemplateExporter.template_name
-        nbconvert.TemplateExporter.template_name = options["template"]
+        # configure the template on the exporter instance instead of the class so that notebooks
+        # can be exported concurrently
+        exporter = cls.get_nbconvert_exporter(
+            nbconvert.WebPDFExporter,
+            template_name=options["template"],
+            extra_template_basedirs=[str(TEMPLATE_DIR)],
+        )
+
+        html = None
+        if options["save_html"]:
+            html, _ = nbconvert.HTMLExporter.from_notebook_node(exporter, nb)
+            with open(os.path.splitext(dest)[0] + ".html", "w+") as f:
+                f.write(html)
 
-        exporter = nbconvert.WebPDFExporter()
+        pdf_path = os.path.splitext(dest)[0] + ".pdf"
+        cache_dir, cache_key = cls.get_cache_dir(options), None
+        if cache_dir is not None:
+            cache_key = cls.get_cache_key(nb, options, os.path.dirname(os.path.abspath(nb_path)))
+            if cls.load_cached_pdf(cache_dir, cache_key, pdf_path):
+                return
 
         try:
-            pdf, _ = nbconvert.export(exporter, nb)
+            if browser_pool is not None:
+                if html is None:
+                    html, _ = nbconvert.HTMLExporter.from_notebook_node(exporter, nb)
+
+                pdf = browser_pool.render(
+                    html,
+                    paginate=exporter.paginate,
+                    page_render_timeout=exporter.page_render_timeout,
+                )
+
+            else:
+                pdf, _ = nbconvert.export(exporter, nb)
+
         except RuntimeError as e:
             # Replace nbconvert's error about installing chromium since their flag can't be passed
             # to Otter.
@@ -58,11 +107,11 @@ class PDFViaHTMLExporter(BaseExporter):
                 )
             raise e
 
-        pdf_path = os.path.splitext(dest)[0] + ".pdf"
         with open(pdf_path, "wb+") as f:
             if isinstance(pdf, str):
                 f.write(pdf.encode("utf-8"))
             else:
                 f.write(pdf)
 
-        nbconvert.TemplateExporter.template_name = orig_template_name
+        if cache_key is not None:
+            cls.cache_pdf(cache_dir, cache_key, pdf_path)
@@ -1,10 +1,13 @@
 """PDF via LaTeX exporter"""
 
 import os
+import shutil
+import subprocess
 import warnings
 
+from tempfile import TemporaryDirectory
 from textwrap import indent
-from typing import Any
+from typing import Any, Optional
 
 from .base_exporter import BaseExporter, ExportFailedException, TEMPLATE_DIR
 
@@ -21,7 +24,8 @@ except ImportError as e:
 
 class PDFViaLatexExporter(BaseExporter):
     """
-    An exporter that uses nbconvert's PDF exporter to convert notebooks to PDFs via LaTeX.
+    An exporter that uses nbconvert's LaTeX exporter to convert notebooks to LaTeX, which is then
+    compiled into a PDF with xelatex.
 
     Attributes:
         default_options (``dict``): the default options for this exporter
@@ -35,6 +39,112 @@ class PDFViaLatexExporter(BaseExporter):
         }
     )
 
+    latex_command = ["xelatex", "{filename}", "-quiet"]
+    """the command used to compile the LaTeX; ``{filename}`` is replaced by the LaTeX file"""
+
+    latex_count = 3
+    """the number of times the LaTeX is compiled so that references are resolved"""
+
+    bib_command = ["bibtex", "{filename}"]
+    """the command used to process the bibliography; ``{filename}`` is replaced by the file stem"""
+
+    @staticmethod
+    def run_command(
+        command: list[str], filename: str, count: int, cwd: str, env: dict[str, str]
+    ) -> Optional[str]:
+        """
+        Run the LaTeX command ``command`` on ``filename`` in ``cwd`` up to ``count`` times,
+        stopping if it fails.
+
+        Args:
+            command (``list[str]``): the command, in which ``{filename}`` is replaced by
+                ``filename``
+            filename (``str``): the name of the file to pass to the command
+            count (``int``): the number of times to run the command
+            cwd (``str``): the directory in which to run the command
+            env (``dict[str, str]``): the environment variables for the command
+
+        Returns:
+            ``str | None``: the output of the command if it failed, or ``None`` if it succeeded
+
+        Raises:
+            ``OSError``: if the command isn't installed
+        """
+        if shutil.which(command[0]) is None:
+            raise OSError(
+                f"{command[0]} not found on PATH, if you have not installed {command[0]} you may "
+                "need to do so. Find further instructions at "
+                "https://nbconvert.readthedocs.io/en/latest/install.html#installing-tex."
+            )
+
+        command = [c.format(filename=filename) for c in command]
+        for _ in range(count):
+            proc = subprocess.run(
+                command,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                stdin=subprocess.DEVNULL,
+                cwd=cwd,
+                env=env,
+            )
+            if proc.returncode:
+                return proc.stdout.decode("utf-8", "replace")
+
+        return None
+
+    @classmethod
+    def compile_latex(cls, latex: str, resources: dict[str, Any], texinputs: str) -> bytes:
+        """
+        Compile LaTeX produced by nbconvert's LaTeX exporter into a PDF.
+
+        The LaTeX and the files extracted from the notebook are written to a temporary directory,
+        in which xelatex and bibtex are run, so the working directory of the process isn't changed
+        and notebooks can be exported while other threads are running (e.g. while a submission is
+        being graded).
+
+        Args:
+            latex (``str``): the LaTeX
+            resources (``dict[str, object]``): the resources returned by the LaTeX exporter
+            texinputs (``str``): the directory in which to look for files referenced by the LaTeX
+                that weren't extracted from the notebook
+
+        Returns:
+            ``bytes``: the contents of the PDF
+
+        Raises:
+            ``nbconvert.exporters.pdf.LatexFailed``: if the PDF couldn't be compiled
+        """
+        env = os.environ.copy()
+        for var in ["TEXINPUTS", "BIBINPUTS", "BSTINPUTS"]:
+            env[var] = texinputs + os.pathsep + env.get(var, "")
+
+        with TemporaryDirectory() as td:
+            with open(os.path.join(td, "notebook.tex"), "w", encoding="utf-8") as f:
+                f.write(latex)
+
+            for filename, data in resources.get("outputs", {}).items():
+                path = os.path.join(td, filename)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, "wb") as f:
+                    f.write(data)
+
+            output = cls.run_command(cls.latex_command, "notebook.tex", cls.latex_count, td, env)
+            if output is not None:
+                raise nbconvert.exporters.pdf.LatexFailed(output)
+
+            # bibtex fails if there are no citations, in which case LaTeX doesn't need to be rerun
+            if cls.run_command(cls.bib_command, "notebook", 1, td, env) is None:
+                output = cls.run_command(cls.latex_command, "notebook.tex", 1, td, env)
+                if output is not None:
+                    raise nbconvert.exporters.pdf.LatexFailed(output)
+
+            pdf_path = os.path.join(td, "notebook.pdf")
+            if not os.path.isfile(pdf_path):
+                raise nbconvert.exporters.pdf.LatexFailed("xelatex did not produce a PDF")
+
+            with open(pdf_path, "rb") as f:
+                return f.read()
+
     @classmethod
     def convert_notebook(cls, nb_path: str, dest: str, *, xecjk: bool = False, **kwargs: Any):
         if nbconvert is None:
@@ -50,27 +160,51 @@ class PDFViaLatexExporter(BaseExporter):
             options["template"] = "via_latex_xecjk"
 
         nb = cls.load_notebook(
-            nb_path, filtering=options["filtering"], pagebreaks=options["pagebreaks"]
+            nb_path,
+            filtering=options["filtering"],
+            pagebreaks=options["pagebreaks"],
+            max_image_size=options["max_image_size"],
+            dedupe_images=options["dedupe_images"],
+            notebook=options["notebook"],
         )
 
-        nbconvert.TemplateExporter.extra_template_basedirs = [str(TEMPLATE_DIR)]
-        orig_template_name = nbconvert.TemplateExporter.template_name
-        nbconvert.TemplateExporter.template_name = options["template"]
-
-        if options["save_tex"]:
-            latex_exporter = nbconvert.LatexExporter()
+        # configure the template on the exporter instance instead of the class so that notebooks
+        # can be exported concurrently
+        latex_exporter = cls.get_nbconvert_exporter(
+            nbconvert.LatexExporter,
+            template_name=options["template"],
+            extra_template_basedirs=[str(TEMPLATE_DIR)],
+        )
 
-        pdf_exporter = nbconvert.PDFExporter()
+        # resolve files referenced by the notebook relative to its directory instead of the working
+        # directory, which may be changed by other threads while the notebook is being exported
+        nb_dir = os.path.dirname(os.path.abspath(nb_path))
 
         try:
+            cache_dir, cache_key, cached = cls.get_cache_dir(options), None, False
+            if cache_dir is not None:
+                cache_key = cls.get_cache_key(nb, options, nb_dir)
+                cached = cls.load_cached_pdf(cache_dir, cache_key, dest)
+
+            if cached and not options["save_tex"]:
+                return
+
+            latex, resources = nbconvert.export(
+                latex_exporter, nb, resources={"metadata": {"path": nb_dir}}
+            )
             if options["save_tex"]:
-                latex_output = nbconvert.export(latex_exporter, nb)
                 with open(os.path.splitext(dest)[0] + ".tex", "w+") as output_file:
-                    output_file.write(latex_output[0])
+                    output_file.write(latex)
+
+            if cached:
+                return
 
-            pdf_output = nbconvert.export(pdf_exporter, nb)
+            pdf = cls.compile_latex(latex, resources, nb_dir)
             with open(dest, "wb") as output_file:
-                output_file.write(pdf_output[0])
+                output_file.write(pdf)
+
+            if cache_key is not None:
+                cls.cache_pdf(cache_dir, cache_key, dest)
 
         except nbconvert.exporters.pdf.LatexFailed as error:
             message = "There was an error generating your LaTeX; showing full error message:\n"
@@ -82,6 +216,3 @@ class PDFViaLatexExporter(BaseExporter):
                     "xecjk set to True or the --xecjk flag."
                 )
             raise ExportFailedException(message)
-
-        finally:
-            nbconvert.TemplateExporter.template_name = orig_template_name
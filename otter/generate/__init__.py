@@ -6,17 +6,18 @@ import os
 import pathlib
 import re
 import yaml
-import zipfile
 
 from dataclasses import dataclass
 from glob import glob
 from jinja2 import Environment, PackageLoader
 from typing import Any, Literal, Optional, TYPE_CHECKING, Union
 
+from .lockfile import lock_environment, LOCKFILE_NAME
 from .token import APIClient
-from .utils import merge_conda_environments, zip_folder
+from .utils import merge_conda_environments, ReproducibleZipFile, zip_folder
 from ..plugins import PluginCollection
 from ..run import AutograderConfig
+from ..test_files.bundle import BUNDLE_FILENAME, create_bundle
 from ..utils import dump_yaml, load_default_file, OTTER_CONFIG_FILENAME
 from ..version import __version__
 
@@ -28,6 +29,9 @@ OTTER_ENV_NAME = "otter-env"
 OTTR_VERSION = "1.6.0"
 TEMPLATE_DIR = importlib.resources.files(__name__) / "templates"
 
+EXECUTABLE_TEMPLATES = {"run_autograder", "setup.sh"}
+"""the templates that are executable in the autograder zip file"""
+
 
 @dataclass
 class CondaEnvironment:
@@ -135,6 +139,8 @@ def main(
     plugin_collection: Optional[PluginCollection] = None,
     python_version: Optional[str] = None,
     channel_priority_strict: bool = True,
+    lock: bool = False,
+    relock: bool = False,
 ):
     """
     Run Otter Generate.
@@ -161,6 +167,10 @@ def main(
         python_version (``str | None``): the version of Python to use (installed with conda)
         channel_priority_strict (``bool``): whether to set conda's channel_priority to strict in
             the ``setup.sh`` file
+        lock (``bool``): whether to resolve the grading environment into a lockfile that
+            ``setup.sh`` installs without solving the environment; requires conda-lock
+        relock (``bool``): whether to resolve the grading environment again instead of using a
+            cached lockfile; implies ``lock``
 
     Raises:
         ``FileNotFoundError``: if the specified Otter configuration JSON file could not be found
@@ -238,6 +248,7 @@ def main(
         "channel_priority_strict": channel_priority_strict,
         "has_r_requirements": False,
         "miniforge_version": MINIFORGE_VERSION,
+        "lockfile": None,
     }
 
     if plugin_collection is None:
@@ -281,6 +292,15 @@ def main(
         user_environment,
     )
 
+    lockfile = None
+    if lock or relock:
+        # nb_conda_kernels is installed separately when the environment isn't locked, so it's added
+        # to the locked environment to avoid solving the environment again
+        locked_environment = conda_environment.to_dict()
+        locked_environment["dependencies"].append("nb_conda_kernels")
+        lockfile = lock_environment(locked_environment, refresh=relock)
+        template_context["lockfile"] = LOCKFILE_NAME
+
     rendered = {}
     for fn, template in templates.items():
         rendered[fn] = template.render(**template_context)
@@ -288,20 +308,29 @@ def main(
     if os.path.exists(output_path):
         os.remove(output_path)
 
-    with zipfile.ZipFile(output_path, mode="w") as zf:
+    with ReproducibleZipFile(output_path) as zf:
         for fn, contents in rendered.items():
-            zf.writestr(fn, contents)
+            zf.writestr(fn, contents, executable=fn in EXECUTABLE_TEMPLATES)
 
         arc_test_dir = "tests"
         pattern = lang_config["test_file_pattern"]
-        for file in glob(os.path.join(tests_dir, pattern)):
+        test_files = glob(os.path.join(tests_dir, pattern))
+        for file in test_files:
             zf.write(file, arcname=os.path.join(arc_test_dir, os.path.basename(file)))
 
+        # bundle the pre-compiled tests so that they don't need to be parsed for each submission
+        bundle = create_bundle(test_files) if ag_config.lang == "python" else None
+        if bundle is not None:
+            zf.writestr(os.path.join(arc_test_dir, BUNDLE_FILENAME), bundle)
+
         if r_requirements is not None:
             zf.writestr("requirements.r", r_requirements)
 
         zf.writestr("environment.yml", conda_environment.to_str())
 
+        if lockfile is not None:
+            zf.writestr(LOCKFILE_NAME, lockfile)
+
         zf.writestr(OTTER_CONFIG_FILENAME, json.dumps(otter_config, indent=2))
 
         # copy files into zip file
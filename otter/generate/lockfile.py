@@ -0,0 +1,86 @@
+"""Lockfiles for grading environments"""
+
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+
+from typing import Any
+
+from ..logging import get_logger
+from ..utils import dump_yaml, get_cache_dir, write_file_atomically
+
+
+LOGGER = get_logger(__name__)
+
+LOCKFILE_NAME = "conda-lock.yml"
+"""the name of the lockfile in the autograder zip file"""
+
+LOCK_PLATFORMS = ["linux-64", "linux-aarch64"]
+"""the platforms for which environments are locked"""
+
+LOCKFILE_CACHE_NAME = "locks"
+"""the name of the cache in which lockfiles are stored"""
+
+
+def lock_environment(environment: dict[str, Any], refresh: bool = False) -> str:
+    """
+    Resolve a conda environment into a lockfile with
+    `conda-lock <https://github.com/conda/conda-lock>`_.
+
+    The lockfile pins the exact packages (including pip packages) to install on each platform in
+    ``LOCK_PLATFORMS``, so that the environment can be created without solving it. Lockfiles are
+    cached in the per-user ``locks`` cache directory (see ``otter.utils.get_cache_dir``) by a hash
+    of the environment, so each environment is only resolved once unless ``refresh`` is true.
+
+    Args:
+        environment (``dict[str, object]``): the conda environment
+        refresh (``bool``): whether to resolve the environment again instead of using the cached
+            lockfile, e.g. to pick up newer package versions
+
+    Returns:
+        ``str``: the contents of the lockfile
+
+    Raises:
+        ``RuntimeError``: if conda-lock isn't installed or fails to resolve the environment
+    """
+    key = hashlib.sha256(
+        json.dumps([environment, LOCK_PLATFORMS], sort_keys=True).encode("utf-8")
+    ).hexdigest()
+    cache_path = os.path.join(get_cache_dir(LOCKFILE_CACHE_NAME), f"{key[:16]}-{LOCKFILE_NAME}")
+    if not refresh and os.path.isfile(cache_path):
+        LOGGER.info("Using cached lockfile for the grading environment")
+        with open(cache_path) as f:
+            return f.read()
+
+    if shutil.which("conda-lock") is None:
+        raise RuntimeError(
+            "Locking the grading environment requires conda-lock; install it with "
+            "'pip install conda-lock'"
+        )
+
+    LOGGER.info("Resolving the grading environment with conda-lock")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        env_path = os.path.join(temp_dir, "environment.yml")
+        lock_path = os.path.join(temp_dir, LOCKFILE_NAME)
+        with open(env_path, "w") as f:
+            f.write(dump_yaml(environment, indent=2))
+
+        cmd = ["conda-lock", "lock", "--file", env_path, "--lockfile", lock_path]
+        for platform in LOCK_PLATFORMS:
+            cmd += ["--platform", platform]
+
+        proc = subprocess.run(cmd, capture_output=True, text=True)
+        if proc.returncode != 0:
+            raise RuntimeError(
+                f"conda-lock failed to resolve the grading environment:\n{proc.stderr}"
+            )
+
+        with open(lock_path) as f:
+            lockfile = f.read()
+
+    write_file_atomically(cache_path, lockfile)
+
+    return lockfile
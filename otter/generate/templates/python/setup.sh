@@ -33,8 +33,8 @@ export PATH=/root/miniforge3/bin:$PATH
 export TAR="/bin/tar"
 
 # install dependencies with mamba
-mamba env create -f {{ autograder_dir }}/source/environment.yml
-mamba install -n otter-env -c conda-forge nb_conda_kernels
+{% if lockfile %}mamba create -y -n {{ otter_env_name }} -f {{ autograder_dir }}/source/{{ lockfile }}{% else %}mamba env create -f {{ autograder_dir }}/source/environment.yml
+mamba install -n otter-env -c conda-forge nb_conda_kernels{% endif %}
 mamba run -n {{ otter_env_name }} bash -c "playwright install-deps && playwright install chromium"
 
 # set mamba shell
@@ -26,8 +26,8 @@ export TAR="/bin/tar"
 
 # install dependencies with mamba{% if channel_priority_strict %}
 mamba config set channel_priority strict{% endif %}
-mamba env create -f {{ autograder_dir }}/source/environment.yml
-mamba install -n {{ otter_env_name }} -c conda-forge nb_conda_kernels
+{% if lockfile %}mamba create -y -n {{ otter_env_name }} -f {{ autograder_dir }}/source/{{ lockfile }}{% else %}mamba env create -f {{ autograder_dir }}/source/environment.yml
+mamba install -n {{ otter_env_name }} -c conda-forge nb_conda_kernels{% endif %}
 mamba run -n {{ otter_env_name }} bash -c "playwright install-deps && playwright install chromium"{% if has_r_requirements %}
 mamba run -n {{ otter_env_name }} Rscript {{ autograder_dir }}/source/requirements.r{% endif %}
 
@@ -1,19 +1,162 @@
 """Utilities for Otter Generate"""
 
+import hashlib
 import os
+import shutil
+import stat
 import zipfile
 
 from typing import Any, Optional, Union
 
 
+MANIFEST_FILENAME = "MANIFEST.sha256"
+"""the name of the manifest of file hashes in autograder zip files"""
+
+ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+"""the modification time given to every entry in autograder zip files"""
+
+DIGEST_COMMENT_PREFIX = "sha256:"
+"""the prefix of the digest stored in the comment of autograder zip files"""
+
+
+class ReproducibleZipFile:
+    """
+    A zip file whose bytes only depend on the names, contents, and executability of its files.
+
+    Files are collected by ``write`` and ``writestr`` and the zip file is written when it is closed.
+    The entries are sorted by name, have a fixed modification time, and have their permissions
+    normalized to ``644`` (or ``755`` for executables). A manifest of the SHA-256 hash of each file
+    is added to the zip file in the format used by ``sha256sum``, and the hash of the manifest is
+    stored in the zip file's comment as a digest of its contents (see ``get_zip_digest``).
+
+    Args:
+        path (``str``): the path at which to write the zip file
+    """
+
+    path: str
+    """the path at which to write the zip file"""
+
+    _entries: dict[str, tuple[Union[str, bytes], bool]]
+    """maps the names of the files in the zip file to their contents or the paths to read their
+    contents from and whether they are executable"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._entries = {}
+
+    def __enter__(self) -> "ReproducibleZipFile":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+
+    def write(self, filename: str, arcname: Optional[str] = None):
+        """
+        Add a file to the zip file. The file is executable in the zip file if it is executable by
+        its owner.
+
+        Args:
+            filename (``str``): the path to the file
+            arcname (``str | None``): the name of the file in the zip file; defaults to
+                ``filename``
+        """
+        executable = bool(os.stat(filename).st_mode & stat.S_IXUSR)
+        self._entries[self._normalize(arcname or filename)] = (filename, executable)
+
+    def writestr(self, arcname: str, data: Union[str, bytes], executable: bool = False):
+        """
+        Add a file with the specified contents to the zip file.
+
+        Args:
+            arcname (``str``): the name of the file in the zip file
+            data (``str | bytes``): the contents of the file; strings are encoded as UTF-8
+            executable (``bool``): whether the file is executable
+        """
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        self._entries[self._normalize(arcname)] = (data, executable)
+
+    @staticmethod
+    def _normalize(arcname: str) -> str:
+        """
+        Normalize the name of a file in the zip file in the same way as ``zipfile.ZipInfo``.
+        """
+        arcname = os.path.normpath(os.path.splitdrive(arcname)[1])
+        return arcname.replace(os.sep, "/").lstrip("/")
+
+    def _hash(self, arcname: str) -> str:
+        """
+        Compute the SHA-256 hash of the contents of a file in the zip file.
+        """
+        contents = self._entries[arcname][0]
+        if isinstance(contents, bytes):
+            return hashlib.sha256(contents).hexdigest()
+
+        sha = hashlib.sha256()
+        with open(contents, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                sha.update(chunk)
+        return sha.hexdigest()
+
+    def close(self):
+        """
+        Write the zip file.
+        """
+        self._entries.pop(MANIFEST_FILENAME, None)
+        manifest = "".join(f"{self._hash(n)}  {n}\n" for n in sorted(self._entries))
+        self.writestr(MANIFEST_FILENAME, manifest)
+
+        with zipfile.ZipFile(self.path, mode="w") as zf:
+            digest = hashlib.sha256(manifest.encode("utf-8")).hexdigest()
+            zf.comment = f"{DIGEST_COMMENT_PREFIX}{digest}".encode("utf-8")
+
+            for arcname in sorted(self._entries):
+                contents, executable = self._entries[arcname]
+                info = zipfile.ZipInfo(arcname, date_time=ZIP_DATE_TIME)
+                info.create_system = 3  # unix, so that the permissions are used on all platforms
+                info.external_attr = (stat.S_IFREG | (0o755 if executable else 0o644)) << 16
+
+                if isinstance(contents, bytes):
+                    zf.writestr(info, contents)
+                else:
+                    with open(contents, "rb") as src, zf.open(info, "w") as dst:
+                        shutil.copyfileobj(src, dst, 1 << 20)
+
+
+def get_zip_digest(path: str) -> Optional[str]:
+    """
+    Get the digest of the contents of an autograder zip file written by Otter Generate.
+
+    The digest is read from the zip file's comment, so none of its files need to be read. Two
+    autograder zip files have the same digest if and only if they contain the same files.
+
+    Args:
+        path (``str``): the path to the zip file
+
+    Returns:
+        ``str | None``: the hex digest, or ``None`` if the zip file doesn't have one
+    """
+    with zipfile.ZipFile(path) as zf:
+        comment = zf.comment.decode("utf-8", errors="replace")
+
+    if not comment.startswith(DIGEST_COMMENT_PREFIX):
+        return None
+
+    return comment[len(DIGEST_COMMENT_PREFIX) :]
+
+
 def zip_folder(
-    zf: zipfile.ZipFile, path: str, prefix: str = "", exclude: Optional[list[str]] = None
+    zf: Union[zipfile.ZipFile, ReproducibleZipFile],
+    path: str,
+    prefix: str = "",
+    exclude: Optional[list[str]] = None,
 ):
     """
     Recursively add the contents of a directory into a ``zipfile.ZipFile``.
 
     Args:
-        zf (``zipfile.ZipFile``): the open zip file object to add to
+        zf (``zipfile.ZipFile | ReproducibleZipFile``): the open zip file object to add to
         path (``str``): an absolute path to the directory to add to the zip file
         prefix (``str``): a prefix to add to the basename of the path for the archive name
     """
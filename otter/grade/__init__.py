@@ -9,7 +9,14 @@ from multiprocessing import Queue
 from typing import Optional, Union
 
 from .containers import launch_containers
-from .utils import merge_scores_to_df, prune_images, SCORES_DICT_PERCENT_CORRECT_KEY
+from .utils import (
+    merge_cell_profiles_to_df,
+    merge_scores_to_df,
+    merge_test_case_timings_to_df,
+    prune_images,
+    SCORES_DICT_PERCENT_CORRECT_KEY,
+    summarize_cell_profiles,
+)
 from .. import logging
 from ..run import AutograderConfig
 from ..utils import assert_path_exists
@@ -31,6 +38,8 @@ def main(
     no_kill: bool = False,
     image: str = "ubuntu:22.04",
     pdfs: bool = False,
+    cell_profiles: bool = False,
+    test_timings: bool = False,
     prune: bool = False,
     force: bool = False,
     timeout: Optional[int] = None,
@@ -46,6 +55,12 @@ def main(
     inside the Docker containers are copied into a subdirectory of ``output_dir`` called
     ``submission_pdfs``.
 
+    If ``cell_profiles`` is true, the execution time and memory usage of each cell of each
+    submission are written to ``cell_profiles.csv`` in ``output_dir``, and these are aggregated
+    across submissions for each cell in ``cell_profiles_summary.csv``. If ``test_timings`` is true,
+    the execution time and memory usage of each test case for each submission are written to
+    ``test_case_timings.csv`` in ``output_dir``.
+
     If ``prune`` is true, Otter's dangling grading images are pruned and the program exits.
 
     Args:
@@ -60,6 +75,8 @@ def main(
         no_kill (``bool``): whether to keep containers after grading is finished
         image (``str``): a Docker image to use as the base image for the grading image
         pdfs (``bool``): whether to copy notebook PDFs out of the containers
+        cell_profiles (``bool``): whether to write the execution profiles of submission cells
+        test_timings (``bool``): whether to write the execution profiles of test cases
         prune (``bool``): whether to prune the grading images; if true, no grading is performed
         force (``bool``): whether to force-prune the images (do not ask for confirmation)
         timeout (``int | None``): an execution timeout in seconds for each container
@@ -161,6 +178,17 @@ def main(
             with open(grading_summary_path / f"{nb_name}.txt", mode="w") as f:
                 f.write(s.summary())
 
+    # write cell execution profiles to CSV files
+    if cell_profiles:
+        profiles_df = merge_cell_profiles_to_df(scores)
+        profiles_df.to_csv(out / "cell_profiles.csv", index=False)
+        summarize_cell_profiles(profiles_df).to_csv(out / "cell_profiles_summary.csv", index=False)
+
+    # write test case timings to a CSV file
+    if test_timings:
+        timings_df = merge_test_case_timings_to_df(scores)
+        timings_df.to_csv(out / "test_case_timings.csv", index=False)
+
     # return percentage if a single file was graded
     if len(paths) == 1 and os.path.isfile(paths[0]):
         return output_df[SCORES_DICT_PERCENT_CORRECT_KEY][1]
@@ -1,5 +1,6 @@
 """Docker container management for Otter Grade"""
 
+import hashlib
 import importlib.resources
 import json
 import os
@@ -9,12 +10,13 @@ import tempfile
 import zipfile
 
 from concurrent.futures import as_completed, ThreadPoolExecutor
+from glob import glob
 from python_on_whales import docker
 from textwrap import indent
 from typing import Any, Optional
 
 from . import __name__ as pkg_name
-from .utils import OTTER_DOCKER_IMAGE_NAME, TimeoutException
+from .utils import OTTER_DOCKER_IMAGE_NAME, OTTER_ENV_DOCKER_IMAGE_NAME, TimeoutException
 from .. import logging
 from ..run import AutograderConfig
 from ..test_files import GradingResults
@@ -23,11 +25,123 @@ from ..utils import format_exception, OTTER_CONFIG_FILENAME
 
 LOGGER = logging.get_logger(__name__)
 
+ENV_DOCKERFILE_NAME = "Dockerfile.env"
+"""the name of the Dockerfile used to build environment images"""
+
+
+def _docker_build(context_dir: str, dockerfile: str, image: str, build_args: dict[str, str]):
+    """
+    Build a Docker image.
+
+    Args:
+        context_dir (``str``): the path to the build context
+        dockerfile (``str``): the name of the Dockerfile in this package to build
+        image (``str``): the tag to give the image
+        build_args (``dict[str, str]``): the build arguments
+
+    Raises:
+        ``TypeError``: if the build fails because Docker isn't running
+    """
+    try:
+        docker.build(
+            context_dir,
+            build_args=build_args,
+            tags=[image],
+            file=str(importlib.resources.files(pkg_name) / dockerfile),
+            load=True,
+        )
+    except TypeError as e:
+        raise TypeError(
+            f"Docker build failed; if this is your first time seeing this error, ensure that "
+            f"Docker is running on your machine.\n\nOriginal error: {e}"
+        )
+
+
+def get_environment_files(ag_dir: str) -> list[str]:
+    """
+    Get the names of the files in an extracted autograder zip file that are used to set up the
+    grading environment.
+
+    Args:
+        ag_dir (``str``): the path to the extracted autograder zip file
+
+    Returns:
+        ``list[str]``: the sorted names of the files
+    """
+    files = ["setup.sh", "environment.yml", "conda-lock.yml"]
+    files += [os.path.basename(f) for f in glob(os.path.join(ag_dir, "requirements.*"))]
+    return sorted(f for f in files if os.path.isfile(os.path.join(ag_dir, f)))
+
+
+def get_environment_image(ag_dir: str, base_image: str) -> str:
+    """
+    Get the tag of the environment image for an extracted autograder zip file.
+
+    The tag is a hash of the base image, the Dockerfile used to build environment images, and the
+    files used to set up the grading environment, so assignments with the same environment share an
+    image.
+
+    Args:
+        ag_dir (``str``): the path to the extracted autograder zip file
+        base_image (``str``): the base Docker image
+
+    Returns:
+        ``str``: the tag of the environment image
+    """
+    sha = hashlib.sha256()
+    sha.update(base_image.encode("utf-8") + b"\0")
+    sha.update((importlib.resources.files(pkg_name) / ENV_DOCKERFILE_NAME).read_bytes() + b"\0")
+    for file in get_environment_files(ag_dir):
+        with open(os.path.join(ag_dir, file), "rb") as f:
+            contents = f.read()
+        sha.update(file.encode("utf-8") + b"\0")
+        sha.update(hashlib.sha256(contents).digest())
+
+    return OTTER_ENV_DOCKER_IMAGE_NAME + ":" + sha.hexdigest()[:16]
+
+
+def build_environment_image(ag_dir: str, base_image: str) -> str:
+    """
+    Build the environment image for an extracted autograder zip file if it doesn't already exist.
+
+    The environment image runs ``setup.sh`` on top of the base image, which installs the grading
+    environment. It is tagged with a hash of its inputs by ``get_environment_image`` so that it is
+    reused by any assignment with the same environment.
+
+    Args:
+        ag_dir (``str``): the path to the extracted autograder zip file
+        base_image (``str``): the base Docker image
+
+    Returns:
+        ``str``: the tag of the environment image
+    """
+    image = get_environment_image(ag_dir, base_image)
+    if docker.image.exists(image):
+        LOGGER.info(f"Using existing environment image {image}")
+        return image
+
+    LOGGER.info(f"Building environment image {image} using {base_image} as base image")
+
+    # only the environment files are included in the build context so that the image doesn't
+    # depend on the rest of the autograder zip file
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for file in get_environment_files(ag_dir):
+            shutil.copyfile(os.path.join(ag_dir, file), os.path.join(temp_dir, file))
+
+        _docker_build(temp_dir, ENV_DOCKERFILE_NAME, image, {"BASE_IMAGE": base_image})
+
+    return image
+
 
 def build_image(ag_zip_path: str, base_image: str, tag: str, config: AutograderConfig) -> str:
     """
     Creates a grading image based on the autograder zip file and attaches a tag.
 
+    The grading image is built on top of the environment image for the autograder zip file (see
+    ``build_environment_image``), which is only built if an assignment with the same environment
+    hasn't been graded before, and only adds the assignment's tests, configurations, and support
+    files.
+
     Args:
         ag_zip_path (``str``): path to the autograder zip file
         base_image (``str``): base Docker image to build from
@@ -39,9 +153,6 @@ def build_image(ag_zip_path: str, base_image: str, tag: str, config: AutograderC
         ``str``: the tag of the newly-build Docker image
     """
     image = OTTER_DOCKER_IMAGE_NAME + ":" + tag
-    dockerfile_path = str(importlib.resources.files(pkg_name) / "Dockerfile")
-
-    LOGGER.info(f"Building image using {base_image} as base image")
 
     with tempfile.TemporaryDirectory() as temp_dir:
         with zipfile.ZipFile(ag_zip_path, "r") as zip_ref:
@@ -57,19 +168,10 @@ def build_image(ag_zip_path: str, base_image: str, tag: str, config: AutograderC
         old_config.update(config.get_user_config())
         config_path.write_text(json.dumps(old_config.get_user_config()))
 
-        try:
-            docker.build(
-                temp_dir,
-                build_args={"BASE_IMAGE": base_image},
-                tags=[image],
-                file=dockerfile_path,
-                load=True,
-            )
-        except TypeError as e:
-            raise TypeError(
-                f"Docker build failed; if this is your first time seeing this error, ensure that "
-                f"Docker is running on your machine.\n\nOriginal error: {e}"
-            )
+        env_image = build_environment_image(temp_dir, base_image)
+
+        LOGGER.info(f"Building image using {env_image} as base image")
+        _docker_build(temp_dir, "Dockerfile", image, {"ENV_IMAGE": env_image})
 
     return image
 
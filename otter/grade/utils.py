@@ -11,6 +11,8 @@ from ..test_files import GradingResults
 
 OTTER_DOCKER_IMAGE_NAME = "otter-grade"
 
+OTTER_ENV_DOCKER_IMAGE_NAME = "otter-grade-env"
+
 POINTS_POSSIBLE_LABEL = "points-per-question"
 
 SCORES_DICT_FILE_KEY = "file"
@@ -67,9 +69,9 @@ def merge_csv(dataframes: list[pd.DataFrame]) -> pd.DataFrame:
 
 def prune_images(force: bool = False):
     """
-    Prunes all Docker images named ``otter-grade``.
+    Prunes all Docker images named ``otter-grade`` or ``otter-grade-env``.
     """
-    images = docker.images(OTTER_DOCKER_IMAGE_NAME)
+    images = docker.images(OTTER_DOCKER_IMAGE_NAME) + docker.images(OTTER_ENV_DOCKER_IMAGE_NAME)
     print("The following images will be deleted:")
     for image in images:
         print(f"    {image.repo_tags[0]}")
@@ -177,3 +179,116 @@ def merge_scores_to_df(scores: list[GradingResults]) -> pd.DataFrame:
     ]
 
     return output_df
+
+
+def merge_test_case_timings_to_df(scores: list[GradingResults]) -> pd.DataFrame:
+    """
+    Convert the test case results of a list of ``GradingResults`` objects to a dataframe of test
+    case timings with one row per test case of each submission.
+
+    Args:
+        scores (``list[otter.test_files.GradingResults]``): the score objects to merge
+
+    Returns:
+        ``pd.DataFrame``: the test case timings dataframe
+    """
+    rows = []
+    for gr in scores:
+        for tf in gr.results.values():
+            for tcr in tf.test_case_results:
+                rows.append(
+                    {
+                        SCORES_DICT_FILE_KEY: gr.file,
+                        "test_file": tf.name,
+                        "test_case": tcr.test_case.name,
+                        "hidden": tcr.test_case.hidden,
+                        "passed": tcr.passed,
+                        "wall_time": tcr.wall_time,
+                        "peak_rss_delta": tcr.peak_rss_delta,
+                    }
+                )
+
+    df = pd.DataFrame(
+        rows,
+        columns=[
+            SCORES_DICT_FILE_KEY,
+            "test_file",
+            "test_case",
+            "hidden",
+            "passed",
+            "wall_time",
+            "peak_rss_delta",
+        ],
+    )
+    return df.astype({"peak_rss_delta": "Int64"})
+
+
+def merge_cell_profiles_to_df(scores: list[GradingResults]) -> pd.DataFrame:
+    """
+    Convert the cell execution profiles of a list of ``GradingResults`` objects to a dataframe
+    with one row per executed cell of each submission.
+
+    Cells added to the notebook by Otter have no value in the ``cell_index`` column. Results
+    without cell profiles (e.g. because grading failed or the submission was not a notebook) are
+    skipped.
+
+    Args:
+        scores (``list[otter.test_files.GradingResults]``): the score objects to merge
+
+    Returns:
+        ``pd.DataFrame``: the cell profiles dataframe
+    """
+    rows = []
+    for gr in scores:
+        for p in gr.cell_profiles or []:
+            rows.append(
+                {
+                    SCORES_DICT_FILE_KEY: gr.file,
+                    "cell_index": p.submission_index,
+                    "executed_cell_index": p.index,
+                    "wall_time": p.wall_time,
+                    "peak_rss_delta": p.peak_rss_delta,
+                    "errored": p.errored,
+                }
+            )
+
+    df = pd.DataFrame(
+        rows,
+        columns=[
+            SCORES_DICT_FILE_KEY,
+            "cell_index",
+            "executed_cell_index",
+            "wall_time",
+            "peak_rss_delta",
+            "errored",
+        ],
+    )
+    return df.astype({"cell_index": "Int64", "peak_rss_delta": "Int64"})
+
+
+def summarize_cell_profiles(profiles_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Aggregate a cell profiles dataframe created by ``merge_cell_profiles_to_df`` across submissions
+    for each submission cell.
+
+    Cells added to the notebook by Otter are not included in the summary.
+
+    Args:
+        profiles_df (``pd.DataFrame``): the cell profiles dataframe
+
+    Returns:
+        ``pd.DataFrame``: the summary dataframe, with one row per submission cell index
+    """
+    grouped = profiles_df.dropna(subset=["cell_index"]).groupby("cell_index")
+    summary_df = pd.DataFrame(
+        {
+            "submissions": grouped[SCORES_DICT_FILE_KEY].count(),
+            "mean_wall_time": grouped["wall_time"].mean(),
+            "median_wall_time": grouped["wall_time"].median(),
+            "p95_wall_time": grouped["wall_time"].quantile(0.95),
+            "max_wall_time": grouped["wall_time"].max(),
+            "max_peak_rss_delta": grouped["peak_rss_delta"].max(),
+            "errors": grouped["errored"].sum(),
+        }
+    )
+    return summary_df.reset_index()
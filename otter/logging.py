@@ -1,9 +1,11 @@
 import logging
-import logging.handlers
+import pickle
+import socket
+import struct
 
 from contextlib import contextmanager
 from multiprocessing import Queue
-from typing import Optional
+from typing import Any, Optional
 
 
 ERROR = logging.ERROR
@@ -29,16 +31,26 @@ _handlers: list[logging.Handler] = [_handler]
 _handler.setFormatter(logging.Formatter("[%(levelname)s %(name)s.%(funcName)s] %(message)s"))
 
 
-def send_logs(host: str, port: int):
+def send_logs(host: str, port: Optional[int] = None):
     """
-    Add a ``SocketHandler`` to all loggers that sends their logs to a TCP socket at the
-    specified host and port.
+    Add a ``BatchSocketHandler`` to all loggers that sends their logs to a log collector listening
+    at the specified address.
+
+    If ``port`` is ``None``, ``host`` is the path to a unix domain socket; otherwise, the logs are
+    sent to a TCP socket at the specified host and port. If this is called in an IPython kernel, the
+    buffered logs are sent after each cell is run.
     """
-    socket_handler = logging.handlers.SocketHandler(host, port)
+    socket_handler = BatchSocketHandler(host, port)
     _handlers.append(socket_handler)
     for logger in _instances.values():
         logger.addHandler(socket_handler)
 
+    from IPython.core.getipython import get_ipython
+
+    ipython = get_ipython()
+    if ipython is not None:
+        ipython.events.register("post_run_cell", lambda *args: socket_handler.flush())
+
 
 def get_logger(name: str) -> logging.Logger:
     """
@@ -183,3 +195,114 @@ class QueueLoggingHandler(logging.Handler):
             self.log_queue.put(log_entry)
         except Exception:
             self.handleError(record)
+
+
+class BatchSocketHandler(logging.Handler):
+    """
+    A logging handler that buffers log records and sends them in batches to a socket.
+
+    Each batch is sent as a 4-byte big-endian length followed by a pickled list of the ``dict``
+    representations of the records. The buffer is sent when it reaches ``capacity`` records, when a
+    record at level ``WARNING`` or higher is emitted, and when the handler is flushed or closed.
+    Batches that can't be sent are dropped.
+
+    Args:
+        host (``str``): the host of the TCP socket or the path to the unix domain socket
+        port (``int | None``): the port of the TCP socket, or ``None`` for a unix domain socket
+        capacity (``int``): the maximum number of records to buffer
+    """
+
+    address: Any
+    """the address of the socket"""
+
+    capacity: int
+    """the maximum number of records to buffer"""
+
+    buffer: list[dict[str, Any]]
+    """the records waiting to be sent"""
+
+    _socket: Optional[socket.socket]
+    """the connection to the socket"""
+
+    def __init__(self, host: str, port: Optional[int] = None, capacity: int = 100):
+        super().__init__()
+        self.address = host if port is None else (host, port)
+        self.capacity = capacity
+        self.buffer = []
+        self._socket = None
+
+    def _make_record_dict(self, record: logging.LogRecord) -> dict[str, Any]:
+        """
+        Convert a ``LogRecord`` to a picklable ``dict`` that can be passed to
+        ``logging.makeLogRecord``.
+        """
+        if record.exc_info:
+            # format the record to cache the traceback text on it
+            self.format(record)
+
+        d = dict(record.__dict__)
+        d["msg"] = record.getMessage()
+        d["args"] = None
+        d["exc_info"] = None
+        d.pop("message", None)
+        return d
+
+    def _connect(self) -> socket.socket:
+        """
+        Open a connection to the socket.
+        """
+        if isinstance(self.address, str):
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                sock.connect(self.address)
+            except OSError:
+                sock.close()
+                raise
+            return sock
+
+        return socket.create_connection(self.address)
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            self.buffer.append(self._make_record_dict(record))
+            if len(self.buffer) >= self.capacity or record.levelno >= logging.WARNING:
+                self.flush()
+        except Exception:
+            self.handleError(record)
+
+    def flush(self):
+        self.acquire()
+        try:
+            if not self.buffer:
+                return
+
+            data = pickle.dumps(self.buffer, 1)
+            self.buffer = []
+
+            if self._socket is None:
+                self._socket = self._connect()
+            self._socket.sendall(struct.pack(">L", len(data)) + data)
+
+        except OSError:
+            self._close_socket()
+
+        finally:
+            self.release()
+
+    def _close_socket(self):
+        """
+        Close the connection to the socket, if it is open.
+        """
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+
+    def close(self):
+        self.acquire()
+        try:
+            self.flush()
+            self._close_socket()
+        finally:
+            self.release()
+
+        super().close()
@@ -5,12 +5,38 @@ import nbformat as nbf
 
 from typing import Any, Optional
 
-from .utils import NOTEBOOK_METADATA_KEY
+from .utils import JSONObjectScanner, NOTEBOOK_METADATA_KEY
 
 
 OK_FORMAT_VARNAME = "OK_FORMAT"
 
 
+def read_notebook_metadata(nb_path: str) -> dict[str, Any]:
+    """
+    Read the top-level metadata of the notebook at ``nb_path`` without loading its cells.
+
+    The notebook JSON is streamed, and only the ``metadata`` object is decoded, which keeps the
+    latency and memory usage of this function small even for notebooks with large outputs. The
+    notebook is not validated against the notebook format schema.
+
+    Args:
+        nb_path (``str``): the path to the notebook
+
+    Returns:
+        ``dict[str, object]``: the notebook metadata
+
+    Raises:
+        ``ValueError``: if the notebook is not a valid JSON object
+    """
+    with open(nb_path, "rb") as f:
+        metadata = JSONObjectScanner(f).get("metadata", {})
+
+    if not isinstance(metadata, dict):
+        raise ValueError(f"Notebook metadata is not an object: {nb_path}")
+
+    return metadata
+
+
 class NBMetadataConfig(fica.Config):
     """
     The configurations stored in a notebook's metadata.
@@ -74,3 +100,13 @@ class NBMetadataConfig(fica.Config):
         Create a :py:class:`NBMetadataConfig` from a notebook object.
         """
         return cls(nb.get("metadata", {}).get(NOTEBOOK_METADATA_KEY, {}))
+
+    @classmethod
+    def from_notebook_path(cls, nb_path: str) -> "NBMetadataConfig":
+        """
+        Create a :py:class:`NBMetadataConfig` from the notebook at ``nb_path``.
+
+        Only the notebook's metadata is read from the file (see :py:func:`read_notebook_metadata`),
+        so this is much cheaper than reading the notebook with ``nbformat``.
+        """
+        return cls(read_notebook_metadata(nb_path).get(NOTEBOOK_METADATA_KEY, {}))
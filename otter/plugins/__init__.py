@@ -2,16 +2,27 @@
 Grading plugins for Otter
 """
 
+import copy
 import importlib
 import nbformat
+import threading
+import time
 
-from typing import Any, TypeVar, Union
+from typing import Any, Callable, Optional, TypeVar, Union
 
-from .abstract_plugin import AbstractOtterPlugin, PluginEventNotSupportedException
+from .abstract_plugin import (
+    AbstractOtterPlugin,
+    PluginEventNotSupportedException,
+    PluginTimeoutError,
+)
+from ..logging import get_logger
 from ..utils import format_full_width
 
 
-__all__ = ["AbstractOtterPlugin", "PluginCollection"]
+__all__ = ["AbstractOtterPlugin", "PluginCollection", "PluginTimeoutError"]
+
+
+LOGGER = get_logger(__name__)
 
 
 _PluginConfigType = list[Union[str, dict[str, Any]]]
@@ -41,6 +52,29 @@ class PluginCollection:
             ]
         }
 
+    Each call to a plugin event is timed; the total time spent in each event of each plugin is
+    available in ``timings`` and logged (but not included in the report returned by
+    ``generate_report``). A plugin's configuration can set a time budget in seconds for each of its
+    events with the ``time_budget`` key. An event that runs longer than its budget is abandoned and
+    the plugin's remaining events are skipped. If the plugin's ``catch_timeout`` configuration is
+    false, a ``PluginTimeoutError`` is raised instead. An abandoned event can't be stopped and keeps
+    running in a daemon thread, so events with a budget are passed deep copies of their arguments;
+    changes the event makes to them are copied back to the original arguments only if the event
+    finishes within its budget.
+
+    .. code-block:: json
+
+        {
+            "plugins": [
+                {
+                    "some_otter_plugin_package.SomeOtterPlugin": {
+                        "time_budget": 10,
+                        "catch_timeout": true
+                    }
+                }
+            ]
+        }
+
     Args:
         plugin_names (``list[str | dict[str, Any]]``): the importable names of plugin classes (e.g.
             ``some_package.SomePlugin``) and their configurations
@@ -60,6 +94,12 @@ class PluginCollection:
     _subm_meta: dict[str, Any]
     """the submission metadata if running on Gradescope"""
 
+    _timings: dict[str, dict[str, float]]
+    """the total time in seconds spent in each event of each plugin, keyed by plugin name"""
+
+    _timed_out: set[str]
+    """the names of plugins whose events are skipped because one exceeded its time budget"""
+
     def __init__(
         self, plugins: _PluginConfigType, submission_path: str, submission_metadata: dict[str, Any]
     ):
@@ -68,12 +108,35 @@ class PluginCollection:
         self._subm_path = submission_path
         self._subm_meta = submission_metadata
 
+        self._timings = {}
+        self._timed_out = set()
+
         self._plugins = self._load_plugins(
             self._plugin_config, submission_path, submission_metadata
         )
 
     @staticmethod
-    def _parse_plugin_config(plugin_config: _PluginConfigType) -> list[dict[str, Any]]:
+    def _validate_time_budget(plugin: str, config: Any):
+        """
+        Check that the ``time_budget`` configuration of a plugin, if any, is a positive number of
+        seconds.
+
+        Args:
+            plugin (``str``): the importable name of the plugin
+            config (``Any``): the plugin's configurations
+
+        Raises:
+            ``ValueError``: if the time budget is invalid
+        """
+        if not isinstance(config, dict) or config.get("time_budget") is None:
+            return
+
+        budget = config["time_budget"]
+        if isinstance(budget, bool) or not isinstance(budget, (int, float)) or budget <= 0:
+            raise ValueError(f"Invalid time budget for plugin {plugin}: {budget!r}")
+
+    @classmethod
+    def _parse_plugin_config(cls, plugin_config: _PluginConfigType) -> list[dict[str, Any]]:
         if not isinstance(plugin_config, list):
             raise ValueError(f"Invalid plugin config: {plugin_config}")
 
@@ -90,6 +153,7 @@ class PluginCollection:
                 keys = list(plg.keys())
                 if not len(keys) == 1:
                     raise ValueError(f"Invalid plugin specification: {plg}")
+                cls._validate_time_budget(keys[0], plg[keys[0]])
                 result.append(
                     {
                         "plugin": keys[0],
@@ -154,6 +218,170 @@ class PluginCollection:
         self._plugin_config.extend(plg_cfg)
         self._plugins.extend(self._load_plugins(plg_cfg, self._subm_path, self._subm_meta))
 
+    @property
+    def timings(self) -> dict[str, dict[str, float]]:
+        """
+        The total time in seconds spent in each event of each plugin, keyed by plugin name and then
+        by event name. Only events that a plugin supports are included.
+        """
+        return {p: dict(t) for p, t in self._timings.items()}
+
+    def _get_config(self, index: int) -> dict[str, Any]:
+        """
+        Get the configurations of the plugin at index ``index``, or an empty dictionary if they
+        aren't a dictionary.
+        """
+        config = self._plugin_config[index]["config"]
+        return config if isinstance(config, dict) else {}
+
+    @staticmethod
+    def _copy_back(original: Any, copied: Any):
+        """
+        Apply the changes made to a deep copy of an object to the original object in place.
+        Objects that can't be updated in place (e.g. strings) are left as-is.
+
+        Args:
+            original (``Any``): the original object
+            copied (``Any``): the deep copy of ``original``
+        """
+        if original is copied:
+            return
+
+        if isinstance(original, (dict, set)):
+            original.clear()
+            original.update(copied)
+
+        elif isinstance(original, list):
+            original[:] = copied
+
+        elif hasattr(original, "__dict__") and type(original) is type(copied):
+            original.__dict__.clear()
+            original.__dict__.update(copied.__dict__)
+
+    @classmethod
+    def _run_with_budget(
+        cls,
+        method: Callable[..., Any],
+        budget: float,
+        args: tuple[Any, ...],
+        kwargs: dict[str, Any],
+    ) -> Any:
+        """
+        Run a plugin event on deep copies of its arguments with a time budget, copying any changes
+        made to the arguments back to them if the event finishes within its budget. Because an
+        event that exceeds its budget keeps running in the background, it never has access to the
+        original arguments.
+
+        Args:
+            method (``Callable[..., Any]``): the plugin method for the event
+            budget (``float``): the time budget in seconds
+            args (``tuple[Any, ...]``): positional arguments for the method
+            kwargs (``dict[str, Any]``): keyword arguments for the method
+
+        Returns:
+            ``Any``: the value returned by the method
+
+        Raises:
+            ``PluginTimeoutError``: if the method doesn't finish within the budget
+        """
+        copied_args, copied_kwargs = copy.deepcopy((args, kwargs))
+        value = cls._run_in_thread(method, budget, copied_args, copied_kwargs)
+
+        for original, copied in zip(
+            (*args, *kwargs.values()), (*copied_args, *copied_kwargs.values())
+        ):
+            cls._copy_back(original, copied)
+
+        return value
+
+    @staticmethod
+    def _run_in_thread(
+        method: Callable[..., Any], budget: float, args: tuple[Any, ...], kwargs: dict[str, Any]
+    ) -> Any:
+        """
+        Run a plugin event in a daemon thread and wait at most ``budget`` seconds for it to finish.
+
+        Args:
+            method (``Callable[..., Any]``): the plugin method for the event
+            budget (``float``): the time budget in seconds
+            args (``tuple[Any, ...]``): positional arguments for the method
+            kwargs (``dict[str, Any]``): keyword arguments for the method
+
+        Returns:
+            ``Any``: the value returned by the method
+
+        Raises:
+            ``PluginTimeoutError``: if the method doesn't finish within the budget
+        """
+        result = {}
+
+        def target():
+            try:
+                result["value"] = method(*args, **kwargs)
+            except BaseException as e:
+                result["error"] = e
+
+        thread = threading.Thread(target=target, daemon=True)
+        thread.start()
+        thread.join(budget)
+        if thread.is_alive():
+            raise PluginTimeoutError(f"exceeded its time budget of {budget}s")
+
+        if "error" in result:
+            raise result["error"]
+
+        return result["value"]
+
+    def _run_event(self, index: int, event: str, *args: Any, **kwargs: Any) -> Any:
+        """
+        Run the method ``event`` of the plugin at index ``index``, recording the time it takes and
+        enforcing the plugin's time budget.
+
+        Args:
+            index (``int``): the index of the plugin in this collection
+            event (``str``): name of the method of the plugin to run
+            *args, **kwargs (any): arguments for the method
+
+        Returns:
+            ``Any``: the value returned by the plugin
+
+        Raises:
+            ``PluginEventNotSupportedException``: if the plugin doesn't support the event or its
+                events are being skipped
+            ``PluginTimeoutError``: if the event exceeds the plugin's time budget and the plugin's
+                ``catch_timeout`` configuration is false
+        """
+        plugin, name = self._plugins[index], self._plugin_names[index]
+        if name in self._timed_out or not hasattr(plugin, event):
+            raise PluginEventNotSupportedException()
+
+        config = self._get_config(index)
+        method, budget = getattr(plugin, event), config.get("time_budget")
+        start = time.perf_counter()
+        try:
+            if budget is None:
+                return method(*args, **kwargs)
+            return self._run_with_budget(method, budget, args, kwargs)
+
+        except PluginEventNotSupportedException:
+            start = None
+            raise
+
+        except PluginTimeoutError as e:
+            self._timed_out.add(name)
+            if not config.get("catch_timeout", True):
+                raise PluginTimeoutError(f"Plugin {name} event {event} {e}") from None
+
+            LOGGER.warning(f"Plugin {name} event {event} {e}; skipping its remaining events")
+            raise PluginEventNotSupportedException()
+
+        finally:
+            if start is not None:
+                elapsed = time.perf_counter() - start
+                timings = self._timings.setdefault(name, {})
+                timings[event] = timings.get(event, 0) + elapsed
+                LOGGER.debug(f"Plugin {name} event {event} ran in {elapsed:.3f}s")
+
     def run(self, event: str, *args: Any, **kwargs: Any):
         """
         Runs the method ``event`` of each plugin in this collection. Passes ``args`` and ``kwargs``
@@ -168,13 +396,9 @@ class PluginCollection:
             ``list[Any]``: the values returned by each plugin for the called event
         """
         rets = []
-        for plugin in self._plugins:
+        for i in range(len(self._plugins)):
             try:
-                if hasattr(plugin, event):
-                    ret = getattr(plugin, event)(*args, **kwargs)
-                    rets.append(ret)
-                else:
-                    rets.append(None)
+                rets.append(self._run_event(i, event, *args, **kwargs))
             except PluginEventNotSupportedException:
                 rets.append(None)
         return rets
@@ -190,24 +414,49 @@ class PluginCollection:
         Returns:
             ``str | nbformat.NotebookNode``: the transformed submission
         """
-        event = "before_execution"
-        for plugin in self._plugins:
+        for i in range(len(self._plugins)):
             try:
-                if hasattr(plugin, event):
-                    submission = getattr(plugin, event)(submission)
+                submission = self._run_event(i, "before_execution", submission)
             except PluginEventNotSupportedException:
                 pass
         return submission
 
+    def format_timings(self) -> str:
+        """
+        Format the time spent in each event of each plugin, noting plugins whose events were
+        skipped because they exceeded their time budget.
+
+        Returns:
+            ``str``: the formatted timings
+        """
+        lines = []
+        for plg in self._plugin_names:
+            if plg not in self._timings:
+                continue
+
+            lines.append(f"{plg}:")
+            for event, elapsed in self._timings[plg].items():
+                lines.append(f"    {event}: {elapsed:.3f}s")
+
+            if plg in self._timed_out:
+                lines.append("    (exceeded its time budget; remaining events skipped)")
+
+        return "\n".join(lines)
+
     def generate_report(self) -> str:
         """
         Runs the ``generate_report`` event of each plugin, formatting and concatenating them into a
-        single string and returning it.
+        single string and returning it. The time spent in each plugin's events is logged.
 
         Returns:
             ``str``: the plugin report
         """
         reports = self.run("generate_report")
+
+        timings = self.format_timings()
+        if timings:
+            LOGGER.info(f"Plugin timings:\n{timings}")
+
         if not any(isinstance(r, str) for r in reports):
             return ""
 
@@ -11,6 +11,12 @@ class PluginEventNotSupportedException(Exception):
     """
 
 
+class PluginTimeoutError(Exception):
+    """
+    Exception raised when a plugin event runs longer than the plugin's time budget.
+    """
+
+
 class AbstractOtterPlugin(ABC):
     """
     Abstract base class for Otter plugins to inherit from. Includes the following methods:
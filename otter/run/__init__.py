@@ -10,6 +10,7 @@ import zipfile
 
 from typing import Optional
 
+from .cache import clone_tree, copy_extracted_autograder
 from .run_autograder import AutograderConfig, capture_run_output, main as run_autograder_main
 from ..test_files import GradingResults
 
@@ -25,6 +26,7 @@ def main(
     no_logo: bool = False,
     debug: bool = False,
     extra_submission_files: Optional[list[str]] = None,
+    no_cache: bool = False,
 ) -> GradingResults:
     """
     Grades a single submission using the autograder configuration ``autograder`` without
@@ -34,15 +36,25 @@ def main(
     Calls the autograder and loads the pickled results object. **Note:** This does not run any setup
     or installation files, so the user's environment will need to have everything pre-installed.
 
+    Autograder zip files are extracted once into a cache keyed by the hash of their contents (see
+    ``otter.run.cache``), and the ``source`` directory of each submission's grading directory is
+    cloned from the cached extraction (using copy-on-write clones where the filesystem supports
+    them), so grading several submissions with the same autograder doesn't repeatedly extract its
+    files and submissions can't modify the cached files. Autograder directories are cloned into
+    the ``source`` directory in the same way.
+
     Args:
         submission (``str``): path to a submission to grade
-        autograder (``str``): path to an Otter configuration zip file
+        autograder (``str``): path to an Otter configuration zip file or to a directory containing
+            the extracted contents of one
         output_dir (``str | None``): directory at which to copy the results JSON file; if ``None``,
             the results JSON file is not copied
         no_logo (``bool``): whether to suppress the Otter logo from being printed to stdout
         debug (``bool``); whether to run in debug mode (without ignoring errors)
         extra_submission_files (``list[str] | None``): extra files to copy into the submission
             directory; this should really only be used internally by Otter, so use at your own risk
+        no_cache (``bool``): whether to extract the autograder zip file directly instead of using
+            the cache of extracted autograders
 
     Returns:
         ``otter.test_files.GradingResults``: the grading results object
@@ -59,9 +71,16 @@ def main(
         with open(os.path.join(ag_dir, "submission_metadata.json"), "w+") as f:
             json.dump({}, f)
 
-        ag_zip = zipfile.ZipFile(autograder)
-        ag_zip.extractall(os.path.join(ag_dir, "source"))
-        ag_zip.close()
+        if os.path.isdir(autograder):
+            clone_tree(autograder, os.path.join(ag_dir, "source"))
+
+        elif not no_cache:
+            copy_extracted_autograder(autograder, os.path.join(ag_dir, "source"))
+
+        else:
+            ag_zip = zipfile.ZipFile(autograder)
+            ag_zip.extractall(os.path.join(ag_dir, "source"))
+            ag_zip.close()
 
         if os.path.splitext(submission)[1] == ".zip":
             subm_zip = zipfile.ZipFile(submission)
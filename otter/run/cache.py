@@ -0,0 +1,246 @@
+"""A cache of extracted autograder zip files for Otter Run"""
+
+import hashlib
+import os
+import shutil
+import sys
+import tempfile
+import zipfile
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any, Callable, Optional
+
+from ..logging import get_logger
+from ..utils import CACHE_TEMP_PREFIX, clone_file, evict_cache_entries, get_cache_dir
+
+
+LOGGER = get_logger(__name__)
+
+AUTOGRADER_CACHE_NAME = "autograders"
+"""the name of the cache in which extracted autograder zip files are stored"""
+
+MAX_CACHED_AUTOGRADERS = 8
+"""the maximum number of extracted autograder zip files to keep in the cache"""
+
+MAX_CACHE_AGE = 7 * 24 * 60 * 60
+"""the number of seconds since an extraction was last used after which it is evicted"""
+
+LOCK_FILENAME = ".otter-cache-lock"
+"""the name of the file in each extraction that is locked while the extraction is in use"""
+
+
+def hash_file(path: str) -> str:
+    """
+    Compute the SHA-256 hash of the contents of a file.
+
+    Args:
+        path (``str``): the path to the file
+
+    Returns:
+        ``str``: the hex digest of the file's contents
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def get_extracted_autograder(zip_path: str, cache_dir: Optional[str] = None) -> str:
+    """
+    Return the path to a directory containing the extracted contents of an autograder zip file.
+
+    Extractions are stored in ``cache_dir`` keyed by the hash of the zip file's contents, so a zip
+    file is only extracted the first time it is used. Zip files are extracted into a temporary
+    directory that is then renamed into place, so concurrent processes never see a partial
+    extraction. Stale extractions are evicted from the cache whenever a new one is added.
+
+    The returned directory is shared and must not be modified, and it may be evicted by another
+    process at any time; use ``copy_extracted_autograder`` to create a working copy of it.
+
+    Args:
+        zip_path (``str``): the path to the autograder zip file
+        cache_dir (``str | None``): the cache directory; defaults to the per-user
+            ``autograders`` cache directory (see ``otter.utils.get_cache_dir``)
+
+    Returns:
+        ``str``: the path to the extracted autograder
+    """
+    cache_dir = cache_dir or get_cache_dir(AUTOGRADER_CACHE_NAME)
+    os.makedirs(cache_dir, exist_ok=True)
+
+    path = os.path.join(cache_dir, hash_file(zip_path))
+    if os.path.isdir(path):
+        LOGGER.debug(f"Using cached autograder extraction: {path}")
+        # mark the extraction as recently used
+        os.utime(path)
+        return path
+
+    LOGGER.debug(f"Extracting autograder zip file to cache: {path}")
+    temp_path = tempfile.mkdtemp(prefix=CACHE_TEMP_PREFIX, dir=cache_dir)
+    try:
+        with zipfile.ZipFile(zip_path) as zf:
+            zf.extractall(temp_path)
+
+        open(os.path.join(temp_path, LOCK_FILENAME), "w").close()
+        os.rename(temp_path, path)
+
+    except OSError:
+        # another process may have finished extracting the same zip file first
+        shutil.rmtree(temp_path, ignore_errors=True)
+        if not os.path.isdir(path):
+            raise
+
+    evict_stale_autograders(cache_dir, keep=path)
+    return path
+
+
+@contextmanager
+def _lock_extraction(path: str, exclusive: bool = False) -> Iterator[bool]:
+    """
+    Lock an extraction with ``flock`` on its lock file. Shared locks are held while an extraction is
+    being copied and exclusive locks while it is being evicted, so that extractions in use are
+    never evicted.
+
+    Shared locks block until they are acquired; exclusive locks don't. The context manager yields
+    whether the lock was acquired on the extraction currently at ``path``, which isn't the case if
+    the extraction was evicted before the lock was acquired. On platforms without ``flock``, no
+    lock is taken.
+
+    Args:
+        path (``str``): the path to the extraction
+        exclusive (``bool``): whether to take an exclusive lock
+
+    Returns:
+        ``Iterator[bool]``: whether the extraction is locked
+    """
+    lock_path = os.path.join(path, LOCK_FILENAME)
+    try:
+        f = open(lock_path, "rb")
+    except FileNotFoundError:
+        yield False
+        return
+
+    with f:
+        if sys.platform == "win32":
+            yield True
+            return
+
+        import fcntl
+
+        try:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB if exclusive else fcntl.LOCK_SH)
+        except BlockingIOError:
+            yield False
+            return
+
+        try:
+            try:
+                current = os.stat(lock_path)
+            except FileNotFoundError:
+                current = None
+
+            locked = os.fstat(f.fileno())
+            yield current is not None and (current.st_dev, current.st_ino) == (
+                locked.st_dev,
+                locked.st_ino,
+            )
+
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def _remove_extraction(path: str):
+    """
+    Evict an extraction unless it is in use. The extraction is renamed before it is deleted so that
+    other processes never use a partially-deleted extraction.
+    """
+    if not os.path.exists(os.path.join(path, LOCK_FILENAME)):
+        shutil.rmtree(path, ignore_errors=True)
+        return
+
+    with _lock_extraction(path, exclusive=True) as locked:
+        if not locked:
+            LOGGER.debug(f"Not evicting cached autograder extraction in use: {path}")
+            return
+
+        temp_path = os.path.join(os.path.dirname(path), CACHE_TEMP_PREFIX + os.path.basename(path))
+        os.rename(path, temp_path)
+
+    shutil.rmtree(temp_path, ignore_errors=True)
+
+
+def copy_extracted_autograder(zip_path: str, dst: str, cache_dir: Optional[str] = None):
+    """
+    Create a working copy of the extracted contents of an autograder zip file at ``dst``, using
+    the cached extraction (see ``get_extracted_autograder``).
+
+    The extraction is locked while it is copied so that it can't be evicted by another process.
+    Files are copied with ``otter.utils.clone_file``, so on filesystems that support copy-on-write
+    clones the copy doesn't duplicate the files' contents, and changes made to the copy never
+    affect the cached extraction.
+
+    Args:
+        zip_path (``str``): the path to the autograder zip file
+        dst (``str``): the directory to copy the autograder into; created if it doesn't exist
+        cache_dir (``str | None``): the cache directory; defaults to the per-user
+            ``autograders`` cache directory
+    """
+    # retry if the extraction is evicted between looking it up and locking it
+    for _ in range(3):
+        path = get_extracted_autograder(zip_path, cache_dir)
+        with _lock_extraction(path) as locked:
+            if locked:
+                clone_tree(path, dst, ignore=shutil.ignore_patterns(LOCK_FILENAME))
+                return
+
+    LOGGER.debug("Could not lock cached autograder extraction; extracting zip file directly")
+    with zipfile.ZipFile(zip_path) as zf:
+        zf.extractall(dst)
+
+
+def evict_stale_autograders(
+    cache_dir: Optional[str] = None,
+    *,
+    keep: Optional[str] = None,
+    max_entries: int = MAX_CACHED_AUTOGRADERS,
+    max_age: float = MAX_CACHE_AGE,
+):
+    """
+    Delete extractions that haven't been used in ``max_age`` seconds and the least recently used
+    extractions beyond the first ``max_entries``. Extractions that are being copied by another
+    process are skipped.
+
+    Args:
+        cache_dir (``str | None``): the cache directory; defaults to the per-user
+            ``autograders`` cache directory
+        keep (``str | None``): the path to an extraction that should never be evicted
+        max_entries (``int``): the maximum number of extractions to keep
+        max_age (``float``): the number of seconds after which unused extractions are evicted
+    """
+    cache_dir = cache_dir or get_cache_dir(AUTOGRADER_CACHE_NAME)
+    if not os.path.isdir(cache_dir):
+        return
+
+    evict_cache_entries(
+        cache_dir,
+        max_entries=max_entries,
+        max_age=max_age,
+        keep=keep,
+        remove=_remove_extraction,
+    )
+
+
+def clone_tree(src: str, dst: str, ignore: Optional[Callable[..., Any]] = None):
+    """
+    Copy the directory tree at ``src`` into ``dst`` with ``otter.utils.clone_file``, which uses
+    copy-on-write clones where the filesystem supports them and copies files otherwise.
+
+    Args:
+        src (``str``): the directory to copy from
+        dst (``str``): the directory to copy into; created if it doesn't exist
+        ignore (``Callable[..., object] | None``): a function selecting files not to copy, as for
+            ``shutil.copytree``
+    """
+    shutil.copytree(src, dst, copy_function=clone_file, ignore=ignore, dirs_exist_ok=True)
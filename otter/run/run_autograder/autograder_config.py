@@ -178,5 +178,17 @@ class AutograderConfig(fica.Config):
         default=False,
     )
 
+    max_cell_output_size: Optional[int] = fica.Key(
+        description="the maximum number of characters of output stored for each cell of the "
+        "executed submission; outputs past this limit are truncated",
+        default=None,
+    )
+
+    max_notebook_output_size: Optional[int] = fica.Key(
+        description="the maximum number of characters of output stored for the entire executed "
+        "submission; outputs past this limit are truncated",
+        default=None,
+    )
+
     otter_run: bool = False
     """whether this autograder run is being run by Otter Run (i.e. without containerization)"""
@@ -2,20 +2,21 @@
 
 import gc
 import json
-import nbformat
 import os
 import shutil
 import tempfile
 
 from abc import ABC, abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor
 from glob import glob
-from typing import Optional
+from typing import Any, Optional
 
 from ..autograder_config import AutograderConfig
 from ..utils import OtterRuntimeError, print_output, write_blank_page_to_stare_at_before_you
 from ....generate.token import APIClient
 from ....nbmeta_config import NBMetadataConfig
 from ....test_files import GradingResults
+from ....utils import clone_file
 
 
 class AbstractLanguageRunner(ABC):
@@ -41,20 +42,25 @@ class AbstractLanguageRunner(ABC):
         When this method is invoked, the working directory is assumed to already be
         ``self.ag_config.autograder_dir``.
         """
-        # put files into submission directory
+        # put files into submission directory; files are cloned where the filesystem supports it so
+        # that large support files aren't duplicated
         if os.path.exists("./source/files"):
             for file in os.listdir("./source/files"):
                 fp = os.path.join("./source/files", file)
                 if os.path.isdir(fp):
                     if not os.path.exists(os.path.join("./submission", os.path.basename(fp))):
-                        shutil.copytree(fp, os.path.join("./submission", os.path.basename(fp)))
+                        shutil.copytree(
+                            fp,
+                            os.path.join("./submission", os.path.basename(fp)),
+                            copy_function=clone_file,
+                        )
                 else:
-                    shutil.copy(fp, "./submission")
+                    clone_file(fp, "./submission")
 
         # copy the tests directory
         if os.path.exists("./submission/tests"):
             shutil.rmtree("./submission/tests")
-        shutil.copytree("./source/tests", "./submission/tests")
+        shutil.copytree("./source/tests", "./submission/tests", copy_function=clone_file)
 
     def validate_assignment_name(self, got: Optional[str]):
         """
@@ -77,17 +83,19 @@ class AbstractLanguageRunner(ABC):
             )
             raise OtterRuntimeError(message)
 
-    def get_notebook_assignment_name(self, nb: nbformat.NotebookNode) -> Optional[str]:
+    def get_notebook_assignment_name(self, nb_path: str) -> Optional[str]:
         """
-        Get the assignment name in the metadata of the provided notebook, if any.
+        Get the assignment name in the metadata of the notebook at ``nb_path``, if any.
+
+        Only the notebook's metadata is read from the file.
 
         Args:
-            nb (``nbformat.NotebookNode``): the notebook
+            nb_path (``str``): the path to the notebook
 
         Returns:
             ``str | None``: the assignment name of the notebook, if any
         """
-        nbmc = NBMetadataConfig.from_notebook(nb)
+        nbmc = NBMetadataConfig.from_notebook_path(nb_path)
         return nbmc.assignment_name
 
     @property
@@ -97,7 +105,9 @@ class AbstractLanguageRunner(ABC):
         # PDF generation dependencies in the setup.sh templates.
         return self.ag_config.token is not None or self.ag_config.pdf
 
-    def write_and_maybe_submit_pdf(self, submission_path: str) -> Optional[Exception]:
+    def write_and_maybe_submit_pdf(
+        self, submission_path: str, **kwargs: Any
+    ) -> Optional[Exception]:
         """
         Upload a PDF to a Gradescope assignment for manual grading.
 
@@ -108,6 +118,7 @@ class AbstractLanguageRunner(ABC):
 
         Args:
             submission_path (``str``): path to the submission
+            **kwargs: additional arguments passed to ``self.write_pdf``
 
         Returns:
             ``Exception | None``: an error thrown while trying to write or submit the PDF, if any;
@@ -122,7 +133,7 @@ class AbstractLanguageRunner(ABC):
             if self.ag_config.use_submission_pdf and subm_pdfs:
                 pdf_path = subm_pdfs[0]
             else:
-                pdf_path = self.write_pdf(submission_path)
+                pdf_path = self.write_pdf(submission_path, **kwargs)
 
             if self.ag_config.token:
                 client = APIClient(token=self.ag_config.token)
@@ -140,10 +151,40 @@ class AbstractLanguageRunner(ABC):
                 print_output("\nUploading a blank PDF due to export failure")
                 with tempfile.NamedTemporaryFile(suffix=".pdf") as ntf:
                     write_blank_page_to_stare_at_before_you(ntf.name)
-                    self.submit_pdf(client, ntf.name)
+                    self.submit_pdf(APIClient(token=self.ag_config.token), ntf.name)
 
             return e
 
+    def write_pdf_in_background(
+        self, submission_path: str, **kwargs: Any
+    ) -> "Future[Optional[Exception]]":
+        """
+        Run ``write_and_maybe_submit_pdf`` in a background thread so that the PDF is generated
+        while the submission is being graded.
+
+        PDFs can't be uploaded in the background because the upload token must be sanitized before
+        any student code is run, so this method can only be called if there is no token. The
+        working directory must not be changed until the returned future is done.
+
+        Args:
+            submission_path (``str``): path to the submission
+            **kwargs: additional arguments passed to ``self.write_pdf``
+
+        Returns:
+            ``concurrent.futures.Future[Exception | None]``: a future for the return value of
+                ``write_and_maybe_submit_pdf``
+
+        Raises:
+            ``ValueError``: if there is an upload token in the autograder config
+        """
+        if self.ag_config.token is not None:
+            raise ValueError("PDFs can't be uploaded in the background")
+
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="otter-pdf")
+        future = executor.submit(self.write_and_maybe_submit_pdf, submission_path, **kwargs)
+        executor.shutdown(wait=False)
+        return future
+
     def submit_pdf(self, client: APIClient, pdf_path: str):
         """
         Upload the PDF at ``pdf_path`` to the Gradescope assignment specified in the config. Does
@@ -198,6 +239,8 @@ class AbstractLanguageRunner(ABC):
             c = json.load(f)
         if "token" in c:
             del c["token"]
+        # replace the file instead of overwriting it in case it is linked to a cached copy
+        os.remove("../source/otter_config.json")
         with open("../source/otter_config.json", "w") as f:
             json.dump(c, f, indent=2)
 
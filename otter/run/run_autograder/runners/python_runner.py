@@ -1,10 +1,11 @@
 """Autograder runner for Python assignments"""
 
 import json
-import nbformat as nbf
+import nbformat
 import os
 
 from glob import glob
+from typing import Optional
 
 from .abstract_runner import AbstractLanguageRunner
 from ..utils import OtterRuntimeError, print_output
@@ -13,7 +14,7 @@ from ....check.notebook import OTTER_LOG_FILENAME
 from ....execute import grade_notebook
 from ....export import export_notebook
 from ....plugins import PluginCollection
-from ....utils import chdir, format_full_width
+from ....utils import chdir, format_full_width, NBFORMAT_VERSION
 
 
 class PythonRunner(AbstractLanguageRunner):
@@ -32,8 +33,7 @@ class PythonRunner(AbstractLanguageRunner):
 
     def validate_submission(self, submission_path: str):
         if os.path.splitext(submission_path)[1] == ".ipynb":
-            nb = nbf.read(submission_path, as_version=nbf.NO_CONVERT)
-            assignment_name = self.get_notebook_assignment_name(nb)
+            assignment_name = self.get_notebook_assignment_name(submission_path)
             self.validate_assignment_name(assignment_name)
 
     def resolve_submission_path(self) -> str:
@@ -59,7 +59,20 @@ class PythonRunner(AbstractLanguageRunner):
 
         return subm_path
 
-    def write_pdf(self, submission_path: str) -> str:
+    def write_pdf(
+        self, submission_path: str, notebook: Optional[nbformat.NotebookNode] = None
+    ) -> str:
+        """
+        Convert the submission to a PDF, returning the path to the PDF file.
+
+        Args:
+            submission_path (``str``): the path to the submission
+            notebook (``nbformat.NotebookNode | None``): a snapshot of the submission to export
+                instead of reading it from ``submission_path``
+
+        Returns:
+            ``str``: the path to the generated PDF
+        """
         pdf_path = os.path.splitext(submission_path)[0] + ".pdf"
         export_notebook(
             submission_path,
@@ -67,6 +80,7 @@ class PythonRunner(AbstractLanguageRunner):
             filtering=self.ag_config.filtering,
             pagebreaks=self.ag_config.pagebreaks,
             exporter_type="html" if self.ag_config.pdf_via_html else "latex",
+            notebook=notebook,
         )
 
         return pdf_path
@@ -96,8 +110,10 @@ class PythonRunner(AbstractLanguageRunner):
             if plugin_collection:
                 plugin_collection.run("before_grading", self.ag_config)
 
+            # PDFs that are uploaded must be submitted before the token is sanitized, so they can't
+            # be generated while the submission is being executed
             pdf_error = None
-            if self.pdf_enabled:
+            if self.ag_config.token is not None:
                 pdf_error = self.write_and_maybe_submit_pdf(subm_path)
 
             self.sanitize_tokens()
@@ -120,20 +136,39 @@ class PythonRunner(AbstractLanguageRunner):
 
                 log = None
 
-            scores = grade_notebook(
-                subm_path,
-                tests_glob=sorted(glob("./tests/*.py")),
-                cwd=os.getcwd(),
-                test_dir="./tests",
-                ignore_errors=not self.ag_config.debug,
-                seed=self.ag_config.seed,
-                seed_variable=self.ag_config.seed_variable,
-                log=log if self.ag_config.grade_from_log else None,
-                variables=self.ag_config.serialized_variables,
-                plugin_collection=plugin_collection,
-                script=os.path.splitext(subm_path)[1] == ".py",
-                force_python3_kernel=not self.ag_config.otter_run,
-            )
+            # otherwise, generate the PDF from a snapshot of the submission while it is being
+            # executed so that the submission can't change the PDF
+            pdf_future = None
+            if self.pdf_enabled and self.ag_config.token is None:
+                notebook = None
+                if os.path.splitext(subm_path)[1] == ".ipynb":
+                    notebook = nbformat.read(subm_path, as_version=NBFORMAT_VERSION)
+
+                pdf_future = self.write_pdf_in_background(subm_path, notebook=notebook)
+
+            try:
+                scores = grade_notebook(
+                    subm_path,
+                    tests_glob=sorted(glob("./tests/*.py")),
+                    cwd=os.getcwd(),
+                    test_dir="./tests",
+                    ignore_errors=not self.ag_config.debug,
+                    seed=self.ag_config.seed,
+                    seed_variable=self.ag_config.seed_variable,
+                    log=log if self.ag_config.grade_from_log else None,
+                    variables=self.ag_config.serialized_variables,
+                    plugin_collection=plugin_collection,
+                    script=os.path.splitext(subm_path)[1] == ".py",
+                    force_python3_kernel=not self.ag_config.otter_run,
+                    max_cell_output_size=self.ag_config.max_cell_output_size,
+                    max_notebook_output_size=self.ag_config.max_notebook_output_size,
+                )
+
+            finally:
+                # the PDF is written relative to the working directory, so it must be done before
+                # leaving the submission directory, even if grading fails
+                if pdf_future is not None:
+                    pdf_error = pdf_future.result()
 
             if pdf_error:
                 scores.set_pdf_error(pdf_error)
@@ -10,16 +10,23 @@ import yaml
 
 from glob import glob
 from nbconvert.exporters import ScriptExporter
-from rpy2.robjects.packages import importr
 
 from .abstract_runner import AbstractLanguageRunner
+from .r_session import get_package, submission_session
+from .rmd_converter import (
+    cache_r_script,
+    convert_to_r_script,
+    get_cached_r_script,
+    UnsupportedDocumentError,
+)
 from ..utils import OtterRuntimeError
 from ....export import export_notebook
+from ....logging import get_logger
 from ....test_files import GradingResults
-from ....utils import chdir, get_source, knit_rmd_file, NBFORMAT_VERSION, qmd_to_pdf
+from ....utils import chdir, get_source, knit_rmd_file, qmd_to_pdf, read_notebook_without_outputs
 
 
-_OTTR = importr("ottr")
+LOGGER = get_logger(__name__)
 
 
 class RRunner(AbstractLanguageRunner):
@@ -31,8 +38,7 @@ class RRunner(AbstractLanguageRunner):
         assignment_name = False
         ext = os.path.splitext(submission_path)[1].lower()
         if ext == ".ipynb":
-            nb = nbf.read(submission_path, as_version=nbf.NO_CONVERT)
-            assignment_name = self.get_notebook_assignment_name(nb)
+            assignment_name = self.get_notebook_assignment_name(submission_path)
 
         elif ext == ".rmd" or ext == ".qmd":
             post = frontmatter.load(submission_path)
@@ -52,13 +58,21 @@ class RRunner(AbstractLanguageRunner):
         for cell in nb["cells"]:
             if cell["cell_type"] == "code":
                 source = "\n".join(get_source(cell))
-                valid_syntax = _OTTR.valid_syntax(source)[0]
+                valid_syntax = get_package("ottr").valid_syntax(source)[0]
                 if valid_syntax:
                     new_cells.append(cell)
         nb = copy.deepcopy(nb)
         nb["cells"] = new_cells
         return nb
 
+    def get_seed_line(self) -> str:
+        """
+        Get the line of R code used to seed each cell or chunk of a submission.
+        """
+        if self.ag_config.seed_variable:
+            return f"{self.ag_config.seed_variable} = {self.ag_config.seed}"
+        return f"set.seed({self.ag_config.seed})"
+
     def add_seeds_to_rmd_file(self, rmd_path: str):
         """
         Add intercell seeding to an Rmd file.
@@ -72,9 +86,7 @@ class RRunner(AbstractLanguageRunner):
             if line.startswith("```{r"):
                 insertions.append(i)
 
-        seed = f"set.seed({self.ag_config.seed})"
-        if self.ag_config.seed_variable:
-            seed = f"{self.ag_config.seed_variable} = {self.ag_config.seed}"
+        seed = self.get_seed_line()
 
         for i in insertions[::-1]:
             # Put the seed on the first non-comment line; this prevents the seed from being inserted
@@ -111,7 +123,7 @@ class RRunner(AbstractLanguageRunner):
         elif len(nbs) == 1:
             nb_path = nbs[0]
             self.validate_submission(nb_path)
-            nb = nbf.read(nb_path, as_version=NBFORMAT_VERSION)
+            nb = read_notebook_without_outputs(nb_path)
             nb = self.filter_cells_with_syntax_errors(nb)
 
             # create the R script
@@ -132,14 +144,36 @@ class RRunner(AbstractLanguageRunner):
 
             self.validate_submission(rmd_path)
 
+            with open(rmd_path) as f:
+                rmd = f.read()
+
+            ext = os.path.splitext(rmd_path)[1]
+            seed = self.get_seed_line() if self.ag_config.seed is not None else None
+
+            # try to convert the document without R; if that isn't possible, reuse the script from
+            # an earlier conversion of the same document with R if there is one
+            try:
+                script = convert_to_r_script(rmd, seed)
+            except UnsupportedDocumentError as e:
+                LOGGER.debug(f"Converting submission with R: {e}")
+                script = get_cached_r_script(rmd, ext, seed)
+
+            if script is not None:
+                os.close(script_fd)
+                with open(script_path, "w") as f:
+                    f.write(script)
+
+                self.subm_path_deletion_required = True
+                return script_path
+
             # add seeds
-            if self.ag_config.seed is not None:
+            if seed is not None:
                 self.add_seeds_to_rmd_file(rmd_path)
 
             # create the R script
             rmd_path = os.path.abspath(rmd_path)
-            if os.path.splitext(rmd_path)[1] == ".Rmd":
-                importr("knitr").purl(rmd_path, script_path)
+            if ext == ".Rmd":
+                get_package("knitr").purl(rmd_path, script_path)
             else:
                 # delete the script tempfile since quarto::qmd_to_r_script requires no file to exist
                 # at the output path
@@ -148,7 +182,10 @@ class RRunner(AbstractLanguageRunner):
                 # use quarto::qmd_to_r_script for the conversion because it will ensure that cells
                 # marked with "eval: false" are commented out in the resulting script (precenting a
                 # fork bomb caused by ottr::export)
-                importr("quarto").qmd_to_r_script(rmd_path, script=script_path)
+                get_package("quarto").qmd_to_r_script(rmd_path, script=script_path)
+
+            with open(script_path) as f:
+                cache_r_script(rmd, ext, seed, f.read())
 
             self.subm_path_deletion_required = True
             return script_path
@@ -207,7 +244,7 @@ class RRunner(AbstractLanguageRunner):
     def _check_ottr_version(self):
         if glob("*.qmd"):
             # Require ottr>=1.6.0 for qmd submissions
-            version = importr("utils").packageVersion("ottr")[0]
+            version = get_package("utils").packageVersion("ottr")[0]
             if version[0] <= 1 and version[1] < 6:
                 raise ValueError(
                     f"Grading qmd files requires ottr>=1.6.0 but found version {'.'.join(str(i) for i in version)}"
@@ -226,9 +263,14 @@ class RRunner(AbstractLanguageRunner):
             self.sanitize_tokens()
 
             subm_path = self.resolve_submission_path()
-            output = _OTTR.run_autograder(
-                subm_path, ignore_errors=not self.ag_config.debug, test_dir="./tests"
-            )[0]
+
+            # the submission is run in the persistent R session, which is reset afterwards so that
+            # it can be reused for the next submission graded by this process
+            with submission_session():
+                output = get_package("ottr").run_autograder(
+                    subm_path, ignore_errors=not self.ag_config.debug, test_dir="./tests"
+                )[0]
+
             scores = GradingResults.from_ottr_json(output)
 
             if pdf_error:
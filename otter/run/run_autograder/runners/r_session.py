@@ -0,0 +1,129 @@
+"""A persistent embedded R session for grading R submissions"""
+
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, Callable, Iterator, Optional
+
+from ....logging import get_logger
+
+
+LOGGER = get_logger(__name__)
+
+PRELOADED_PACKAGES = ["ottr", "knitr", "quarto", "utils"]
+"""the R packages loaded when the session is started"""
+
+SNAPSHOT_R_CODE = r"""
+local({
+    globals <- ls(globalenv(), all.names = TRUE)
+    search_path <- search()
+    namespaces <- loadedNamespaces()
+    opts <- options()
+    env_vars <- as.list(Sys.getenv())
+    wd <- getwd()
+    function() {
+        while (sink.number() > 0) sink()
+        if (sink.number(type = "message") != 2) sink(type = "message")
+        graphics.off()
+        setwd(wd)
+
+        rm(list = setdiff(ls(globalenv(), all.names = TRUE), globals), envir = globalenv())
+        for (name in setdiff(search(), search_path)) {
+            try(detach(name, character.only = TRUE), silent = TRUE)
+        }
+
+        # namespaces can only be unloaded once nothing imports them, so unload them until no more
+        # can be unloaded
+        repeat {
+            extra <- setdiff(loadedNamespaces(), namespaces)
+            for (ns in extra) try(unloadNamespace(ns), silent = TRUE)
+            if (length(setdiff(loadedNamespaces(), namespaces)) == length(extra)) break
+        }
+
+        current <- options()
+        changed <- names(opts)[!mapply(identical, opts, current[names(opts)])]
+        options(opts[changed])
+        added <- setdiff(names(current), names(opts))
+        options(setNames(vector("list", length(added)), added))
+
+        Sys.unsetenv(setdiff(names(Sys.getenv()), names(env_vars)))
+        try(do.call(Sys.setenv, env_vars), silent = TRUE)
+        invisible(NULL)
+    }
+})
+"""
+"""
+R code that records the state of the R session and returns a function that restores it by closing
+sinks and graphics devices, resetting the working directory, removing global variables, detaching
+attached packages and environments, unloading namespaces, and resetting options and environment
+variables
+"""
+
+_restore_state: Optional[Callable[[], Any]] = None
+"""the function that restores the recorded state of the R session, if it has been recorded"""
+
+
+@lru_cache(maxsize=None)
+def get_package(name: str) -> Any:
+    """
+    Import an R package with rpy2. Each package is only imported once per process.
+
+    Args:
+        name (``str``): the name of the package
+
+    Returns:
+        ``rpy2.robjects.packages.Package``: the package
+    """
+    from rpy2.robjects.packages import importr
+
+    return importr(name)
+
+
+def start_session():
+    """
+    Start the embedded R session, load the packages in ``PRELOADED_PACKAGES``, and record the
+    state of the session so that it can be reset after grading each submission.
+
+    Packages other than ottr that aren't installed are skipped. This function has no effect if the
+    session has already been started.
+    """
+    global _restore_state
+
+    if _restore_state is not None:
+        return
+
+    for package in PRELOADED_PACKAGES:
+        try:
+            get_package(package)
+        except Exception:
+            if package == "ottr":
+                raise
+            LOGGER.debug(f"Could not preload R package {package}", exc_info=True)
+
+    from rpy2 import robjects
+
+    _restore_state = robjects.r(SNAPSHOT_R_CODE)
+
+
+def reset_session():
+    """
+    Restore the R session to the state recorded when it was started.
+    """
+    if _restore_state is not None:
+        _restore_state()
+
+
+@contextmanager
+def submission_session() -> Iterator[None]:
+    """
+    A context manager that starts the R session if necessary and resets it after the body runs,
+    so that one submission's global variables, attached packages, options, environment variables,
+    and working directory aren't visible to the next submission graded in the same process.
+    """
+    start_session()
+    try:
+        yield
+    finally:
+        try:
+            reset_session()
+        except Exception:
+            LOGGER.warning("Could not reset the R session", exc_info=True)
@@ -0,0 +1,296 @@
+"""Conversion of Rmd and qmd documents to R scripts without running R"""
+
+import hashlib
+import json
+import os
+import re
+import yaml
+
+from typing import Any, Optional
+
+from ....logging import get_logger
+from ....utils import evict_cache_entries, get_cache_dir, write_file_atomically
+
+
+LOGGER = get_logger(__name__)
+
+R_SCRIPT_CACHE_NAME = "r-scripts"
+"""the name of the cache in which converted R scripts are stored"""
+
+MAX_CACHED_R_SCRIPTS = 256
+"""the maximum number of R scripts to keep in the cache"""
+
+MAX_CACHE_AGE = 7 * 24 * 60 * 60
+"""the number of seconds since a cached R script was last used after which it is evicted"""
+
+CHUNK_START_REGEX = re.compile(r"^(\s*)(`{3,})\s*\{(.*)\}\s*$")
+"""a regular expression matching the opening fence of a code chunk"""
+
+CHUNK_REFERENCE_REGEX = re.compile(r"^\s*<<(.+)>>\s*$")
+"""a regular expression matching a reference to another chunk inside a chunk"""
+
+UNSUPPORTED_OPTIONS = {"child", "code", "file", "ref.label"}
+"""chunk options that change the code of a chunk and so can't be handled without R"""
+
+R_LITERALS = {"TRUE": True, "T": True, "FALSE": False, "F": False}
+"""the R literals that chunk options are parsed to"""
+
+
+class UnsupportedDocumentError(Exception):
+    """
+    An error raised when a document uses a construct that ``convert_to_r_script`` can't convert.
+    """
+
+    pass
+
+
+def _split_header(header: str) -> list[str]:
+    """
+    Split the contents of a chunk header into the engine, label, and options on commas and spaces
+    that aren't inside quotes, parentheses, brackets, or braces.
+    """
+    parts, current, depth, quote = [], "", 0, None
+    for i, char in enumerate(header):
+        if quote:
+            current += char
+            if char == quote and header[i - 1] != "\\":
+                quote = None
+        elif char in "\"'":
+            current += char
+            quote = char
+        elif char in "([{":
+            current += char
+            depth += 1
+        elif char in ")]}":
+            current += char
+            depth -= 1
+        elif char == "," and depth == 0:
+            parts.append(current.strip())
+            current = ""
+        elif char == " " and depth == 0 and not parts and current.strip():
+            # the engine is separated from the label or options by a space
+            parts.append(current.strip())
+            current = ""
+        else:
+            current += char
+
+    if quote or depth:
+        raise UnsupportedDocumentError(f"Could not parse chunk header: {header}")
+
+    parts.append(current.strip())
+    return [p for p in parts if p]
+
+
+def _parse_value(value: str) -> Any:
+    """
+    Parse an R literal in a chunk option. Values that aren't literals are returned as
+    ``None``.
+    """
+    value = value.strip()
+    if value in R_LITERALS:
+        return R_LITERALS[value]
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+        return value[1:-1]
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def _parse_chunk_options(header: str, lines: list[str]) -> tuple[str, dict[str, Any]]:
+    """
+    Parse the engine and options of a chunk from its header and any ``#|`` option comments at the
+    top of the chunk.
+
+    Args:
+        header (``str``): the contents of the braces in the chunk's opening fence
+        lines (``list[str]``): the lines of the chunk
+
+    Returns:
+        ``tuple[str, dict[str, object]]``: the engine and the options
+
+    Raises:
+        ``UnsupportedDocumentError``: if the options can't be parsed
+    """
+    parts = _split_header(header)
+    if not parts:
+        raise UnsupportedDocumentError("Chunk has no engine")
+
+    engine, options = parts[0], {}
+    for part in parts[1:]:
+        if "=" not in part:
+            # the chunk label
+            continue
+        key, value = part.split("=", 1)
+        options[key.strip()] = (value.strip(), _parse_value(value))
+
+    yaml_lines = []
+    for line in lines:
+        if not line.startswith("#|"):
+            break
+        yaml_lines.append(line[2:])
+
+    if yaml_lines:
+        try:
+            yaml_options = yaml.safe_load("\n".join(yaml_lines))
+        except yaml.YAMLError as e:
+            raise UnsupportedDocumentError(f"Could not parse chunk options: {e}")
+
+        if not isinstance(yaml_options, dict):
+            raise UnsupportedDocumentError("Chunk options are not a mapping")
+
+        for key, value in yaml_options.items():
+            options[str(key)] = (str(value), value)
+
+    return engine, options
+
+
+def _get_flag(options: dict[str, Any], key: str) -> bool:
+    """
+    Get the value of a boolean chunk option that defaults to true.
+
+    Raises:
+        ``UnsupportedDocumentError``: if the option's value isn't a boolean literal
+    """
+    if key not in options:
+        return True
+
+    raw, value = options[key]
+    if not isinstance(value, bool):
+        raise UnsupportedDocumentError(f"Unsupported value for chunk option {key}: {raw}")
+
+    return value
+
+
+def convert_to_r_script(source: str, seed: Optional[str] = None) -> str:
+    """
+    Convert the R chunks of an Rmd or qmd document into an R script, as ``knitr::purl`` and
+    ``quarto::qmd_to_r_script`` do.
+
+    Only R chunks are included in the script; text, inline code, and chunks for other engines are
+    dropped. Chunks with ``eval`` set to false are commented out and chunks with ``purl`` set to
+    false are left out. If ``seed`` is provided, it is added to every chunk before the first line
+    that isn't a comment, as ``RRunner.add_seeds_to_rmd_file`` does.
+
+    Args:
+        source (``str``): the contents of the document
+        seed (``str | None``): a line of R code that sets the seed
+
+    Returns:
+        ``str``: the R script
+
+    Raises:
+        ``UnsupportedDocumentError``: if the document uses a construct that can't be converted
+            without R, e.g. indented chunks, chunk references, or chunk options that change the
+            code of the chunk or whose values aren't literals
+    """
+    lines = source.split("\n")
+    script, i = [], 0
+    while i < len(lines):
+        match = CHUNK_START_REGEX.match(lines[i])
+        i += 1
+        if not match:
+            continue
+
+        indent, fence, header = match.groups()
+        if indent:
+            raise UnsupportedDocumentError("Indented chunks are not supported")
+
+        end = re.compile(rf"^{fence}`*\s*$")
+        chunk = []
+        while i < len(lines) and not end.match(lines[i]):
+            chunk.append(lines[i])
+            i += 1
+
+        if i == len(lines):
+            raise UnsupportedDocumentError("Document contains an unclosed chunk")
+
+        i += 1
+
+        engine, options = _parse_chunk_options(header, chunk)
+        if engine != "r":
+            continue
+
+        if UNSUPPORTED_OPTIONS & options.keys():
+            raise UnsupportedDocumentError(
+                f"Unsupported chunk options: {', '.join(sorted(UNSUPPORTED_OPTIONS & options.keys()))}"
+            )
+
+        if any(CHUNK_REFERENCE_REGEX.match(l) for l in chunk):
+            raise UnsupportedDocumentError("Chunk references are not supported")
+
+        if not _get_flag(options, "purl"):
+            continue
+
+        if seed is not None:
+            j = next((j for j, l in enumerate(chunk) if not l.startswith("#")), len(chunk))
+            chunk = [*chunk[:j], seed, *chunk[j:]]
+
+        if not _get_flag(options, "eval"):
+            chunk = [f"# {l}" if l else "#" for l in chunk]
+
+        label = re.sub(r"^r[ ,]?\s*", "", header.strip())
+        script.append(f"## ----{label}----")
+        script.extend(chunk)
+        script.append("")
+
+    return "\n".join(script)
+
+
+def _get_cache_path(source: str, ext: str, seed: Optional[str]) -> str:
+    """
+    Get the path at which the converted script for a document is cached.
+    """
+    key = json.dumps([source, ext.lower(), seed]).encode("utf-8")
+    return os.path.join(get_cache_dir(R_SCRIPT_CACHE_NAME), hashlib.sha256(key).hexdigest() + ".R")
+
+
+def get_cached_r_script(source: str, ext: str, seed: Optional[str]) -> Optional[str]:
+    """
+    Get the cached R script for a document that was converted with knitr or Quarto, if there is
+    one.
+
+    Args:
+        source (``str``): the contents of the document
+        ext (``str``): the extension of the document (``.Rmd`` or ``.qmd``)
+        seed (``str | None``): the line of R code that sets the seed
+
+    Returns:
+        ``str | None``: the cached script
+    """
+    path = _get_cache_path(source, ext, seed)
+    try:
+        with open(path) as f:
+            script = f.read()
+
+        # mark the script as recently used
+        os.utime(path)
+        return script
+
+    except OSError:
+        return None
+
+
+def cache_r_script(source: str, ext: str, seed: Optional[str], script: str):
+    """
+    Cache the R script for a document that was converted with knitr or Quarto. Stale scripts are
+    evicted from the cache whenever a new one is added.
+
+    Args:
+        source (``str``): the contents of the document
+        ext (``str``): the extension of the document (``.Rmd`` or ``.qmd``)
+        seed (``str | None``): the line of R code that sets the seed
+        script (``str``): the R script
+    """
+    path = _get_cache_path(source, ext, seed)
+    try:
+        write_file_atomically(path, script)
+        evict_cache_entries(
+            os.path.dirname(path),
+            max_entries=MAX_CACHED_R_SCRIPTS,
+            max_age=MAX_CACHE_AGE,
+            keep=path,
+        )
+
+    except OSError:
+        LOGGER.debug("Could not cache converted R script", exc_info=True)
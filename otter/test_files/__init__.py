@@ -9,6 +9,7 @@ import pickle
 from typing import Any, Optional, TYPE_CHECKING, TypeVar, Union
 
 from .abstract_test import TestCase, TestCaseResult, TestFile
+from .bundle import load_bundled_test_file
 from .exception_test import ExceptionTestFile, test_case
 from .metadata_test import NotebookMetadataExceptionTestFile, NotebookMetadataOKTestFile
 from .ok_test import OKTestFile
@@ -37,8 +38,9 @@ def create_test_file(
     """
     Read a test file or a notebook file and determine the correct ``TestFile`` subclass for this test.
 
-    If ``path`` is not a notebook, the file is executed as a Python script and a global variable is
-    used to determine whether the test is OK-formatted or not.
+    If ``path`` is not a notebook, the test is loaded from the test bundle in its directory if it is
+    in the bundle. Otherwise, the file is executed as a Python script and a global variable is used
+    to determine whether the test is OK-formatted or not.
 
     Args:
         path (``str``): the path to the test file or notebook
@@ -64,6 +66,10 @@ def create_test_file(
                 path, nbmeta_config, test_name
             )
 
+    bundled = load_bundled_test_file(path)
+    if bundled is not None:
+        return bundled
+
     env = {}
     with open(path) as f:
         exec(f.read(), env)
@@ -117,6 +123,9 @@ class GradingResults:
     file: Optional[str] = None
     """the submission file that generated these results; not populated by default"""
 
+    cell_profiles: Optional[list["CellProfile"]] = None
+    """the execution profiles of the cells of the executed notebook, if available"""
+
     _catastrophic_error: Optional[Exception]
     """an error that prevented grading from completing"""
 
@@ -533,4 +542,5 @@ class GradingResults:
 
 if TYPE_CHECKING:
     from ..check.logs import Log
+    from ..execute import CellProfile
     from ..run import AutograderConfig
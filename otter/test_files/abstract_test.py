@@ -1,12 +1,18 @@
 """Abstract test objects for providing a schema to write and parse test cases"""
 
+import os
 import random
+import time
 
 from abc import ABC, abstractmethod
-from dataclasses import asdict, dataclass, replace
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field, replace
 from textwrap import indent
 from typing import Any, Optional, Union
 
+from ..utils import get_peak_rss
+
 
 @dataclass
 class TestCase:
@@ -48,6 +54,15 @@ class TestCaseResult:
     passed: bool
     """whether the test case was passed"""
 
+    wall_time: Optional[float] = field(default=None, compare=False)
+    """the wall time of running the test case in seconds, if measured"""
+
+    peak_rss_delta: Optional[int] = field(default=None, compare=False)
+    """
+    the increase in the process's peak resident set size while running the test case in bytes, if
+    measured
+    """
+
 
 class TestFile(ABC):
     """
@@ -228,6 +243,34 @@ class TestFile(ABC):
         """the total points possible in this test file"""
         return sum(tc.points for tc in self.test_cases)
 
+    @staticmethod
+    @contextmanager
+    def _profile_test_case() -> Iterator[dict[str, Any]]:
+        """
+        A context manager that measures the wall time and the increase in peak memory usage of the
+        code run inside of it.
+
+        The measurements are stored in the yielded ``dict`` when the context exits, keyed by the
+        names of the corresponding ``TestCaseResult`` fields.
+
+        Yields:
+            ``dict[str, Any]``: the dictionary that the measurements are stored in
+        """
+        profile = {}
+        peak_rss = get_peak_rss(os.getpid())
+        start = time.perf_counter()
+        try:
+            yield profile
+
+        finally:
+            profile["wall_time"] = time.perf_counter() - start
+            new_peak_rss = get_peak_rss(os.getpid())
+            profile["peak_rss_delta"] = (
+                new_peak_rss - peak_rss
+                if peak_rss is not None and new_peak_rss is not None
+                else None
+            )
+
     def update_score(self, new_score: Union[int, float]):
         """
         Override the score for this test file to a specified value.
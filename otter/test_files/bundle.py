@@ -0,0 +1,227 @@
+"""Pre-compiled bundles of test files"""
+
+import hashlib
+import importlib.util
+import marshal
+import os
+import pickle
+
+from functools import lru_cache
+from typing import Any, Optional
+
+from .abstract_test import TestFile
+from .exception_test import ExceptionTestFile
+from .ok_test import OKTestFile
+from ..logging import get_logger
+from ..nbmeta_config import OK_FORMAT_VARNAME
+
+
+LOGGER = get_logger(__name__)
+
+BUNDLE_FILENAME = "__tests__.bundle"
+"""the name of the bundle file in a tests directory"""
+
+BUNDLE_FORMAT_VERSION = 2
+"""the version of the bundle format; bundles with a different version are ignored"""
+
+
+def _bundle_test_file(path: str) -> dict[str, Any]:
+    """
+    Parse and validate a test file and create its bundle entry.
+
+    Args:
+        path (``str``): the path to the test file
+
+    Returns:
+        ``dict[str, object]``: the bundle entry
+
+    Raises:
+        ``ValueError``: if the test file is malformed
+    """
+    with open(path, "rb") as f:
+        contents = f.read()
+
+    source = contents.decode()
+    stamp = {"size": len(contents), "sha256": hashlib.sha256(contents).hexdigest()}
+
+    try:
+        # the code is compiled with the file's name rather than its path so that the bundle doesn't
+        # depend on where it was created
+        code = compile(source, os.path.basename(path), "exec")
+        env = {}
+        exec(code, env)
+
+        if OK_FORMAT_VARNAME not in env:
+            raise RuntimeError(
+                f"Malformed test file: does not define the global variable '{OK_FORMAT_VARNAME}'"
+            )
+
+        if env[OK_FORMAT_VARNAME]:
+            OKTestFile.from_spec(env["test"], path=path)
+            return {"ok_format": True, "source": source, "spec": env["test"], **stamp}
+
+        ExceptionTestFile._from_compiled_code(code, path=path)
+        return {"ok_format": False, "source": source, "code": marshal.dumps(code), **stamp}
+
+    except Exception as e:
+        raise ValueError(f"Could not load test file {path}: {type(e).__name__}: {e}") from e
+
+
+def create_bundle(paths: list[str]) -> Optional[bytes]:
+    """
+    Validate a set of test files and serialize them into a bundle.
+
+    OK-formatted test files are stored as their parsed test specs and exception-based test files
+    are stored as their marshalled code objects, so that grading doesn't need to parse or compile
+    them again. The size and SHA256 hash of each test file are stored so that test files that have
+    changed since they were bundled can be detected. The source of each test file is also stored so that the bundle can be used by
+    versions of Python that can't load the code objects. Test files that can't be loaded are
+    left out of the bundle with a warning and are loaded from their files when grading.
+
+    Args:
+        paths (``list[str]``): the paths to the test files
+
+    Returns:
+        ``bytes | None``: the bundle, or ``None`` if none of the test files could be bundled
+    """
+    tests = {}
+    for path in sorted(paths):
+        try:
+            tests[os.path.basename(path)] = _bundle_test_file(path)
+        except ValueError as e:
+            LOGGER.warning(f"{e}; this test file will not be bundled")
+
+    if not tests:
+        return None
+
+    return pickle.dumps(
+        {
+            "version": BUNDLE_FORMAT_VERSION,
+            "magic": importlib.util.MAGIC_NUMBER,
+            "tests": tests,
+        }
+    )
+
+
+@lru_cache(maxsize=None)
+def _read_bundle(path: str, mtime: int, size: int) -> Optional[dict[str, Any]]:
+    """
+    Read a bundle file. The modification time and size of the file are included in the arguments
+    so that a bundle that is overwritten is read again, and the modification time is stored in the
+    bundle's ``mtime`` key.
+
+    Args:
+        path (``str``): the absolute path to the bundle
+        mtime (``int``): the modification time of the bundle in nanoseconds
+        size (``int``): the size of the bundle in bytes
+
+    Returns:
+        ``dict[str, object] | None``: the bundle, or ``None`` if it couldn't be read
+    """
+    try:
+        with open(path, "rb") as f:
+            bundle = pickle.load(f)
+
+    except Exception:
+        LOGGER.debug(f"Could not read test bundle {path}", exc_info=True)
+        return None
+
+    if not isinstance(bundle, dict) or bundle.get("version") != BUNDLE_FORMAT_VERSION:
+        LOGGER.debug(f"Ignoring test bundle {path} with an unsupported format")
+        return None
+
+    if bundle["magic"] != importlib.util.MAGIC_NUMBER:
+        LOGGER.debug(f"Test bundle {path} was created by a different version of Python")
+
+    bundle["mtime"] = mtime
+    return bundle
+
+
+def load_bundle(tests_dir: str) -> Optional[dict[str, Any]]:
+    """
+    Load the bundle in a tests directory, if there is one.
+
+    Bundles are only read once per process unless they change.
+
+    Args:
+        tests_dir (``str``): the path to the tests directory
+
+    Returns:
+        ``dict[str, object] | None``: the bundle, or ``None`` if there is no readable bundle
+    """
+    path = os.path.abspath(os.path.join(tests_dir, BUNDLE_FILENAME))
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+
+    return _read_bundle(path, stat.st_mtime_ns, stat.st_size)
+
+
+def _is_stale(path: str, entry: dict[str, Any], bundle_mtime: int) -> bool:
+    """
+    Determine whether the test file at ``path`` has changed since it was bundled.
+
+    The test file is only read if it has the same size as the bundled file but was modified after
+    the bundle was written; otherwise, it is compared with its bundle entry using ``os.stat``.
+
+    Args:
+        path (``str``): the path to the test file
+        entry (``dict[str, object]``): the bundle entry of the test file
+        bundle_mtime (``int``): the modification time of the bundle in nanoseconds
+
+    Returns:
+        ``bool``: whether the test file has changed
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return False
+
+    if stat.st_size != entry["size"]:
+        return True
+
+    if stat.st_mtime_ns <= bundle_mtime:
+        return False
+
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest() != entry["sha256"]
+
+
+def load_bundled_test_file(path: str) -> Optional[TestFile]:
+    """
+    Create a ``TestFile`` for the test file at ``path`` from the bundle in its directory.
+
+    If the test file exists and has changed since the bundle was created (e.g. because it was
+    edited), the bundle entry is stale and isn't used.
+
+    Args:
+        path (``str``): the path to the test file
+
+    Returns:
+        ``TestFile | None``: the test file, or ``None`` if the directory has no bundle or the
+        test file isn't in it or has changed
+    """
+    bundle = load_bundle(os.path.dirname(path) or ".")
+    if bundle is None:
+        return None
+
+    entry = bundle["tests"].get(os.path.basename(path))
+    if entry is None:
+        return None
+
+    if _is_stale(path, entry, bundle["mtime"]):
+        LOGGER.debug(f"Test file {path} has changed since it was bundled; loading it from its file")
+        return None
+
+    if entry["ok_format"]:
+        return OKTestFile.from_spec(entry["spec"], path=path)
+
+    if bundle["magic"] == importlib.util.MAGIC_NUMBER:
+        code = marshal.loads(entry["code"])
+    else:
+        code = compile(entry["source"], path, "exec")
+
+    test_file = ExceptionTestFile._from_compiled_code(code, path=path)
+    test_file.source = entry["source"]
+    return test_file
@@ -190,13 +190,16 @@ class ExceptionTestFile(TestFile):
         for tc in self.test_cases:
             test_case = tc.body
             passed, message = True, "✅ Test case passed"
-            try:
-                test_case.call_func(global_environment)
-            except Exception as e:
-                passed, message = False, "❌ Test case failed\n" + self._generate_error_message(e)
+            with self._profile_test_case() as profile:
+                try:
+                    test_case.call_func(global_environment)
+                except Exception as e:
+                    passed, message = False, "❌ Test case failed\n" + self._generate_error_message(
+                        e
+                    )
 
             self.test_case_results.append(
-                TestCaseResult(test_case=tc, message=message, passed=passed)
+                TestCaseResult(test_case=tc, message=message, passed=passed, **profile)
             )
 
     @staticmethod
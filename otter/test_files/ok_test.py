@@ -68,9 +68,11 @@ class OKTestFile(TestFile):
         """
         self.test_case_results = []
         for i, test_case in enumerate(self.test_cases):
-            passed, result = run_doctest(
-                self.name + " " + str(i), test_case.body, global_environment
-            )
+            with self._profile_test_case() as profile:
+                passed, result = run_doctest(
+                    self.name + " " + str(i), test_case.body, global_environment
+                )
+
             if passed:
                 result = "✅ Test case passed"
             else:
@@ -81,6 +83,7 @@ class OKTestFile(TestFile):
                     test_case=test_case,
                     message=result,
                     passed=passed,
+                    **profile,
                 )
             )
 
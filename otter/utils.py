@@ -1,21 +1,28 @@
 """Various utilities for Otter-Grader"""
 
 import frontmatter
+import getpass
+import json
 import nbformat
 import os
 import pathlib
 import random
 import re
 import shutil
+import stat
 import string
+import sys
 import tempfile
+import time
 import traceback
 import yaml
 
-from collections.abc import Generator
+from collections.abc import Generator, Iterator
 from contextlib import contextmanager
 from IPython.core.getipython import get_ipython
-from typing import Any, Optional
+from typing import Any, BinaryIO, Callable, Optional, Union
+
+from .logging import get_logger
 
 
 NBFORMAT_VERSION = 4
@@ -39,6 +46,12 @@ PDF
 OTTER_CONFIG_FILENAME = "otter_config.json"
 """the file name for the autograder config JSON file"""
 
+LOGGER = get_logger(__name__)
+
+_STRUCTURAL_CHARS_REGEX = re.compile(rb'[{}\[\]"]')
+_SCALAR_END_REGEX = re.compile(rb"[,\]}\s]")
+_WHITESPACE_REGEX = re.compile(rb"\s*")
+
 
 @contextmanager
 def hide_outputs():
@@ -146,6 +159,535 @@ def get_source(cell: nbformat.NotebookNode) -> list[str]:
     raise TypeError(f"Unknown cell source type: {type(source)}")
 
 
+class JSONObjectScanner:
+    """
+    A streaming scanner over a JSON document whose top-level value is an object.
+
+    The scanner reads the file in chunks and skips over values it isn't asked to decode without
+    materializing them, so that a few small values can be extracted from a very large document
+    (e.g. the metadata of a notebook with large embedded outputs). The document is scanned as
+    UTF-8-encoded bytes, which is safe because bytes of multi-byte UTF-8 sequences never coincide
+    with JSON's (ASCII) structural characters.
+
+    Values are consumed by iterating over the keys of an object with ``iter_object`` (or the
+    indices of an array with ``iter_array``) and calling exactly one of ``read_value``,
+    ``skip_value``, ``iter_object``, or ``iter_array`` for each key or index.
+
+    Args:
+        f (``BinaryIO``): the file to read from
+        chunk_size (``int``): the number of bytes to read at a time
+    """
+
+    _f: BinaryIO
+    """the file being read"""
+
+    _chunk_size: int
+    """the number of bytes to read at a time"""
+
+    _buf: bytes
+    """the current buffer"""
+
+    _pos: int
+    """the position of the scanner in ``_buf``"""
+
+    _mark: Optional[int]
+    """a position in ``_buf`` that must be retained when the buffer is refilled"""
+
+    def __init__(self, f: BinaryIO, chunk_size: int = 1 << 20):
+        self._f = f
+        self._chunk_size = chunk_size
+        self._buf = b""
+        self._pos = 0
+        self._mark = None
+
+    def _fill(self) -> bool:
+        """
+        Read another chunk into the buffer, discarding bytes that are no longer needed.
+
+        Returns:
+            ``bool``: whether any bytes were read
+        """
+        chunk = self._f.read(self._chunk_size)
+        if not chunk:
+            return False
+
+        keep = self._pos if self._mark is None else min(self._pos, self._mark)
+        self._buf = self._buf[keep:] + chunk
+        self._pos -= keep
+        if self._mark is not None:
+            self._mark -= keep
+
+        return True
+
+    def _error(self, message: str) -> ValueError:
+        return ValueError(f"Invalid JSON document: {message}")
+
+    def _peek(self) -> bytes:
+        """
+        Skip whitespace and return the next byte without consuming it.
+        """
+        while True:
+            self._pos = _WHITESPACE_REGEX.match(self._buf, self._pos).end()
+            if self._pos < len(self._buf):
+                return self._buf[self._pos : self._pos + 1]
+            if not self._fill():
+                raise self._error("unexpected end of file")
+
+    def _expect(self, char: bytes):
+        """
+        Consume the next non-whitespace byte, raising an error if it is not ``char``.
+        """
+        if self._peek() != char:
+            raise self._error(f"expected {char.decode()!r} at offset {self._pos}")
+        self._pos += 1
+
+    def _skip_string(self):
+        """
+        Skip a string starting at the current position.
+        """
+        self._pos += 1
+        while True:
+            end = self._buf.find(b'"', self._pos)
+            escape = self._buf.find(b"\\", self._pos, len(self._buf) if end == -1 else end)
+            if escape != -1:
+                # the byte after a backslash is escaped, so make sure it is in the buffer
+                if escape + 1 < len(self._buf):
+                    self._pos = escape + 2
+                    continue
+                self._pos = escape
+
+            elif end != -1:
+                self._pos = end + 1
+                return
+
+            else:
+                self._pos = len(self._buf)
+
+            if not self._fill():
+                raise self._error("unterminated string")
+
+    def _skip_container(self):
+        """
+        Skip an object or array starting at the current position.
+        """
+        self._pos += 1
+        depth = 1
+        while depth:
+            match = _STRUCTURAL_CHARS_REGEX.search(self._buf, self._pos)
+            if match is None:
+                self._pos = len(self._buf)
+                if not self._fill():
+                    raise self._error("unterminated object or array")
+                continue
+
+            char = match.group()
+            self._pos = match.start()
+            if char == b'"':
+                self._skip_string()
+                continue
+
+            depth += 1 if char in b"{[" else -1
+            self._pos += 1
+
+    def _skip_scalar(self):
+        """
+        Skip a number or literal starting at the current position.
+        """
+        while True:
+            match = _SCALAR_END_REGEX.search(self._buf, self._pos)
+            if match is not None:
+                self._pos = match.start()
+                return
+
+            self._pos = len(self._buf)
+            if not self._fill():
+                return
+
+    def skip_value(self):
+        """
+        Skip the value starting at the next non-whitespace byte without decoding it.
+        """
+        char = self._peek()
+        if char == b'"':
+            self._skip_string()
+        elif char in b"{[":
+            self._skip_container()
+        else:
+            self._skip_scalar()
+
+    def read_value(self) -> Any:
+        """
+        Decode and return the value starting at the next non-whitespace byte.
+
+        Returns:
+            ``object``: the decoded value
+        """
+        self._peek()
+        self._mark = self._pos
+        self.skip_value()
+        data = self._buf[self._mark : self._pos]
+        self._mark = None
+        return json.loads(data.decode("utf-8"))
+
+    def iter_object(self) -> Iterator[str]:
+        """
+        Iterate over the keys of the object starting at the next non-whitespace byte.
+
+        The value of each key must be consumed before the next key is requested.
+
+        Yields:
+            ``str``: the keys of the object
+        """
+        self._expect(b"{")
+        if self._peek() == b"}":
+            self._pos += 1
+            return
+
+        while True:
+            if self._peek() != b'"':
+                raise self._error(f"expected a key at offset {self._pos}")
+
+            key = self.read_value()
+            self._expect(b":")
+            yield key
+
+            if self._peek() == b"}":
+                self._pos += 1
+                return
+
+            self._expect(b",")
+
+    def iter_array(self) -> Iterator[int]:
+        """
+        Iterate over the indices of the array starting at the next non-whitespace byte.
+
+        Each element must be consumed before the next index is requested.
+
+        Yields:
+            ``int``: the indices of the array
+        """
+        self._expect(b"[")
+        if self._peek() == b"]":
+            self._pos += 1
+            return
+
+        idx = 0
+        while True:
+            yield idx
+
+            if self._peek() == b"]":
+                self._pos += 1
+                return
+
+            self._expect(b",")
+            idx += 1
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        Return the value of ``key`` in the top-level object, or ``default`` if it is not present.
+
+        Args:
+            key (``str``): the key to look up
+            default (``object``): the value to return if the key is not present
+
+        Returns:
+            ``object``: the decoded value
+        """
+        for k in self.iter_object():
+            if k == key:
+                return self.read_value()
+            self.skip_value()
+
+        return default
+
+
+def read_notebook_without_outputs(
+    nb_path: str,
+    as_version: int = NBFORMAT_VERSION,
+    validate: bool = True,
+) -> nbformat.NotebookNode:
+    """
+    Read the notebook at ``nb_path``, dropping cell outputs, execution counts, and attachments.
+
+    The notebook JSON is streamed and the dropped values are skipped while parsing, so they are
+    never materialized in memory. This is useful when the notebook is going to be re-executed, since
+    its stored outputs are discarded anyway.
+
+    As with ``nbformat.read``, validation errors are logged rather than raised.
+
+    Args:
+        nb_path (``str``): the path to the notebook
+        as_version (``int``): the version of the notebook format to convert the notebook to
+        validate (``bool``): whether to validate the notebook against the notebook format schema
+
+    Returns:
+        ``nbformat.NotebookNode``: the notebook without outputs
+
+    Raises:
+        ``ValueError``: if the notebook is not a valid JSON object
+    """
+    nb = {}
+    with open(nb_path, "rb") as f:
+        scanner = JSONObjectScanner(f)
+        for key in scanner.iter_object():
+            if key != "cells":
+                nb[key] = scanner.read_value()
+                continue
+
+            nb["cells"] = []
+            for _ in scanner.iter_array():
+                cell = {}
+                for cell_key in scanner.iter_object():
+                    if cell_key in {"outputs", "attachments", "execution_count"}:
+                        scanner.skip_value()
+                    else:
+                        cell[cell_key] = scanner.read_value()
+
+                if cell.get("cell_type") == "code":
+                    cell["outputs"] = []
+                    cell["execution_count"] = None
+
+                nb["cells"].append(cell)
+
+    major, minor = nbformat.reader.get_version(nb)
+    if major not in nbformat.versions:
+        raise nbformat.NBFormatError(f"Unsupported nbformat version {major}")
+
+    nb = nbformat.versions[major].to_notebook_json(nb, minor=minor)
+    if as_version is not nbformat.NO_CONVERT:
+        nb = nbformat.convert(nb, as_version)
+
+    if validate:
+        try:
+            nbformat.validate(nb)
+        except nbformat.ValidationError as e:
+            LOGGER.error(f"Notebook JSON is invalid: {e}")
+
+    return nb
+
+
+def get_peak_rss(pid: Optional[int]) -> Optional[int]:
+    """
+    Get the peak resident set size of the process ``pid`` in bytes.
+
+    The peak resident set size is read from ``/proc``, so this function always returns ``None`` on
+    platforms other than Linux.
+
+    Args:
+        pid (``int | None``): the process ID
+
+    Returns:
+        ``int | None``: the peak resident set size, or ``None`` if it could not be determined
+    """
+    if pid is None or not sys.platform.startswith("linux"):
+        return None
+
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+
+    except (OSError, ValueError, IndexError):
+        pass
+
+    return None
+
+
+_FICLONE = 0x40049409
+"""the Linux ``ioctl`` request code for cloning a file's contents"""
+
+
+def clone_file(src: str, dst: str) -> str:
+    """
+    Copy the file ``src`` to ``dst``, using a copy-on-write clone if the filesystem supports it.
+
+    Cloning is only attempted on Linux (on filesystems like Btrfs and XFS); otherwise, or if the
+    clone fails, the file is copied normally. This function has the same signature as
+    ``shutil.copy2`` so that it can be used as the ``copy_function`` of ``shutil.copytree``.
+
+    Args:
+        src (``str``): the path to the file to copy
+        dst (``str``): the path to the destination file or directory
+
+    Returns:
+        ``str``: the path to the destination file
+    """
+    if os.path.isdir(dst):
+        dst = os.path.join(dst, os.path.basename(src))
+
+    if sys.platform.startswith("linux"):
+        import fcntl
+
+        try:
+            with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+                fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+            shutil.copystat(src, dst)
+            return dst
+
+        except OSError:
+            pass
+
+    return shutil.copy2(src, dst)
+
+
+OTTER_CACHE_DIR_ENV_VAR = "OTTER_CACHE_DIR"
+"""the environment variable that sets the directory in which Otter stores its caches"""
+
+CACHE_TEMP_PREFIX = ".tmp-"
+"""the prefix for the names of cache entries that are still being written"""
+
+
+def _ensure_private_dir(path: str):
+    """
+    Create a directory that only the current user can access, or verify that an existing directory
+    is owned by the current user and restrict its permissions.
+
+    Raises:
+        ``PermissionError``: if the path isn't a directory or is owned by another user
+    """
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass
+
+    st = os.lstat(path)
+    if not stat.S_ISDIR(st.st_mode):
+        raise PermissionError(f"Cache directory is not a directory: {path}")
+
+    # ownership can only be checked on POSIX systems
+    if hasattr(os, "getuid"):
+        if st.st_uid != os.getuid():
+            raise PermissionError(f"Cache directory is owned by another user: {path}")
+        if st.st_mode & 0o077:
+            os.chmod(path, 0o700)
+
+
+def get_cache_dir(name: str) -> str:
+    """
+    Get the path to a directory in which Otter caches data, creating it if necessary.
+
+    Caches are stored in the directory named by the ``OTTER_CACHE_DIR`` environment variable or, if
+    it isn't set, in ``otter`` in the user's cache directory (``$XDG_CACHE_HOME`` or
+    ``~/.cache``), falling back to a per-user directory in the system's temporary directory if the
+    user's cache directory can't be created. Cache directories are only accessible by the current
+    user and must be owned by them, so that cached data can't be planted or modified by other
+    users.
+
+    Args:
+        name (``str``): the name of the cache
+
+    Returns:
+        ``str``: the path to the cache directory
+
+    Raises:
+        ``OSError``: if a cache directory can't be created or is owned by another user
+    """
+    if os.environ.get(OTTER_CACHE_DIR_ENV_VAR):
+        roots = [os.environ[OTTER_CACHE_DIR_ENV_VAR]]
+    else:
+        user_cache = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+            os.path.expanduser("~"), ".cache"
+        )
+        uid = os.getuid() if hasattr(os, "getuid") else getpass.getuser()
+        roots = [
+            os.path.join(user_cache, "otter"),
+            os.path.join(tempfile.gettempdir(), f"otter-cache-{uid}"),
+        ]
+
+    for i, root in enumerate(roots):
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(root)), exist_ok=True)
+            _ensure_private_dir(root)
+            path = os.path.join(root, name)
+            _ensure_private_dir(path)
+            return path
+
+        except OSError:
+            if i == len(roots) - 1:
+                raise
+            LOGGER.debug(f"Could not use cache directory {root}", exc_info=True)
+
+
+def write_file_atomically(path: str, contents: Union[str, bytes]):
+    """
+    Write a file by writing its contents to a temporary file in the same directory and renaming it,
+    so that other processes never see a partially-written file.
+
+    Args:
+        path (``str``): the path to the file
+        contents (``str | bytes``): the contents of the file
+    """
+    fd, temp_path = tempfile.mkstemp(prefix=CACHE_TEMP_PREFIX, dir=os.path.dirname(path))
+    try:
+        with os.fdopen(fd, "wb" if isinstance(contents, bytes) else "w") as f:
+            f.write(contents)
+        os.replace(temp_path, path)
+
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+
+def evict_cache_entries(
+    cache_dir: str,
+    *,
+    max_entries: Optional[int] = None,
+    max_age: Optional[float] = None,
+    keep: Optional[str] = None,
+    remove: Optional[Callable[[str], Any]] = None,
+):
+    """
+    Delete the entries of a cache that haven't been used (i.e. modified) in ``max_age`` seconds and
+    the least recently used entries beyond the first ``max_entries``.
+
+    Entries that are still being written (whose names start with ``.tmp-``) are only deleted once
+    they are older than ``max_age``.
+
+    Args:
+        cache_dir (``str``): the cache directory
+        max_entries (``int | None``): the maximum number of entries to keep
+        max_age (``float | None``): the number of seconds after which unused entries are evicted
+        keep (``str | None``): the path to an entry that should never be evicted
+        remove (``Callable[[str], object] | None``): a function that deletes an entry; defaults to
+            deleting the file or directory
+    """
+
+    def default_remove(path: str):
+        if os.path.isdir(path) and not os.path.islink(path):
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    remove = remove or default_remove
+
+    entries = []
+    for name in os.listdir(cache_dir):
+        path = os.path.join(cache_dir, name)
+        try:
+            mtime = os.lstat(path).st_mtime
+        except FileNotFoundError:
+            continue
+        entries.append((mtime, name, path))
+
+    now = time.time()
+    count = 0
+    for mtime, name, path in sorted(entries, reverse=True):
+        expired = max_age is not None and now - mtime > max_age
+        if name.startswith(CACHE_TEMP_PREFIX):
+            if expired:
+                default_remove(path)
+            continue
+
+        count += 1
+        if path != keep and (expired or (max_entries is not None and count > max_entries)):
+            LOGGER.debug(f"Evicting cache entry: {path}")
+            remove(path)
+
+
 @contextmanager
 def load_default_file(
     provided_filename: Optional[str], default_filename: str, default_disabled: bool = False
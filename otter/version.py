@@ -1,6 +1,6 @@
 """Version and printable logo"""
 
-import importlib
+import importlib.metadata
 import sys
 
 from textwrap import dedent, indent
@@ -60,8 +60,8 @@ def _list_addl_package_versions() -> str:
     versions = []
     for p in _ADDITIONAL_PACKAGES:
         try:
-            m = importlib.import_module(p)
-            versions.append(f"{p}: {m.__version__}")
+            # read the version from the package metadata to avoid importing the package
+            versions.append(f"{p}: {importlib.metadata.version(p)}")
         except Exception as e:
             versions.append(f"{p}: (failed) {type(e).__name__}: {e}")
     return "\n".join(versions)
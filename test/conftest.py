@@ -51,6 +51,9 @@ def pytest_configure(config):
     config.addinivalue_line(
         "markers", "docker: marks tests as requiring Docker (deselect with '-m \"not docker\"')"
     )
+    config.addinivalue_line(
+        "markers", "rpy2: marks tests as requiring R and rpy2 (deselect with '-m \"not rpy2\"')"
+    )
 
 
 def pytest_sessionstart(session: pytest.Session):
@@ -113,6 +116,16 @@ def disable_assign_pdf_generation(pdfs_enabled):
         yield
 
 
+@pytest.fixture(autouse=True)
+def otter_cache_dir(tmp_path, monkeypatch):
+    """
+    Stores Otter's caches in a temporary directory so that tests don't affect each other.
+    """
+    cache_dir = tmp_path / "otter-cache"
+    monkeypatch.setenv("OTTER_CACHE_DIR", str(cache_dir))
+    return cache_dir
+
+
 @pytest.fixture(autouse=True, scope="session")
 def update_grade_dockerfile(cleanup_enabled):
     """
@@ -1,10 +1,16 @@
 """Tests for ``otter.api``"""
 
+import json
+import nbformat as nbf
 import os
+import pytest
+import zipfile
 
 from unittest import mock
 
-from otter.api import grade_submission
+from otter.api import _init_worker, grade_submission, grade_submissions
+
+from .utils import write_ok_test
 
 
 @mock.patch("otter.api.run_grader")
@@ -30,3 +36,81 @@ def test_grade_submission(mocked_redirect, mocked_run):
     grade_submission(subm_path, quiet=True)
 
     mocked_redirect.assert_called()
+
+
+@pytest.fixture
+def batch_grading_files(tmp_path):
+    """
+    Create an autograder zip file and submissions for testing ``otter.api.grade_submissions``.
+    """
+    ag_path = tmp_path / "autograder.zip"
+    with zipfile.ZipFile(ag_path, "w") as zf:
+        zf.writestr("otter_config.json", "{}")
+        write_ok_test(str(tmp_path / "q1.py"), ">>> assert x == 2")
+        zf.write(tmp_path / "q1.py", "tests/q1.py")
+
+    subm_paths = []
+    for i, (x, sleep) in enumerate([(2, 2), (3, 0), (2, 0)]):
+        nb = nbf.v4.new_notebook(
+            cells=[nbf.v4.new_code_cell(f"import time\ntime.sleep({sleep})\nx = {x}")]
+        )
+        subm_paths.append(str(tmp_path / f"subm{i}.ipynb"))
+        nbf.write(nb, subm_paths[-1])
+
+    # a submission that doesn't exist, to check that errors are captured
+    subm_paths.append(str(tmp_path / "missing.ipynb"))
+
+    return str(ag_path), subm_paths
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize("ordered", [True, False])
+def test_grade_submissions(ordered, batch_grading_files):
+    """
+    Tests for ``otter.api.grade_submissions``.
+    """
+    ag_path, subm_paths = batch_grading_files
+
+    results = list(
+        grade_submissions(
+            subm_paths, ag_path, workers=2, ordered=ordered, max_pending=3, quiet=True
+        )
+    )
+
+    paths = [p for p, _ in results]
+    if ordered:
+        assert paths == subm_paths
+    else:
+        assert sorted(paths) == sorted(subm_paths)
+        # the first submission sleeps, so it should finish after the second and third
+        assert paths.index(subm_paths[0]) > paths.index(subm_paths[1])
+
+    results = dict(results)
+    assert results[subm_paths[0]].total == 1
+    assert results[subm_paths[1]].total == 0
+    assert results[subm_paths[2]].total == 1
+    assert results[subm_paths[3]].has_catastrophic_failure()
+    assert isinstance(results[subm_paths[3]].catastrophic_error, FileNotFoundError)
+
+
+def test_grade_submissions_errors():
+    """
+    Tests the validation of arguments in ``otter.api.grade_submissions``.
+    """
+    with pytest.raises(ValueError, match="workers and max_pending must be positive"):
+        next(grade_submissions(["foo.ipynb"], workers=0))
+
+
+@pytest.mark.parametrize("lang", ["python", "r"])
+@mock.patch("otter.run.run_autograder.runners.r_session.start_session")
+def test_init_worker(mocked_start_session, lang, tmp_path):
+    """
+    Tests that ``grade_submissions`` workers start a persistent R session for R assignments.
+    """
+    (tmp_path / "otter_config.json").write_text(json.dumps({"lang": lang}))
+    _init_worker(str(tmp_path))
+
+    if lang == "r":
+        mocked_start_session.assert_called_once()
+    else:
+        mocked_start_session.assert_not_called()
@@ -2,18 +2,21 @@
 
 import nbformat as nbf
 import os
+import pickle
 import pytest
 import shutil
+import threading
 
 from glob import glob
 from unittest import mock
 
-from otter.assign import main as assign
+from otter.assign import assign_notebook, main as assign
 from otter.assign.assignment import Assignment
 from otter.assign.question_config import QuestionConfig
 from otter.assign.tests_manager import AssignmentTestsManager
 from otter.generate.token import APIClient
 from otter.test_files import TestCase
+from otter.test_files.bundle import BUNDLE_FILENAME, BUNDLE_FORMAT_VERSION
 from otter.utils import dump_yaml
 
 from ..utils import assert_dirs_equal, TestFileManager, unzip_to_temp
@@ -34,10 +37,41 @@ def cleanup_output(cleanup_enabled: bool):
 
 def check_gradescope_zipfile(path: str, correct_dir_path: str):
     """
-    Checks that the autograder zip file at ``path`` matches ``correct_dir_path``.
+    Checks that the autograder zip file at ``path`` matches ``correct_dir_path``. The contents of
+    test bundles and manifests are not compared because they depend on the versions of Python and
+    Otter.
     """
     with unzip_to_temp(path) as unzipped_dir:
-        assert_dirs_equal(unzipped_dir, correct_dir_path)
+        assert_dirs_equal(unzipped_dir, correct_dir_path, ignore_ext=[".bundle", ".sha256"])
+
+        for bundle_path in glob(os.path.join(unzipped_dir, "**", BUNDLE_FILENAME), recursive=True):
+            check_test_bundle(bundle_path)
+
+
+def check_test_bundle(path: str):
+    """
+    Checks that the test bundle at ``path`` contains each of the test files in its directory.
+    """
+    with open(path, "rb") as f:
+        bundle = pickle.load(f)
+
+    assert bundle["version"] == BUNDLE_FORMAT_VERSION
+
+    test_paths = glob(os.path.join(os.path.dirname(path), "*.py"))
+    assert set(bundle["tests"]) == {os.path.basename(p) for p in test_paths}
+
+    for test_path in test_paths:
+        entry = bundle["tests"][os.path.basename(test_path)]
+        with open(test_path) as f:
+            source = f.read()
+
+        env = {}
+        exec(source, env)
+        assert entry["source"] == source
+        assert entry["ok_format"] == env["OK_FORMAT"]
+        assert entry["size"] == os.path.getsize(test_path)
+        if entry["ok_format"]:
+            assert entry["spec"] == env["test"]
 
 
 def assign_and_check_output(nb_path, correct_dir, assign_kwargs={}, assert_dirs_equal_kwargs={}):
@@ -323,3 +357,136 @@ def test_lecture_notebook():
         FILE_MANAGER.get_path("lecture-notebook.ipynb"),
         FILE_MANAGER.get_path("lecture-notebook-correct"),
     )
+
+
+@mock.patch("otter.assign.run_tests")
+@mock.patch("otter.assign.export_notebook")
+def test_incremental_build(mocked_export, mocked_run_tests, generate_master_notebook):
+    """
+    Tests that PDFs aren't exported and tests aren't run again if their inputs haven't changed.
+    """
+    mocked_export.side_effect = lambda src, dest, **kwargs: open(dest, "w").write(dest)
+
+    master_nb_path = generate_master_notebook({"solutions_pdf": "filtered", "template_pdf": True})
+    output_path = FILE_MANAGER.get_path("output")
+    pdf_paths = [
+        FILE_MANAGER.get_path(f"output/autograder/master-{s}.pdf") for s in ["sol", "template"]
+    ]
+
+    def run_assign(**kwargs):
+        mocked_export.reset_mock()
+        mocked_run_tests.reset_mock()
+        assign(master_nb_path, output_path, **kwargs)
+        for p in pdf_paths:
+            with open(p) as f:
+                assert f.read() == p
+
+    def add_cell(cell):
+        nb = nbf.read(master_nb_path, as_version=nbf.NO_CONVERT)
+        nb.cells.append(cell)
+        nbf.write(nb, master_nb_path)
+
+    run_assign()
+    assert mocked_export.call_count == 2
+    mocked_run_tests.assert_called_once()
+
+    # nothing has changed, so the PDFs should be restored and the tests should be skipped
+    run_assign()
+    mocked_export.assert_not_called()
+    mocked_run_tests.assert_not_called()
+
+    # a Markdown cell outside of a question doesn't affect the filtered PDFs or the tests
+    add_cell(nbf.v4.new_markdown_cell("Some more instructions"))
+    run_assign()
+    mocked_export.assert_not_called()
+    mocked_run_tests.assert_not_called()
+
+    # a code cell outside of a question affects the tests but not the filtered PDFs
+    add_cell(nbf.v4.new_code_cell("x = 1"))
+    run_assign()
+    mocked_export.assert_not_called()
+    mocked_run_tests.assert_called_once()
+
+    run_assign(no_cache=True)
+    assert mocked_export.call_count == 2
+    mocked_run_tests.assert_called_once()
+
+
+def test_batch(tmp_path, capsys):
+    """
+    Tests running Otter Assign on the master notebooks in a batch file.
+    """
+    batch = [
+        {"master": FILE_MANAGER.get_path("example.ipynb"), "result": "example"},
+        {"master": FILE_MANAGER.get_path("exception-example.ipynb"), "result": "exception"},
+        {"master": "missing.ipynb", "result": "missing"},
+    ]
+    batch_path = tmp_path / "batch.yml"
+    batch_path.write_text(dump_yaml(batch))
+
+    with pytest.raises(RuntimeError, match="1 of 3 assignments failed"):
+        assign(batch=str(batch_path), jobs=2, no_run_tests=True)
+
+    assert_dirs_equal(
+        str(tmp_path / "example"),
+        FILE_MANAGER.get_path("example-correct"),
+        variable_path_exts=[".zip"],
+    )
+    assert_dirs_equal(
+        str(tmp_path / "exception"),
+        FILE_MANAGER.get_path("exception-correct"),
+        variable_path_exts=[".zip"],
+    )
+
+    output = capsys.readouterr().out
+    assert output.count("Assignment summary:") == 2
+    table = output.splitlines()[-4:]
+    assert table[0].split() == ["master", "tests", "status", "time", "(s)", "error"]
+    assert table[1].split()[1:4] == ["not", "run", "ok"]
+    assert table[2].split()[1:4] == ["not", "run", "ok"]
+    assert table[3].split()[1:4] == ["not", "run", "failed"]
+    assert "FileNotFoundError" in table[3]
+
+    with pytest.raises(ValueError, match="can't be used with a batch file"):
+        assign("example.ipynb", "dist", batch=str(batch_path))
+
+
+@mock.patch("otter.assign.run_tests")
+@mock.patch("otter.assign.export_notebook")
+def test_concurrent_stages(mocked_export, mocked_run_tests, generate_master_notebook):
+    """
+    Tests that PDFs are exported after the autograder zip file is generated and while the tests
+    are run in a separate process, and that each stage is timed.
+    """
+    barrier = threading.Barrier(2, timeout=10)
+
+    def export(src, dest, **kwargs):
+        # Otter Generate changes the working directory, so it must be done before PDFs are exported
+        assert glob(FILE_MANAGER.get_path("output/autograder/*.zip"))
+        barrier.wait()
+        open(dest, "w").close()
+
+    mocked_export.side_effect = export
+    mocked_run_tests.side_effect = lambda *args, **kwargs: barrier.wait()
+
+    master_nb_path = generate_master_notebook({"solutions_pdf": True})
+    res = assign_notebook(master_nb_path, FILE_MANAGER.get_path("output"))
+
+    mocked_export.assert_called_once()
+    mocked_run_tests.assert_called_once_with(mock.ANY, debug=False, in_subprocess=True)
+    assert res.tests == "passed"
+    assert set(res.stage_durations) == {"generate", "solutions_pdf", "run_tests"}
+
+
+@mock.patch(
+    "otter.assign.utils.grade_submission",
+    side_effect=AssertionError("the tests were run in this process"),
+)
+def test_run_tests_in_subprocess(_, generate_master_notebook):
+    """
+    Tests that the tests are run in a separate process when PDFs are exported at the same time.
+    """
+    master_nb_path = generate_master_notebook({"solutions_pdf": True})
+    res = assign_notebook(master_nb_path, FILE_MANAGER.get_path("output"))
+
+    assert res.tests == "passed"
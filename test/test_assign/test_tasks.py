@@ -0,0 +1,66 @@
+"""Tests for ``otter.assign.tasks``"""
+
+import pytest
+import threading
+import time
+
+from otter.assign.tasks import TaskGraph
+
+
+def test_run():
+    """
+    Tests that independent tasks run concurrently and dependent tasks run after their dependencies.
+    """
+    barrier = threading.Barrier(2, timeout=5)
+    order = []
+
+    def task(name, wait=False):
+        def run():
+            if wait:
+                barrier.wait()
+            order.append(name)
+
+        return run
+
+    graph = TaskGraph(max_workers=2)
+    graph.add("a", task("a", wait=True))
+    graph.add("b", task("b", wait=True))
+    graph.add("c", task("c"), depends_on=("a", "b"))
+    graph.run()
+
+    assert sorted(order[:2]) == ["a", "b"]
+    assert order[2] == "c"
+    assert set(graph.durations) == {"a", "b", "c"}
+
+    with pytest.raises(ValueError, match="depends on unknown task d"):
+        graph.add("e", task("e"), depends_on=("d",))
+
+    with pytest.raises(ValueError, match="Task a has already been added"):
+        graph.add("a", task("a"))
+
+
+@pytest.mark.parametrize("max_workers", [1, 4])
+def test_failures(max_workers):
+    """
+    Tests that the error of the first failed task is raised after all runnable tasks have run.
+    """
+    ran = []
+
+    def fail(name, delay):
+        def run():
+            time.sleep(delay)
+            ran.append(name)
+            raise RuntimeError(name)
+
+        return run
+
+    graph = TaskGraph(max_workers=max_workers)
+    graph.add("slow", fail("slow", 0.2))
+    graph.add("fast", fail("fast", 0))
+    graph.add("ok", lambda: ran.append("ok"))
+    graph.add("dependent", lambda: ran.append("dependent"), depends_on=("fast",))
+
+    with pytest.raises(RuntimeError, match="slow"):
+        graph.run()
+
+    assert sorted(ran) == ["fast", "ok", "slow"]
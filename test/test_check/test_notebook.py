@@ -127,7 +127,7 @@ def test_to_pdf_with_nb_path(mocked_export):
         mocked_resolve.return_value = nb_path
 
         grader.to_pdf(filtering=False)
-        mocked_export.assert_called_once_with(nb_path, filtering=False, pagebreaks=True)
+        mocked_export.assert_called_once_with(nb_path, filtering=False, pagebreaks=True, cache=True)
 
 
 @mock.patch("otter.check.notebook.dt")
@@ -154,7 +154,7 @@ def test_export(mocked_export, mocked_zf, mocked_dt, write_notebook):
         mocked_zf.assert_called_once_with(zip_name, mode="w")
         mocked_zf.return_value.write.assert_any_call(mocked_resolve.return_value)
         mocked_zf.return_value.write.assert_any_call(OTTER_LOG_FILENAME)
-        mocked_export.assert_called_once_with(NB_PATH, filtering=True, pagebreaks=True)
+        mocked_export.assert_called_once_with(NB_PATH, filtering=True, pagebreaks=True, cache=True)
         mocked_zf.return_value.writestr.assert_called_with(
             _ZIP_NAME_FILENAME, os.path.basename(zip_name)
         )
@@ -208,10 +208,10 @@ def test_export_with_directory_in_files(mocked_zf, write_notebook):
         shutil.rmtree(dir_path)
 
 
-@mock.patch("otter.check.utils.Button")
-@mock.patch("otter.check.utils.HTML")
-@mock.patch("otter.check.utils.Output")
-@mock.patch("otter.check.utils.VBox")
+@mock.patch("ipywidgets.Button")
+@mock.patch("ipywidgets.HTML")
+@mock.patch("ipywidgets.Output")
+@mock.patch("ipywidgets.VBox")
 @mock.patch("otter.check.utils.display")
 @mock.patch("otter.check.notebook.dt")
 @mock.patch("otter.check.notebook.zipfile.ZipFile")
@@ -248,7 +248,7 @@ def test_export_with_no_pdf_ack(
     with pytest.warns(UserWarning, match="Could not locate a PDF to include"):
         grader.export()
 
-    mocked_export.assert_called_with(NB_PATH, filtering=True, pagebreaks=True)
+    mocked_export.assert_called_with(NB_PATH, filtering=True, pagebreaks=True, cache=True)
 
     mocked_ipyw_output.assert_called()
     mocked_ipyw_html.assert_any_call("""<p style="margin: 0">no pdf</p>""")
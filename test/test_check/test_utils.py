@@ -9,7 +9,7 @@ from otter.check.utils import save_notebook
 
 @mock.patch("otter.check.utils.os.path.getsize")
 @mock.patch("otter.check.utils.os.path.getmtime")
-@mock.patch("otter.check.utils.ipylab")
+@mock.patch("ipylab.JupyterFrontEnd")
 @mock.patch("otter.check.utils.Javascript")
 @mock.patch("otter.check.utils.display")
 @mock.patch("otter.check.utils.get_ipython")
@@ -17,7 +17,7 @@ def test_save_notebook(
     mocked_get_ipython,
     mocked_display,
     mocked_Javascript,
-    mocked_ipylab,
+    mocked_JupyterFrontEnd,
     mocked_getmtime,
     mocked_getsize,
 ):
@@ -34,9 +34,7 @@ def test_save_notebook(
 
     assert end - start > 10  # check that it slept in between checks
     mocked_display.assert_called_with(mocked_Javascript.return_value)
-    mocked_ipylab.JupyterFrontEnd.return_value.commands.execute.assert_called_with(
-        "docmanager:save"
-    )
+    mocked_JupyterFrontEnd.return_value.commands.execute.assert_called_with("docmanager:save")
 
     # check successful save
     mocked_getmtime.side_effect = [1.0, 1.0, 1.0, 1.0, 1.0, 1.0, 2.0]
@@ -49,9 +47,7 @@ def test_save_notebook(
 
     assert end - start > 1  # check that it slept in between checks
     mocked_display.assert_called_with(mocked_Javascript.return_value)
-    mocked_ipylab.JupyterFrontEnd.return_value.commands.execute.assert_called_with(
-        "docmanager:save"
-    )
+    mocked_JupyterFrontEnd.return_value.commands.execute.assert_called_with("docmanager:save")
 
     mocked_display.reset_mock()
 
@@ -54,7 +54,7 @@ def test_version(mocked_version, run_cli):
     mocked_version.assert_called_once_with(logo=True)
 
 
-@mock.patch("otter.cli.assign")
+@mock.patch("otter.assign.main", autospec=True)
 @mock.patch("otter.cli.logging")
 def test_verbosity(mocked_logging, _, run_cli):
     """
@@ -75,7 +75,7 @@ def test_verbosity(mocked_logging, _, run_cli):
     mocked_logging.set_level.assert_called_with(logging.DEBUG)
 
 
-@mock.patch("otter.cli.assign")
+@mock.patch("otter.assign.main", autospec=True)
 def test_assign(mocked_assign, run_cli):
     """
     Tests the ``otter assign`` CLI command.
@@ -93,6 +93,9 @@ def test_assign(mocked_assign, run_cli):
         username=None,
         password=None,
         debug=False,
+        no_cache=False,
+        batch=None,
+        jobs=None,
     )
 
     result = run_cli([*cmd_start])
@@ -116,6 +119,17 @@ def test_assign(mocked_assign, run_cli):
     assert_cli_result(result, expect_error=False)
     mocked_assign.assert_called_with(**{**std_kwargs, "debug": True})
 
+    result = run_cli([*cmd_start, "--no-cache"])
+    assert_cli_result(result, expect_error=False)
+    mocked_assign.assert_called_with(**{**std_kwargs, "no_cache": True})
+
+    open("batch.yml", "w+").close()
+    result = run_cli(["assign", "--batch", "batch.yml", "-j", "2"])
+    assert_cli_result(result, expect_error=False)
+    mocked_assign.assert_called_with(
+        **{**std_kwargs, "master": None, "result": None, "batch": "batch.yml", "jobs": 2}
+    )
+
     # test invalid calls
     mocked_assign.reset_mock()
 
@@ -132,8 +146,12 @@ def test_assign(mocked_assign, run_cli):
     assert_cli_result(result, expect_error=True)
     mocked_assign.assert_not_called()
 
+    result = run_cli([*cmd_start, "--batch", "batch.yml"])
+    assert_cli_result(result, expect_error=True)
+    mocked_assign.assert_not_called()
+
 
-@mock.patch("otter.cli.check")
+@mock.patch("otter.check.main", autospec=True)
 def test_check(mocked_check, run_cli):
     """
     Tests the ``otter check`` CLI command.
@@ -201,7 +219,7 @@ def test_check(mocked_check, run_cli):
     mocked_check.assert_not_called()
 
 
-@mock.patch("otter.cli.export")
+@mock.patch("otter.export.main", autospec=True)
 def test_export(mocked_export, run_cli):
     """
     Tests the ``otter export`` CLI command.
@@ -212,13 +230,19 @@ def test_export(mocked_export, run_cli):
     open(src, "w+").close()
 
     std_kwargs = dict(
-        src=src,
+        src=[src],
         dest=None,
+        output_dir=None,
         exporter=None,
         filtering=False,
         pagebreaks=False,
         save=False,
         xecjk=False,
+        jobs=4,
+        cache=False,
+        cache_dir=None,
+        max_image_size=None,
+        dedupe_images=False,
     )
 
     result = run_cli([*cmd_start])
@@ -229,6 +253,24 @@ def test_export(mocked_export, run_cli):
     assert_cli_result(result, expect_error=False)
     mocked_export.assert_called_with(**{**std_kwargs, "dest": "foo.pdf"})
 
+    # the second of two paths is DEST if it isn't a notebook or directory
+    result = run_cli([*cmd_start, "out"])
+    assert_cli_result(result, expect_error=False)
+    mocked_export.assert_called_with(**{**std_kwargs, "dest": "out"})
+
+    open("out.txt", "w+").close()
+    result = run_cli([*cmd_start, "out.txt"])
+    assert_cli_result(result, expect_error=False)
+    mocked_export.assert_called_with(**{**std_kwargs, "dest": "out.txt"})
+
+    os.mkdir("nbs")
+    result = run_cli([*cmd_start, "nbs"])
+    assert_cli_result(result, expect_error=False)
+    mocked_export.assert_called_with(**{**std_kwargs, "src": [src, "nbs"]})
+
+    result = run_cli([*cmd_start, "nbs", "missing"])
+    assert_cli_result(result, expect_error=True)
+
     result = run_cli([*cmd_start, "--filtering"])
     assert_cli_result(result, expect_error=False)
     mocked_export.assert_called_with(**{**std_kwargs, "filtering": True})
@@ -257,6 +299,49 @@ def test_export(mocked_export, run_cli):
     assert_cli_result(result, expect_error=False)
     mocked_export.assert_called_with(**{**std_kwargs, "exporter": "html"})
 
+    result = run_cli([*cmd_start, "-j", "2"])
+    assert_cli_result(result, expect_error=False)
+    mocked_export.assert_called_with(**{**std_kwargs, "jobs": 2})
+
+    result = run_cli([*cmd_start, "--jobs", "2"])
+    assert_cli_result(result, expect_error=False)
+    mocked_export.assert_called_with(**{**std_kwargs, "jobs": 2})
+
+    result = run_cli([*cmd_start, "--cache"])
+    assert_cli_result(result, expect_error=False)
+    mocked_export.assert_called_with(**{**std_kwargs, "cache": True})
+
+    result = run_cli([*cmd_start, "--cache-dir", "cache"])
+    assert_cli_result(result, expect_error=False)
+    mocked_export.assert_called_with(**{**std_kwargs, "cache_dir": "cache"})
+
+    result = run_cli([*cmd_start, "--max-image-size", "800"])
+    assert_cli_result(result, expect_error=False)
+    mocked_export.assert_called_with(**{**std_kwargs, "max_image_size": 800})
+
+    result = run_cli([*cmd_start, "--dedupe-images"])
+    assert_cli_result(result, expect_error=False)
+    mocked_export.assert_called_with(**{**std_kwargs, "dedupe_images": True})
+
+    # test exporting multiple notebooks
+    os.mkdir("bar")
+    open("bar.ipynb", "w+").close()
+    result = run_cli([*cmd_start, "bar.ipynb", "bar"])
+    assert_cli_result(result, expect_error=False)
+    mocked_export.assert_called_with(**{**std_kwargs, "src": [src, "bar.ipynb", "bar"]})
+
+    result = run_cli([*cmd_start, "bar.ipynb", "-o", "bar"])
+    assert_cli_result(result, expect_error=False)
+    mocked_export.assert_called_with(
+        **{**std_kwargs, "src": [src, "bar.ipynb"], "output_dir": "bar"}
+    )
+
+    result = run_cli([*cmd_start, "bar.ipynb", "--output-dir", "bar"])
+    assert_cli_result(result, expect_error=False)
+    mocked_export.assert_called_with(
+        **{**std_kwargs, "src": [src, "bar.ipynb"], "output_dir": "bar"}
+    )
+
     # test invalid calls
     mocked_export.reset_mock()
 
@@ -264,12 +349,11 @@ def test_export(mocked_export, run_cli):
     assert_cli_result(result, expect_error=True)
     mocked_export.assert_not_called()
 
-    result = run_cli(["export", "bar.ipynb"])
+    result = run_cli(["export", "baz.ipynb"])
     assert_cli_result(result, expect_error=True)
     mocked_export.assert_not_called()
 
-    os.mkdir("bar")
-    result = run_cli(["export", "bar"])
+    result = run_cli([*cmd_start, "baz.ipynb"])
     assert_cli_result(result, expect_error=True)
     mocked_export.assert_not_called()
 
@@ -277,8 +361,16 @@ def test_export(mocked_export, run_cli):
     assert_cli_result(result, expect_error=True)
     mocked_export.assert_not_called()
 
+    result = run_cli([*cmd_start, "-j", "0"])
+    assert_cli_result(result, expect_error=True)
+    mocked_export.assert_not_called()
 
-@mock.patch("otter.cli.generate")
+    result = run_cli([*cmd_start, "-o", "baz"])
+    assert_cli_result(result, expect_error=True)
+    mocked_export.assert_not_called()
+
+
+@mock.patch("otter.generate.main", autospec=True)
 def test_generate(mocked_generate, run_cli):
     """
     Tests the ``otter generate`` CLI command.
@@ -379,6 +471,14 @@ def test_generate(mocked_generate, run_cli):
     assert_cli_result(result, expect_error=False)
     mocked_generate.assert_called_with(**{**std_kwargs, "channel_priority_strict": True})
 
+    result = run_cli([*cmd_start, "--lock"])
+    assert_cli_result(result, expect_error=False)
+    mocked_generate.assert_called_with(**{**std_kwargs, "lock": True})
+
+    result = run_cli([*cmd_start, "--relock"])
+    assert_cli_result(result, expect_error=False)
+    mocked_generate.assert_called_with(**{**std_kwargs, "relock": True})
+
     # test invalid calls
     mocked_generate.reset_mock()
 
@@ -415,7 +515,7 @@ def test_generate(mocked_generate, run_cli):
     mocked_generate.assert_not_called()
 
 
-@mock.patch("otter.cli.grade")
+@mock.patch("otter.grade.main", autospec=True)
 def test_grade(mocked_grade, run_cli):
     """
     Tests the ``otter grade`` CLI command.
@@ -490,6 +590,14 @@ def test_grade(mocked_grade, run_cli):
     assert_cli_result(result, expect_error=False)
     mocked_grade.assert_called_with(**{**std_kwargs, "pdfs": True})
 
+    result = run_cli([*cmd_start, "--cell-profiles"])
+    assert_cli_result(result, expect_error=False)
+    mocked_grade.assert_called_with(**{**std_kwargs, "cell_profiles": True})
+
+    result = run_cli([*cmd_start, "--test-timings"])
+    assert_cli_result(result, expect_error=False)
+    mocked_grade.assert_called_with(**{**std_kwargs, "test_timings": True})
+
     result = run_cli([*cmd_start, "--containers", "10"])
     assert_cli_result(result, expect_error=False)
     mocked_grade.assert_called_with(**{**std_kwargs, "containers": 10})
@@ -530,7 +638,7 @@ def test_grade(mocked_grade, run_cli):
     mocked_grade.assert_not_called()
 
 
-@mock.patch("otter.cli.run")
+@mock.patch("otter.run.main", autospec=True)
 def test_run(mocked_run, run_cli):
     """
     Tests the ``otter run`` CLI command.
@@ -587,6 +695,10 @@ def test_run(mocked_run, run_cli):
     assert_cli_result(result, expect_error=False)
     mocked_run.assert_called_with(**{**std_kwargs, "debug": True})
 
+    result = run_cli([*cmd_start, "--no-cache"])
+    assert_cli_result(result, expect_error=False)
+    mocked_run.assert_called_with(**{**std_kwargs, "no_cache": True})
+
     # test invalid calls
     mocked_run.reset_mock()
 
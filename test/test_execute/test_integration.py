@@ -97,7 +97,14 @@ def test_log_execution(temp_dir):
     for d in expected_results.values():
         d["path"] = os.path.join(test_dir, os.path.split(d["path"])[1])
 
-    assert results.to_dict() == expected_results
+    # remove test case timings, which vary between runs
+    got_results = results.to_dict()
+    for d in got_results.values():
+        for tcr in d["test_case_results"]:
+            assert tcr.pop("wall_time") >= 0
+            tcr.pop("peak_rss_delta")
+
+    assert got_results == expected_results
 
 
 @mock.patch("otter.execute.pickle.load")
@@ -125,3 +132,177 @@ def test_results_load_failure_handling(mocked_pickle_load, temp_dir):
     )
 
     assert results.has_catastrophic_failure()
+
+
+def test_output_budgets(temp_dir):
+    """
+    Tests that ``otter.execute.grade_notebook`` truncates outputs that exceed the output budgets.
+    """
+    nb = nbf.v4.new_notebook(
+        cells=[
+            nbf.v4.new_code_cell("for _ in range(100):\n    print('a' * 10)"),
+            nbf.v4.new_code_cell("print('b' * 10)"),
+            nbf.v4.new_code_cell(
+                "from IPython.display import display, HTML\nprint('c')\ndisplay(HTML('d' * 100))"
+            ),
+            nbf.v4.new_code_cell("print('e' * 100)"),
+            nbf.v4.new_code_cell("x = 2"),
+        ]
+    )
+    subm_path = os.path.join(temp_dir, "submission.ipynb")
+    nbf.write(nb, subm_path)
+
+    test_dir = os.path.join(temp_dir, "tests")
+    os.makedirs(test_dir)
+
+    write_ok_test(os.path.join(test_dir, "q1.py"), ">>> assert x == 2")
+
+    results = grade_notebook(
+        subm_path,
+        test_dir=test_dir,
+        tests_glob=glob(os.path.join(test_dir, "*.py")),
+        ignore_errors=False,
+        max_cell_output_size=50,
+        max_notebook_output_size=120,
+    )
+
+    assert results.total == 1
+
+    def get_cell_outputs(source_prefix):
+        for cell in results.notebook.cells:
+            if cell.cell_type == "code" and cell.source.startswith(source_prefix):
+                return cell.outputs
+
+    outputs = get_cell_outputs("for _")
+    text = "".join(o.text for o in outputs)
+    assert text.startswith("aaaaaaaaaa\n" * 4 + "aaaaaa\n[Output truncated by Otter: the cell")
+    assert text.count("aaaaaaaaaa") == 4
+
+    outputs = get_cell_outputs("print('b'")
+    assert len(outputs) == 1 and outputs[0].text == "bbbbbbbbbb\n"
+
+    outputs = get_cell_outputs("from IPython")
+    assert len(outputs) == 2 and outputs[0].text == "c\n"
+    assert outputs[1].output_type == "display_data"
+    assert list(outputs[1].data.keys()) == ["text/plain"]
+    assert (
+        outputs[1]
+        .data["text/plain"]
+        .startswith(
+            "[text/plain, text/html output of 134 characters omitted]\n[Output truncated by Otter: "
+            "the cell output limit of 50 characters was exceeded]"
+        )
+    )
+
+    # the notebook budget is exhausted by this point
+    outputs = get_cell_outputs("print('e'")
+    assert len(outputs) == 1
+    assert outputs[0].text.startswith("e" * 9 + "\n[Output truncated by Otter: the notebook output")
+
+
+def test_output_limits_display_updates_and_widgets(temp_dir):
+    """
+    Tests that updated displays and outputs captured by ipywidgets ``Output`` widgets are subject
+    to the output limits of ``otter.execute.grade_notebook``.
+    """
+    nb = nbf.v4.new_notebook(
+        cells=[
+            nbf.v4.new_code_cell(
+                "from IPython.display import display, HTML\n"
+                "h = display(HTML('f'), display_id=True)\n"
+                "h.update(HTML('g' * 200))"
+            ),
+            nbf.v4.new_code_cell(
+                "from ipywidgets import Output\n"
+                "out = Output()\n"
+                "display(out)\n"
+                "with out:\n"
+                "    for _ in range(20):\n"
+                "        print('w' * 10)"
+            ),
+            nbf.v4.new_code_cell("x = 2"),
+        ]
+    )
+    subm_path = os.path.join(temp_dir, "submission.ipynb")
+    nbf.write(nb, subm_path)
+
+    test_dir = os.path.join(temp_dir, "tests")
+    os.makedirs(test_dir)
+
+    write_ok_test(os.path.join(test_dir, "q1.py"), ">>> assert x == 2")
+
+    results = grade_notebook(
+        subm_path,
+        test_dir=test_dir,
+        tests_glob=glob(os.path.join(test_dir, "*.py")),
+        ignore_errors=False,
+        max_cell_output_size=150,
+        max_notebook_output_size=1000,
+    )
+
+    assert results.total == 1
+
+    cells = [c for c in results.notebook.cells if c.cell_type == "code"]
+    outputs = next(c.outputs for c in cells if "h.update" in c.source)
+    assert len(outputs) == 1
+    assert (
+        outputs[0]
+        .data["text/plain"]
+        .startswith(
+            "[text/plain, text/html output of 234 characters omitted]\n[Output truncated by Otter: "
+            "the cell output limit of 150 characters was exceeded]"
+        )
+    )
+
+    # the widget's own display output uses 96 characters of the cell's budget
+    widget_state = results.notebook.metadata.widgets["application/vnd.jupyter.widget-state+json"]
+    widget_outputs = next(
+        s["state"]["outputs"]
+        for s in widget_state["state"].values()
+        if s["model_name"] == "OutputModel"
+    )
+    text = "".join(o["text"] for o in widget_outputs)
+    assert text.startswith("wwwwwwwwww\n" * 4 + "wwwwwwwwww\n[Output truncated by Otter: the cell")
+    assert text.count("wwwwwwwwww") == 5
+
+
+def test_cell_profiles(temp_dir):
+    """
+    Tests that ``otter.execute.grade_notebook`` records the execution profile of each code cell.
+    """
+    nb = nbf.v4.new_notebook(
+        cells=[
+            nbf.v4.new_markdown_cell("# Submission"),
+            nbf.v4.new_code_cell("import time\ntime.sleep(0.2)"),
+            nbf.v4.new_code_cell(""),
+            nbf.v4.new_code_cell("x = 2"),
+            nbf.v4.new_code_cell("1 / 0"),
+        ]
+    )
+    subm_path = os.path.join(temp_dir, "submission.ipynb")
+    nbf.write(nb, subm_path)
+
+    test_dir = os.path.join(temp_dir, "tests")
+    os.makedirs(test_dir)
+
+    write_ok_test(os.path.join(test_dir, "q1.py"), ">>> assert x == 2")
+
+    results = grade_notebook(
+        subm_path,
+        test_dir=test_dir,
+        tests_glob=glob(os.path.join(test_dir, "*.py")),
+        ignore_errors=True,
+    )
+
+    assert results.total == 1
+
+    submission_profiles = [p for p in results.cell_profiles if p.submission_index is not None]
+    assert [p.submission_index for p in submission_profiles] == [1, 3, 4]
+    assert [p.errored for p in submission_profiles] == [False, False, True]
+    assert submission_profiles[0].wall_time >= 0.2
+    for p in submission_profiles:
+        assert results.notebook.cells[p.index].source == nb.cells[p.submission_index].source
+
+    # Otter's own cells (e.g. the init and export cells) are also profiled
+    assert len(results.cell_profiles) > len(submission_profiles)
+    assert all(not p.errored for p in results.cell_profiles if p.submission_index is None)
@@ -0,0 +1,131 @@
+"""Tests for ``otter.execute.logging``"""
+
+import logging
+import pytest
+import time
+
+from unittest import mock
+
+from otter import logging as otter_logging
+from otter.execute.logging import get_log_collector, LogCollector
+from otter.logging import BatchSocketHandler
+
+
+@pytest.fixture
+def collector():
+    c = LogCollector()
+    c.start()
+    yield c
+    c.stop()
+
+
+def make_record(msg, level=logging.INFO):
+    return logging.LogRecord("otter.foo", level, __file__, 1, msg, None, None, func="bar")
+
+
+def wait_for(predicate, timeout=5):
+    start = time.monotonic()
+    while not predicate() and time.monotonic() - start < timeout:
+        time.sleep(0.01)
+
+
+def test_batching(collector):
+    """
+    Tests that ``BatchSocketHandler`` sends records in batches that the collector receives.
+    """
+    received = []
+    with mock.patch.object(collector, "handle_log_record", side_effect=received.append):
+        handler = BatchSocketHandler(collector.host, collector.port, capacity=3)
+
+        handler.emit(make_record("a"))
+        handler.emit(make_record("b"))
+        time.sleep(0.1)
+        assert received == []
+
+        handler.emit(make_record("c"))
+        wait_for(lambda: len(received) == 3)
+        assert [r.getMessage() for r in received] == ["a", "b", "c"]
+
+        # warnings are sent immediately
+        handler.emit(make_record("d", logging.WARNING))
+        wait_for(lambda: len(received) == 4)
+        assert received[-1].getMessage() == "d"
+
+        # records remaining in the buffer are sent when the handler is closed
+        handler.emit(make_record("e %s", logging.DEBUG))
+        handler.close()
+        wait_for(lambda: len(received) == 5)
+        assert received[-1].getMessage() == "e %s"
+        assert received[-1].funcName == "bar"
+
+
+def test_multiple_connections(collector):
+    """
+    Tests that the collector handles logs from multiple connections.
+    """
+    received = []
+    with mock.patch.object(collector, "handle_log_record", side_effect=received.append):
+        handlers = [BatchSocketHandler(collector.host, collector.port) for _ in range(3)]
+        for i, h in enumerate(handlers):
+            h.emit(make_record(str(i)))
+            h.close()
+
+        wait_for(lambda: len(received) == 3)
+        assert sorted(r.getMessage() for r in received) == ["0", "1", "2"]
+
+
+def test_level_filtering(collector):
+    """
+    Tests that the collector only forwards records at or above the current log level.
+    """
+    with mock.patch.object(logging.Logger, "handle") as mocked_handle:
+        handler = BatchSocketHandler(collector.host, collector.port)
+        with otter_logging.level_context(logging.INFO):
+            handler.emit(make_record("a", logging.DEBUG))
+            handler.emit(make_record("b", logging.INFO))
+            handler.close()
+            wait_for(lambda: mocked_handle.call_count == 1)
+            time.sleep(0.1)
+
+    assert mocked_handle.call_count == 1
+    assert mocked_handle.call_args.args[0].getMessage() == "b"
+
+
+def test_stop():
+    """
+    Tests that the collector stops promptly and handles logs sent before it is stopped.
+    """
+    c = LogCollector()
+    c.start()
+    assert c.running
+
+    received = []
+    with mock.patch.object(c, "handle_log_record", side_effect=received.append):
+        handler = BatchSocketHandler(c.host, c.port)
+        handler.emit(make_record("a"))
+        handler.flush()
+
+        start = time.monotonic()
+        c.stop()
+        assert time.monotonic() - start < 0.5
+
+    assert not c.running
+    assert [r.getMessage() for r in received] == ["a"]
+
+    # sending logs after the collector is stopped should drop them silently
+    handler.emit(make_record("b"))
+    handler.close()
+
+
+def test_get_log_collector():
+    """
+    Tests that the log collector is shared and restarted if it was stopped.
+    """
+    c = get_log_collector()
+    assert c.running
+    assert get_log_collector() is c
+
+    c.stop()
+    c2 = get_log_collector()
+    assert c2 is not c
+    assert c2.running
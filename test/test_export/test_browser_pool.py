@@ -0,0 +1,131 @@
+"""Tests for ``otter.export.exporters.browser_pool``"""
+
+import asyncio
+import pytest
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from otter.export.exporters.browser_pool import BrowserPool
+
+
+class FakePage:
+    """
+    A fake Playwright page that "renders" the contents of the file it was navigated to.
+    """
+
+    def __init__(self, browser):
+        self.browser = browser
+        self.path = None
+        self.closed = False
+
+    async def emulate_media(self, media):
+        pass
+
+    async def goto(self, url, wait_until):
+        self.path = url[len("file://") :]
+        with open(self.path) as f:
+            self.contents = f.read()
+
+        if self.contents == "fail":
+            raise RuntimeError("failed to render")
+
+        with self.browser.lock:
+            self.browser.active += 1
+            self.browser.max_active = max(self.browser.max_active, self.browser.active)
+
+    async def wait_for_timeout(self, timeout):
+        await asyncio.sleep(timeout / 1000)
+
+    async def pdf(self, **kwargs):
+        with self.browser.lock:
+            self.browser.active -= 1
+        return f"pdf of {self.contents}".encode()
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+
+    def __init__(self):
+        self.pages = []
+        self.closed = False
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+
+    async def new_page(self):
+        page = FakePage(self)
+        self.pages.append(page)
+        return page
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def fake_playwright():
+    browser = FakeBrowser()
+    playwright = mock.AsyncMock()
+    playwright.chromium.launch.return_value = browser
+
+    with mock.patch("playwright.async_api.async_playwright") as mocked_async_playwright:
+        mocked_async_playwright.return_value.start = mock.AsyncMock(return_value=playwright)
+        yield playwright, browser
+
+
+def test_render(fake_playwright):
+    """
+    Tests that the pool launches one browser and renders documents concurrently with its pages.
+    """
+    playwright, browser = fake_playwright
+
+    with BrowserPool(size=2, disable_sandbox=True) as pool:
+        assert pool.running
+        with ThreadPoolExecutor(4) as executor:
+            pdfs = list(executor.map(lambda i: pool.render(f"doc {i}"), range(6)))
+
+    assert pdfs == [f"pdf of doc {i}".encode() for i in range(6)]
+    playwright.chromium.launch.assert_called_once()
+    assert playwright.chromium.launch.call_args.kwargs["args"] == ["--no-sandbox"]
+    assert len(browser.pages) == 2
+    assert browser.max_active <= 2
+
+    assert not pool.running
+    assert browser.closed
+    playwright.stop.assert_called_once()
+
+
+def test_render_errors(fake_playwright):
+    """
+    Tests that pages that fail to render are replaced.
+    """
+    _, browser = fake_playwright
+
+    with BrowserPool(size=1) as pool:
+        with pytest.raises(RuntimeError, match="failed to render"):
+            pool.render("fail")
+
+        assert browser.pages[0].closed
+        assert pool.render("ok") == b"pdf of ok"
+        assert len(browser.pages) == 2
+
+    with pytest.raises(RuntimeError, match="The browser pool has not been started"):
+        pool.render("ok")
+
+
+def test_launch_failure(fake_playwright):
+    """
+    Tests the error raised when Chromium can't be launched.
+    """
+    playwright, _ = fake_playwright
+    playwright.chromium.launch.side_effect = Exception("no chromium")
+
+    pool = BrowserPool()
+    with pytest.raises(RuntimeError, match="playwright install chromium"):
+        pool.start()
+
+    assert not pool.running
+    playwright.stop.assert_called_once()
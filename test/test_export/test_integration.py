@@ -3,24 +3,36 @@
 # NOTES:
 # - tests do not check for PDF equality
 
+import base64
 import filecmp
+import io
+import json
 import nbconvert
 import nbformat
 import os
 import pytest
+import sys
+import threading
 
 from contextlib import nullcontext
 from glob import glob
+from textwrap import dedent
 from unittest import mock
 
-from otter.export import main as export
-from otter.export.exporters.base_exporter import BaseExporter
+from otter.export import export_notebooks, main as export
+from otter.export.exporters import base_exporter
+from otter.export.exporters.base_exporter import BaseExporter, ExportFailedException
+from otter.export.exporters.utils import DUPLICATE_IMAGE_TEXT, get_referenced_files
+from otter.export.exporters.via_latex import PDFViaLatexExporter
 
 from ..utils import TestFileManager
 
 
 FILE_MANAGER = TestFileManager(__file__)
 
+COMPILE_LATEX = PDFViaLatexExporter.compile_latex
+"""``PDFViaLatexExporter.compile_latex``, which is mocked when PDF generation is disabled"""
+
 
 @pytest.fixture(autouse=True)
 def cleanup_output(cleanup_enabled):
@@ -32,6 +44,7 @@ def cleanup_output(cleanup_enabled):
         for file in (
             glob(FILE_MANAGER.get_path("*.pdf"))
             + glob(FILE_MANAGER.get_path("*.tex"))
+            + glob(FILE_MANAGER.get_path("*.html"))
             + [FILE_MANAGER.get_path("output.ipynb")]
         ):
             if os.path.exists(file):
@@ -42,9 +55,9 @@ def cleanup_output(cleanup_enabled):
 def disable_pdf_generation(pdfs_enabled):
     if not pdfs_enabled:
 
-        def create_fake_pdf(exporter, nb):
+        def create_fake_pdf(exporter, nb, **kwargs):
             contents = "pdf contents"
-            if isinstance(exporter, nbconvert.PDFExporter):
+            if isinstance(exporter, nbconvert.WebPDFExporter):
                 contents = contents.encode("utf-8")
             return contents, {}
 
@@ -54,11 +67,12 @@ def disable_pdf_generation(pdfs_enabled):
         cm2 = mock.patch(
             "otter.export.exporters.via_latex.nbconvert.export", side_effect=create_fake_pdf
         )
+        cm3 = mock.patch.object(PDFViaLatexExporter, "compile_latex", return_value=b"pdf contents")
 
     else:
-        cm, cm2 = nullcontext(), nullcontext()
+        cm, cm2, cm3 = nullcontext(), nullcontext(), nullcontext()
 
-    with cm, cm2:
+    with cm, cm2, cm3:
         yield
 
 
@@ -131,6 +145,84 @@ def test_load_notebook():
     )
 
 
+def test_load_notebook_images(tmp_path):
+    """
+    Tests that images are downscaled and deduplicated by load_notebook
+    """
+    from PIL import Image
+
+    def encode_image(width, height, fmt):
+        buf = io.BytesIO()
+        Image.linear_gradient("L").resize((width, height)).convert("RGB").save(buf, format=fmt)
+        return base64.b64encode(buf.getvalue()).decode("ascii")
+
+    def image_size(data):
+        return Image.open(io.BytesIO(base64.b64decode(data))).size
+
+    large_png, small_png = encode_image(2000, 1000, "PNG"), encode_image(100, 100, "PNG")
+    large_jpeg = encode_image(1200, 1200, "JPEG")
+
+    def image_output(mime_type, data):
+        return nbformat.v4.new_output(
+            "display_data", data={mime_type: data, "text/plain": "<Figure>"}
+        )
+
+    nb = nbformat.v4.new_notebook(
+        cells=[
+            nbformat.v4.new_code_cell(
+                "plot()",
+                outputs=[
+                    image_output("image/png", large_png),
+                    image_output("image/png", small_png),
+                    image_output("image/jpeg", large_jpeg),
+                ],
+            ),
+            nbformat.v4.new_code_cell(
+                "plot()",
+                outputs=[
+                    image_output("image/png", large_png),
+                    image_output("image/png", "not an image"),
+                ],
+            ),
+        ],
+    )
+    nb.cells.append(nbformat.v4.new_markdown_cell("![img](attachment:img.png)"))
+    nb.cells[-1].attachments = {"img.png": {"image/png": large_png}}
+
+    nb_path = tmp_path / "nb.ipynb"
+    nbformat.write(nb, nb_path)
+
+    # images shouldn't be changed by default
+    node = BaseExporter.load_notebook(str(nb_path))
+    assert node.cells == nb.cells
+
+    node = BaseExporter.load_notebook(str(nb_path), max_image_size=500, dedupe_images=True)
+    outputs = node.cells[0].outputs
+    assert image_size(outputs[0].data["image/png"]) == (500, 250)
+    assert len(outputs[0].data["image/png"]) < len(large_png)
+    assert image_size(outputs[1].data["image/png"]) == (100, 100)
+    assert image_size(outputs[2].data["image/jpeg"]) == (500, 500)
+    assert node.cells[1].outputs[0].data == {"text/plain": DUPLICATE_IMAGE_TEXT}
+    assert node.cells[1].outputs[1].data["image/png"] == "not an image"
+    assert image_size(node.cells[2].attachments["img.png"]["image/png"]) == (500, 250)
+
+    # an error is raised if Pillow isn't installed
+    with (
+        mock.patch.dict(sys.modules, {"PIL": None}),
+        pytest.raises(ImportError, match="Pillow is required"),
+    ):
+        BaseExporter.load_notebook(str(nb_path), max_image_size=500)
+
+    with (
+        mock.patch.dict(sys.modules, {"PIL": None}),
+        mock.patch("otter.export.export_notebook") as mocked_export_notebook,
+        pytest.raises(ImportError, match="pip install otter-grader\\[export\\]"),
+    ):
+        export(str(nb_path), max_image_size=500)
+
+    mocked_export_notebook.assert_not_called()
+
+
 def test_different_language_encoding(pdfs_enabled):
     """
     Tests that a notebook with non-UTF-8 characters can be exported
@@ -143,5 +235,287 @@ def test_different_language_encoding(pdfs_enabled):
         save=True,
     )
 
-    # check existence of pdf
+    # check existence of pdf and html
     FILE_MANAGER.assert_path_exists(FILE_MANAGER.get_path(f"{test_file}.pdf"), dir_okay=False)
+    FILE_MANAGER.assert_path_exists(FILE_MANAGER.get_path(f"{test_file}.html"), dir_okay=False)
+
+
+def test_export_notebooks(pdfs_enabled):
+    """
+    Tests exporting several notebooks via HTML with a shared browser pool
+    """
+    test_files = ["successful-html-test", "success-pagebreak-test", "no-close-tag-test"]
+    nb_paths = [FILE_MANAGER.get_path(f"{f}.ipynb") for f in test_files]
+
+    cm = nullcontext()
+    if not pdfs_enabled:
+        cm = mock.patch("otter.export.exporters.browser_pool.BrowserPool")
+
+    with cm as mocked_pool:
+        if mocked_pool is not None:
+            mocked_pool.return_value.render.return_value = b"pdf contents"
+
+        results = export_notebooks(nb_paths, exporter_type="html", jobs=2, filtering=True)
+
+    assert results == [(FILE_MANAGER.get_path(f"{f}.pdf"), None) for f in test_files]
+    for f in test_files:
+        FILE_MANAGER.assert_path_exists(FILE_MANAGER.get_path(f"{f}.pdf"), dir_okay=False)
+
+    if mocked_pool is not None:
+        mocked_pool.assert_called_once_with(size=2)
+        assert mocked_pool.return_value.render.call_count == 3
+
+
+def test_export_notebooks_errors():
+    """
+    Tests that errors exporting a notebook don't prevent other notebooks from being exported
+    """
+    nb_paths = [FILE_MANAGER.get_path("successful-html-test.ipynb"), "does-not-exist.ipynb"]
+    dests = [FILE_MANAGER.get_path("output.pdf"), None]
+
+    results = export_notebooks(nb_paths, dests, exporter_type="latex")
+
+    assert results[0] == (FILE_MANAGER.get_path("output.pdf"), None)
+    FILE_MANAGER.assert_path_exists(FILE_MANAGER.get_path("output.pdf"), dir_okay=False)
+
+    assert results[1][0] == "does-not-exist.pdf"
+    assert isinstance(results[1][1], FileNotFoundError)
+
+    with pytest.raises(ValueError, match="nb_paths and dests must have the same length"):
+        export_notebooks(nb_paths, dests[:1])
+
+
+def test_latex_working_directory(tmp_path):
+    """
+    Tests that LaTeX is compiled without changing the working directory of the process
+    """
+    fig_dir = tmp_path / "figs"
+    fig_dir.mkdir()
+    (fig_dir / "fig.png").write_text("figure")
+
+    # replace xelatex with a script that writes its working directory and the files it can see
+    # to the PDF
+    latex_command = [
+        sys.executable,
+        "-c",
+        dedent(
+            """\
+            import json, os, sys
+            with open(sys.argv[1][:-4] + ".pdf", "w") as f:
+                json.dump([os.getcwd(), os.environ["TEXINPUTS"], sorted(os.listdir())], f)
+            """
+        ),
+        "{filename}",
+    ]
+    bib_command = [sys.executable, "-c", "import sys; sys.exit(1)"]
+    resources = {"outputs": {"output_files/output_1_0.png": b"png"}}
+
+    cwd = os.getcwd()
+    with (
+        mock.patch.object(PDFViaLatexExporter, "latex_command", latex_command),
+        mock.patch.object(PDFViaLatexExporter, "bib_command", bib_command),
+        mock.patch("os.chdir", side_effect=AssertionError("os.chdir was called")),
+    ):
+        pdf = COMPILE_LATEX("latex", resources, str(fig_dir))
+
+    assert os.getcwd() == cwd
+    build_dir, texinputs, files = json.loads(pdf)
+    assert build_dir != cwd
+    assert texinputs.startswith(str(fig_dir) + os.pathsep)
+    assert files == ["notebook.pdf", "notebook.tex", "output_files"]
+
+    latex_command = [sys.executable, "-c", "print('oops'); exit(1)", "{filename}"]
+    with (
+        mock.patch.object(PDFViaLatexExporter, "latex_command", latex_command),
+        pytest.raises(nbconvert.exporters.pdf.LatexFailed, match="oops"),
+    ):
+        COMPILE_LATEX("latex", {}, str(fig_dir))
+
+
+def test_export_multiple(tmp_path, capsys):
+    """
+    Tests exporting a directory of notebooks and reporting the notebooks that failed
+    """
+    (tmp_path / "bad.ipynb").write_text("not a notebook")
+    out_dir = tmp_path / "out"
+    out_dir.mkdir()
+
+    test_files = sorted(
+        os.path.splitext(os.path.basename(p))[0] for p in glob(FILE_MANAGER.get_path("*.ipynb"))
+    )
+
+    with pytest.raises(ExportFailedException, match="1 of 5 notebooks could not be exported"):
+        export(
+            [FILE_MANAGER.get_path(""), str(tmp_path / "bad.ipynb")],
+            output_dir=str(out_dir),
+            exporter="latex",
+            jobs=2,
+        )
+
+    assert sorted(os.listdir(out_dir)) == [f"{f}.pdf" for f in test_files]
+
+    output = capsys.readouterr().out
+    for f in test_files:
+        assert f"Exported {FILE_MANAGER.get_path(f'{f}.ipynb')} to {out_dir / f'{f}.pdf'}" in output
+    assert f"Failed to export {tmp_path / 'bad.ipynb'}: " in output
+
+    with pytest.raises(ValueError, match="can only be specified when exporting one notebook"):
+        export([FILE_MANAGER.get_path("")], dest="foo.pdf")
+
+
+def test_get_nbconvert_exporter():
+    """
+    Tests that nbconvert exporters are reused within, but not across, threads
+    """
+    exporter = BaseExporter.get_nbconvert_exporter(nbconvert.HTMLExporter, template_name="lab")
+    assert exporter.template_name == "lab"
+    assert (
+        BaseExporter.get_nbconvert_exporter(nbconvert.HTMLExporter, template_name="lab") is exporter
+    )
+    assert (
+        BaseExporter.get_nbconvert_exporter(nbconvert.HTMLExporter, template_name="classic")
+        is not exporter
+    )
+
+    other = []
+    thread = threading.Thread(
+        target=lambda: other.append(
+            BaseExporter.get_nbconvert_exporter(nbconvert.HTMLExporter, template_name="lab")
+        )
+    )
+    thread.start()
+    thread.join()
+    assert other[0] is not exporter
+
+
+@pytest.mark.parametrize("exporter_type", ["latex", "html"])
+def test_pdf_cache(exporter_type, tmp_path):
+    """
+    Tests that exported PDFs are reused when the notebook and options are unchanged
+    """
+    nb_path = tmp_path / "nb.ipynb"
+    nb = nbformat.v4.new_notebook(cells=[nbformat.v4.new_code_cell("1 + 1")])
+    nbformat.write(nb, nb_path)
+
+    cache_dir, pdf_path = str(tmp_path / "cache"), str(tmp_path / "nb.pdf")
+    calls = []
+
+    def create_fake_pdf(exporter, nb, **kwargs):
+        calls.append(nb)
+        return f"pdf {len(calls)}".encode("utf-8"), {}
+
+    def run():
+        export(str(nb_path), exporter=exporter_type, cache_dir=cache_dir)
+        with open(pdf_path) as f:
+            return f.read()
+
+    with (
+        mock.patch("otter.export.exporters.via_html.nbconvert.export", create_fake_pdf),
+        mock.patch("otter.export.exporters.via_latex.nbconvert.export", create_fake_pdf),
+        mock.patch.object(
+            PDFViaLatexExporter, "compile_latex", side_effect=lambda latex, *args: latex
+        ),
+    ):
+        assert run() == "pdf 1"
+        assert len(os.listdir(cache_dir)) == 1
+
+        # the cached PDF should be used even if the PDF was deleted
+        os.remove(pdf_path)
+        assert run() == "pdf 1"
+
+        # cell IDs and execution metadata shouldn't affect the cache key
+        nb.cells[0].id = "some-other-id"
+        nb.cells[0].metadata["execution"] = {"iopub.execute_input": "2024-01-01T00:00:00Z"}
+        nbformat.write(nb, nb_path)
+        assert run() == "pdf 1"
+
+        # changing the notebook should invalidate the cache
+        nb.cells[0].outputs.append(nbformat.v4.new_output("stream", text="2"))
+        nbformat.write(nb, nb_path)
+        assert run() == "pdf 2"
+
+        # changing the options should invalidate the cache
+        export(str(nb_path), exporter=exporter_type, cache_dir=cache_dir, filtering=True)
+        assert len(calls) == 3
+        assert len(os.listdir(cache_dir)) == 3
+
+        # the HTML should be saved even if the PDF is cached
+        if exporter_type == "html":
+            export(str(nb_path), exporter=exporter_type, cache_dir=cache_dir, save=True)
+            assert len(calls) == 3
+            with open(tmp_path / "nb.html") as f:
+                assert "<pre>2</pre>" in f.read()
+
+        # changing a file referenced by the notebook should invalidate the cache
+        (tmp_path / "fig.png").write_bytes(b"figure 1")
+        nb.cells.append(nbformat.v4.new_markdown_cell("![a figure](fig.png)"))
+        nbformat.write(nb, nb_path)
+        assert run() == "pdf 4"
+        assert run() == "pdf 4"
+
+        (tmp_path / "fig.png").write_bytes(b"figure 2")
+        assert run() == "pdf 5"
+
+
+@mock.patch.object(base_exporter, "MAX_CACHED_PDFS", 2)
+def test_default_pdf_cache(otter_cache_dir, tmp_path):
+    """
+    Tests that PDFs are cached in Otter's cache directory and that old PDFs are evicted
+    """
+    calls = []
+
+    def create_fake_pdf(exporter, nb, **kwargs):
+        calls.append(nb)
+        return f"pdf {len(calls)}", {}
+
+    with (
+        mock.patch("otter.export.exporters.via_latex.nbconvert.export", create_fake_pdf),
+        mock.patch.object(
+            PDFViaLatexExporter, "compile_latex", side_effect=lambda latex, *args: latex.encode()
+        ),
+    ):
+        for i in range(3):
+            nb_path = tmp_path / f"nb{i}.ipynb"
+            nb = nbformat.v4.new_notebook(cells=[nbformat.v4.new_code_cell(str(i))])
+            nbformat.write(nb, nb_path)
+            export(str(nb_path), exporter="latex", cache=True)
+
+        cache_dir = otter_cache_dir / base_exporter.PDF_CACHE_NAME
+        assert len(os.listdir(cache_dir)) == 2
+
+        # the most recently exported notebook is still cached
+        export(str(nb_path), exporter="latex", cache=True)
+        assert len(calls) == 3
+
+        # PDFs aren't cached unless caching is enabled
+        export(str(nb_path), exporter="latex")
+        assert len(calls) == 4
+
+
+def test_get_referenced_files():
+    """
+    Tests finding the local files referenced by a notebook
+    """
+    nb = nbformat.v4.new_notebook(
+        cells=[
+            nbformat.v4.new_markdown_cell(
+                dedent(
+                    """\
+                    ![a figure](figs/fig%201.png "title") ![remote](https://example.com/a.png)
+                    ![attached](attachment:b.png) <img src="imgs/c.png" width="50%">
+
+                    [ref]: data/d.png
+                    """
+                )
+            ),
+            nbformat.v4.new_code_cell(
+                outputs=[
+                    nbformat.v4.new_output(
+                        "display_data", data={"text/html": "<img src='e.svg#view'>"}
+                    ),
+                ],
+            ),
+        ],
+    )
+
+    assert get_referenced_files(nb) == {"figs/fig 1.png", "imgs/c.png", "data/d.png", "e.svg"}
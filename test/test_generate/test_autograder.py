@@ -2,6 +2,8 @@
 
 import os
 import pytest
+import subprocess
+import yaml
 
 from unittest import mock
 
@@ -35,7 +37,9 @@ def test_autograder():
     )
 
     with unzip_to_temp(FILE_MANAGER.get_path("autograder.zip")) as unzipped_dir:
-        assert_dirs_equal(unzipped_dir, FILE_MANAGER.get_path("autograder-correct"))
+        assert_dirs_equal(
+            unzipped_dir, FILE_MANAGER.get_path("autograder-correct"), ignore_ext=[".sha256"]
+        )
 
 
 @mock.patch("otter.generate.APIClient")
@@ -60,7 +64,9 @@ def test_autograder_with_token(mocked_client):
     mocked_client.assert_not_called()
 
     with unzip_to_temp(FILE_MANAGER.get_path("autograder.zip")) as unzipped_dir:
-        assert_dirs_equal(unzipped_dir, FILE_MANAGER.get_path("autograder-token-correct"))
+        assert_dirs_equal(
+            unzipped_dir, FILE_MANAGER.get_path("autograder-token-correct"), ignore_ext=[".sha256"]
+        )
 
 
 def test_custom_env():
@@ -77,7 +83,9 @@ def test_custom_env():
     )
 
     with unzip_to_temp(FILE_MANAGER.get_path("autograder.zip")) as unzipped_dir:
-        assert_dirs_equal(unzipped_dir, FILE_MANAGER.get_path("autograder-custom-env"))
+        assert_dirs_equal(
+            unzipped_dir, FILE_MANAGER.get_path("autograder-custom-env"), ignore_ext=[".sha256"]
+        )
 
 
 def test_lang_r():
@@ -94,7 +102,9 @@ def test_lang_r():
     )
 
     with unzip_to_temp(FILE_MANAGER.get_path("autograder.zip")) as unzipped_dir:
-        assert_dirs_equal(unzipped_dir, FILE_MANAGER.get_path("autograder-r-correct"))
+        assert_dirs_equal(
+            unzipped_dir, FILE_MANAGER.get_path("autograder-r-correct"), ignore_ext=[".sha256"]
+        )
 
 
 def test_r_with_requirements():
@@ -112,4 +122,68 @@ def test_r_with_requirements():
     )
 
     with unzip_to_temp(FILE_MANAGER.get_path("autograder.zip")) as unzipped_dir:
-        assert_dirs_equal(unzipped_dir, FILE_MANAGER.get_path("autograder-r-requirements-correct"))
+        assert_dirs_equal(
+            unzipped_dir,
+            FILE_MANAGER.get_path("autograder-r-requirements-correct"),
+            ignore_ext=[".sha256"],
+        )
+
+
+def test_lock(tmp_path, monkeypatch):
+    """
+    Check that the grading environment is locked with conda-lock and installed from the lockfile.
+    """
+    environments = []
+
+    def conda_lock(cmd, **kwargs):
+        with open(cmd[cmd.index("--file") + 1]) as f:
+            environments.append(yaml.safe_load(f))
+        with open(cmd[cmd.index("--lockfile") + 1], "w") as f:
+            f.write("version: 1\n")
+        return subprocess.CompletedProcess(cmd, 0, "", "")
+
+    generate_kwargs = dict(
+        tests_dir=FILE_MANAGER.get_path("tests"),
+        output_path=OUTPUT_PATH,
+        requirements=FILE_MANAGER.get_path("requirements.txt"),
+        no_environment=True,
+        lock=True,
+    )
+
+    with (
+        mock.patch("otter.generate.lockfile.shutil.which", return_value="conda-lock"),
+        mock.patch("otter.generate.lockfile.subprocess.run", side_effect=conda_lock) as mocked_run,
+    ):
+        generate(**generate_kwargs)
+
+        # the lockfile is cached, so the environment is only resolved once
+        generate(**generate_kwargs)
+        mocked_run.assert_called_once()
+
+        # relocking ignores the cached lockfile
+        generate(**{**generate_kwargs, "lock": False, "relock": True})
+        assert mocked_run.call_count == 2
+
+    assert "nb_conda_kernels" in environments[0]["dependencies"]
+    assert mocked_run.call_args.args[0][-4:] == [
+        "--platform",
+        "linux-64",
+        "--platform",
+        "linux-aarch64",
+    ]
+
+    with unzip_to_temp(OUTPUT_PATH) as unzipped_dir:
+        with open(os.path.join(unzipped_dir, "conda-lock.yml")) as f:
+            assert f.read() == "version: 1\n"
+
+        with open(os.path.join(unzipped_dir, "setup.sh")) as f:
+            setup = f.read()
+
+        assert "mamba create -y -n otter-env -f /autograder/source/conda-lock.yml\n" in setup
+        assert "environment.yml" not in setup
+        assert "nb_conda_kernels" not in setup
+
+    monkeypatch.setenv("OTTER_CACHE_DIR", str(tmp_path / "empty"))
+    with mock.patch("otter.generate.lockfile.shutil.which", return_value=None):
+        with pytest.raises(RuntimeError, match="requires conda-lock"):
+            generate(**generate_kwargs)
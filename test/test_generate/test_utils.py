@@ -1,6 +1,16 @@
 """Tests for ``otter.generate.utils``"""
 
-from otter.generate.utils import merge_conda_environments
+import hashlib
+import os
+import time
+import zipfile
+
+from otter.generate.utils import (
+    get_zip_digest,
+    MANIFEST_FILENAME,
+    merge_conda_environments,
+    ReproducibleZipFile,
+)
 
 
 def test_merge_conda_environments():
@@ -68,3 +78,66 @@ def test_merge_conda_environments():
         ],
     }
     assert merge_conda_environments(e1, e2, "baz") == expected
+
+
+def test_reproducible_zip_file(tmp_path):
+    """
+    Tests that zip files only depend on the names, contents, and executability of their files.
+    """
+    data = tmp_path / "data.csv"
+    script = tmp_path / "script.sh"
+
+    def write_zip(path, order):
+        data.write_text("a,b\n1,2\n")
+        script.write_text("echo hi")
+        os.chmod(script, 0o700)
+        entries = {
+            "data": lambda zf: zf.write(str(data), arcname="files/data.csv"),
+            "script": lambda zf: zf.write(str(script), arcname="files/script.sh"),
+            "config": lambda zf: zf.writestr("otter_config.json", "{}"),
+            "run": lambda zf: zf.writestr("run_autograder", "run", executable=True),
+        }
+        with ReproducibleZipFile(str(path)) as zf:
+            for key in order:
+                entries[key](zf)
+
+    write_zip(tmp_path / "a.zip", ["data", "script", "config", "run"])
+    time.sleep(0.01)
+    write_zip(tmp_path / "b.zip", ["run", "config", "script", "data"])
+
+    assert (tmp_path / "a.zip").read_bytes() == (tmp_path / "b.zip").read_bytes()
+
+    with zipfile.ZipFile(tmp_path / "a.zip") as zf:
+        infos = zf.infolist()
+        assert [i.filename for i in infos] == [
+            MANIFEST_FILENAME,
+            "files/data.csv",
+            "files/script.sh",
+            "otter_config.json",
+            "run_autograder",
+        ]
+        assert all(i.date_time == (1980, 1, 1, 0, 0, 0) for i in infos)
+        assert {i.filename: (i.external_attr >> 16) & 0o777 for i in infos} == {
+            MANIFEST_FILENAME: 0o644,
+            "files/data.csv": 0o644,
+            "files/script.sh": 0o755,
+            "otter_config.json": 0o644,
+            "run_autograder": 0o755,
+        }
+
+        manifest = zf.read(MANIFEST_FILENAME)
+        data_hash = hashlib.sha256(data.read_bytes()).hexdigest()
+        assert manifest.decode().splitlines()[0] == f"{data_hash}  files/data.csv"
+
+    assert get_zip_digest(str(tmp_path / "a.zip")) == hashlib.sha256(manifest).hexdigest()
+
+    # changing a file changes the digest
+    with ReproducibleZipFile(str(tmp_path / "c.zip")) as zf:
+        zf.writestr("otter_config.json", "{ }")
+
+    assert get_zip_digest(str(tmp_path / "c.zip")) != get_zip_digest(str(tmp_path / "a.zip"))
+
+    with zipfile.ZipFile(tmp_path / "d.zip", "w") as zf:
+        zf.writestr("otter_config.json", "{}")
+
+    assert get_zip_digest(str(tmp_path / "d.zip")) is None
@@ -0,0 +1,71 @@
+"""Tests for ``otter.grade.containers``"""
+
+import pytest
+import zipfile
+
+from unittest import mock
+
+from otter.grade.containers import build_image
+from otter.run import AutograderConfig
+
+
+def make_zip(path, setup="apt-get install -y foo", tests="OK_FORMAT = False"):
+    files = {
+        "environment.yml": "name: otter-env",
+        "otter_config.json": "{}",
+        "run_autograder": "python run_otter.py",
+        "run_otter.py": "",
+        "setup.sh": setup,
+        "tests/q1.py": tests,
+    }
+    with zipfile.ZipFile(path, "w") as zf:
+        for name, contents in files.items():
+            zf.writestr(name, contents)
+    return str(path)
+
+
+@pytest.fixture
+def mocked_docker():
+    images = set()
+
+    def build(context_dir, build_args, tags, file, load):
+        images.update(tags)
+
+    with mock.patch("otter.grade.containers.docker") as docker:
+        docker.build.side_effect = build
+        docker.image.exists.side_effect = lambda image: image in images
+        yield docker
+
+
+def test_shared_environment_image(mocked_docker, tmp_path):
+    """
+    Tests that assignments with the same environment share an environment image.
+    """
+    hw01 = make_zip(tmp_path / "hw01.zip", tests="OK_FORMAT = False\nname = 'q1'")
+    hw02 = make_zip(tmp_path / "hw02.zip", tests="OK_FORMAT = False\nname = 'q2'")
+    hw03 = make_zip(tmp_path / "hw03.zip", setup="apt-get install -y bar")
+
+    assert build_image(hw01, "ubuntu:22.04", "hw01", AutograderConfig()) == "otter-grade:hw01"
+    assert build_image(hw02, "ubuntu:22.04", "hw02", AutograderConfig()) == "otter-grade:hw02"
+
+    builds = mocked_docker.build.call_args_list
+    assert len(builds) == 3
+    env_image = builds[0].kwargs["tags"][0]
+    assert env_image.startswith("otter-grade-env:")
+    assert builds[0].kwargs["build_args"] == {"BASE_IMAGE": "ubuntu:22.04"}
+    assert builds[0].kwargs["file"].endswith("Dockerfile.env")
+    for call, tag in zip(builds[1:], ["hw01", "hw02"]):
+        assert call.kwargs["tags"] == [f"otter-grade:{tag}"]
+        assert call.kwargs["build_args"] == {"ENV_IMAGE": env_image}
+
+    # a different environment or base image gets its own environment image
+    build_image(hw03, "ubuntu:22.04", "hw03", AutograderConfig())
+    build_image(hw01, "ubuntu:24.04", "hw01", AutograderConfig())
+
+    env_images = [
+        c.kwargs["tags"][0]
+        for c in mocked_docker.build.call_args_list
+        if "BASE_IMAGE" in c.kwargs["build_args"]
+    ]
+    assert len(env_images) == 3
+    assert len(set(env_images)) == 3
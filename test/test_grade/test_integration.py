@@ -12,11 +12,14 @@ from multiprocessing import Queue
 from unittest import mock
 
 from otter import logging
+from otter.execute import CellProfile
 from otter.generate import main as generate
 from otter.grade import main as grade
 from otter.grade.utils import POINTS_POSSIBLE_LABEL
 from otter.run import AutograderConfig
-from otter.test_files import GradingResults
+from otter.test_files import GradingResults, TestCase
+from otter.test_files.abstract_test import TestCaseResult
+from otter.test_files.ok_test import OKTestFile
 
 from ..utils import delete_paths, TestFileManager
 
@@ -33,7 +36,10 @@ def cleanup_output(cleanup_enabled):
     if cleanup_enabled:
         delete_paths(
             [
+                "test/cell_profiles.csv",
+                "test/cell_profiles_summary.csv",
                 "test/final_grades.csv",
+                "test/test_case_timings.csv",
                 "test/grading-summaries",
                 "test/submission_pdfs",
                 ZIP_SUBM_PATH,
@@ -394,6 +400,111 @@ def test_grade_summaries(mocked_launch_grade):
             assert summary_file.read() == expected[filename], f"{filename} has diff"
 
 
+@mock.patch("otter.grade.launch_containers")
+def test_cell_profiles(mocked_launch_grade):
+    """
+    Checks that cell execution profiles are written to the disk and summarized.
+    """
+    scores = []
+    for i, wall_times in enumerate([[1, 2], [3, 4], [5, 6]]):
+        gr = GradingResults([])
+        gr.file = f"{i}.ipynb"
+        gr.cell_profiles = [
+            CellProfile(
+                index=0, submission_index=None, wall_time=0.5, peak_rss_delta=0, errored=False
+            ),
+            CellProfile(
+                index=1,
+                submission_index=0,
+                wall_time=wall_times[0],
+                peak_rss_delta=1024 * i,
+                errored=False,
+            ),
+            CellProfile(
+                index=2,
+                submission_index=2,
+                wall_time=wall_times[1],
+                peak_rss_delta=None,
+                errored=i == 1,
+            ),
+        ]
+        scores.append(gr)
+
+    # results without profiles should be skipped
+    scores.append(GradingResults([]))
+    scores[-1].file = "3.ipynb"
+
+    mocked_launch_grade.return_value = scores
+
+    notebook_path = FILE_MANAGER.get_path("notebooks")
+    grade(
+        name=ASSIGNMENT_NAME,
+        paths=[notebook_path],
+        output_dir="test/",
+        autograder=AG_ZIP_PATH,
+        cell_profiles=True,
+    )
+
+    profiles_df = pd.read_csv("test/cell_profiles.csv")
+    assert len(profiles_df) == 9
+    assert profiles_df["file"].unique().tolist() == ["0.ipynb", "1.ipynb", "2.ipynb"]
+    assert profiles_df["cell_index"].isna().sum() == 3
+
+    summary_df = pd.read_csv("test/cell_profiles_summary.csv")
+    assert summary_df["cell_index"].tolist() == [0, 2]
+    assert summary_df["submissions"].tolist() == [3, 3]
+    assert summary_df["mean_wall_time"].tolist() == [3, 4]
+    assert summary_df["median_wall_time"].tolist() == [3, 4]
+    assert summary_df["p95_wall_time"].tolist() == pytest.approx([4.8, 5.8])
+    assert summary_df["max_wall_time"].tolist() == [5, 6]
+    assert summary_df["max_peak_rss_delta"].tolist()[0] == 2048
+    assert pd.isna(summary_df["max_peak_rss_delta"].tolist()[1])
+    assert summary_df["errors"].tolist() == [0, 1]
+
+
+@mock.patch("otter.grade.launch_containers")
+def test_test_case_timings(mocked_launch_grade):
+    """
+    Checks that test case timings are written to the disk.
+    """
+    test_cases = [
+        TestCase("q1 - 1", ">>> True", False, 1, None, None),
+        TestCase("q1 - 2", ">>> True", True, 1, None, None),
+    ]
+
+    scores = []
+    for i in range(2):
+        tf = OKTestFile("q1", "tests/q1.py", test_cases)
+        tf.test_case_results = [
+            TestCaseResult(test_cases[0], "", True, wall_time=0.5 * i, peak_rss_delta=1024),
+            TestCaseResult(test_cases[1], "", i == 0, wall_time=2.0, peak_rss_delta=None),
+        ]
+        gr = GradingResults([tf])
+        gr.file = f"{i}.ipynb"
+        scores.append(gr)
+
+    mocked_launch_grade.return_value = scores
+
+    notebook_path = FILE_MANAGER.get_path("notebooks")
+    grade(
+        name=ASSIGNMENT_NAME,
+        paths=[notebook_path],
+        output_dir="test/",
+        autograder=AG_ZIP_PATH,
+        test_timings=True,
+    )
+
+    got = pd.read_csv("test/test_case_timings.csv")
+    assert got["file"].tolist() == ["0.ipynb", "0.ipynb", "1.ipynb", "1.ipynb"]
+    assert got["test_file"].tolist() == ["q1"] * 4
+    assert got["test_case"].tolist() == ["q1 - 1", "q1 - 2"] * 2
+    assert got["hidden"].tolist() == [False, True] * 2
+    assert got["passed"].tolist() == [True, True, True, False]
+    assert got["wall_time"].tolist() == [0, 2, 0.5, 2]
+    assert got["peak_rss_delta"].tolist()[::2] == [1024, 1024]
+    assert got["peak_rss_delta"].isna().tolist()[1::2] == [True, True]
+
+
 @pytest.mark.slow
 @pytest.mark.docker
 def test_queue():
@@ -0,0 +1,92 @@
+"""Import-time and CLI startup regression benchmarks for ``otter``"""
+
+import pytest
+import subprocess
+import sys
+import time
+
+
+HEAVY_MODULES = ["dill", "ipylab", "ipywidgets", "nbconvert", "pandas", "python_on_whales"]
+"""modules that shouldn't be loaded when Otter or its CLI is imported"""
+
+IMPORT_OTTER_BUDGET = 0.25
+"""the maximum time to import ``otter`` in seconds"""
+
+IMPORT_NOTEBOOK_BUDGET = 1
+"""the maximum time to import ``otter.Notebook`` in seconds, after IPython is loaded"""
+
+IMPORT_CLI_BUDGET = 0.25
+"""the maximum time to import ``otter.cli`` in seconds"""
+
+CLI_STARTUP_BUDGET = 1
+"""the maximum time to run ``otter --version`` in seconds, including interpreter startup"""
+
+
+def time_imports(code):
+    """
+    Run ``code`` in a new interpreter with ``-X importtime`` and return the total time spent
+    importing Otter's modules in seconds and the names of the heavy modules that were loaded.
+    """
+    code = f"{code}\nimport sys\nprint(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    total = 0
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+
+        _, cumulative, name = line[len("import time:") :].split("|")
+        # only count the top-level imports of Otter's modules so that nothing is counted twice
+        if name.startswith(" otter"):
+            total += int(cumulative) / 1e6
+
+    loaded = [m for m in proc.stdout.strip().split(",") if m]
+    return total, loaded
+
+
+@pytest.mark.parametrize(
+    "code, budget",
+    [
+        ("import otter", IMPORT_OTTER_BUDGET),
+        (
+            "import IPython, IPython.display\nfrom otter import Notebook",
+            IMPORT_NOTEBOOK_BUDGET,
+        ),
+        ("from otter.cli import cli", IMPORT_CLI_BUDGET),
+    ],
+)
+def test_import_time(code, budget):
+    """
+    Checks that importing Otter doesn't load heavy dependencies and stays within its time budget.
+    """
+    # take the best of several runs to reduce noise
+    results = [time_imports(code) for _ in range(3)]
+
+    loaded = results[0][1]
+    assert loaded == [], f"Importing Otter loaded heavy modules: {loaded}"
+
+    best = min(t for t, _ in results)
+    assert best < budget, f"Importing Otter took {best:.3f}s, which exceeds the budget of {budget}s"
+
+
+def test_cli_startup_time():
+    """
+    Checks that the CLI starts up within its time budget.
+    """
+    times = []
+    for _ in range(3):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-m", "otter", "--version"], capture_output=True, check=True
+        )
+        times.append(time.perf_counter() - start)
+
+    best = min(times)
+    assert (
+        best < CLI_STARTUP_BUDGET
+    ), f"otter --version took {best:.3f}s, which exceeds the budget of {CLI_STARTUP_BUDGET}s"
@@ -0,0 +1,77 @@
+"""Tests for ``otter.nbmeta_config``"""
+
+import json
+import nbformat as nbf
+import pytest
+
+from otter.nbmeta_config import NBMetadataConfig, read_notebook_metadata
+from otter.utils import NOTEBOOK_METADATA_KEY
+
+
+@pytest.fixture
+def nb_path(tmp_path):
+    return str(tmp_path / "nb.ipynb")
+
+
+def test_read_notebook_metadata(nb_path):
+    """
+    Tests for ``otter.nbmeta_config.read_notebook_metadata``.
+    """
+    metadata = {
+        "kernelspec": {"name": "python3", "display_name": "Python 3", "language": "python"},
+        NOTEBOOK_METADATA_KEY: {"assignment_name": "hw01 ✓"},
+    }
+    nb = nbf.v4.new_notebook(metadata=metadata)
+    nb.cells.append(
+        nbf.v4.new_markdown_cell('a "quoted" {string} with \\ [brackets] and ünïcødé ✓')
+    )
+    cell = nbf.v4.new_code_cell("print('}')")
+    cell.outputs.append(
+        nbf.v4.new_output(
+            "display_data",
+            data={"image/png": "A" * 200_000, "text/plain": ['"\\\\"', "]]}}"]},
+        )
+    )
+    nb.cells.append(cell)
+    nbf.write(nb, nb_path)
+
+    assert read_notebook_metadata(nb_path) == metadata
+
+    # test with the metadata key before and after other keys
+    for keys in [["metadata", "cells", "nbformat"], ["nbformat", "cells", "metadata"]]:
+        with open(nb_path, "w") as f:
+            json.dump({k: nb[k] for k in keys}, f)
+
+        assert read_notebook_metadata(nb_path) == metadata
+
+    with open(nb_path, "w") as f:
+        json.dump({"cells": nb["cells"], "nbformat": 4}, f, indent=1)
+
+    assert read_notebook_metadata(nb_path) == {}
+
+    with open(nb_path, "w") as f:
+        f.write('{"cells": [')
+
+    with pytest.raises(ValueError):
+        read_notebook_metadata(nb_path)
+
+
+def test_from_notebook_path(nb_path):
+    """
+    Tests for ``otter.nbmeta_config.NBMetadataConfig.from_notebook_path``.
+    """
+    nb = nbf.v4.new_notebook(
+        metadata={
+            NOTEBOOK_METADATA_KEY: {
+                "assignment_name": "hw01",
+                "require_no_pdf_confirmation": True,
+            },
+        },
+    )
+    nbf.write(nb, nb_path)
+
+    nbmc = NBMetadataConfig.from_notebook_path(nb_path)
+
+    assert nbmc.assignment_name == "hw01"
+    assert nbmc.require_no_pdf_confirmation is True
+    assert nbmc.get_user_config() == NBMetadataConfig.from_notebook(nb).get_user_config()
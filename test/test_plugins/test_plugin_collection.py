@@ -0,0 +1,142 @@
+"""Tests for ``otter.plugins.PluginCollection``"""
+
+import pytest
+import time
+import types
+
+from unittest import mock
+
+from otter.plugins import AbstractOtterPlugin, PluginCollection, PluginTimeoutError
+
+
+class SlowPlugin(AbstractOtterPlugin):
+    """
+    A plugin whose events sleep for the number of seconds in its ``delay`` configuration.
+    """
+
+    def before_grading(self, config):
+        time.sleep(self.plugin_config.get("delay", 0))
+        config["slow"] = True
+
+    def before_execution(self, submission):
+        time.sleep(self.plugin_config.get("delay", 0))
+        if isinstance(submission, list):
+            submission.append("slow")
+            return submission
+        return submission + "\nslow"
+
+    def after_grading(self, results):
+        time.sleep(self.plugin_config.get("delay", 0))
+        results.append("slow")
+
+
+class ScoringPlugin(AbstractOtterPlugin):
+
+    def after_grading(self, results):
+        results.scores.append(1)
+
+
+class FastPlugin(AbstractOtterPlugin):
+
+    def before_execution(self, submission):
+        return submission + "\nfast"
+
+    def generate_report(self):
+        return "fast report"
+
+
+SLOW = f"{__name__}.SlowPlugin"
+FAST = f"{__name__}.FastPlugin"
+SCORING = f"{__name__}.ScoringPlugin"
+
+
+def test_timings():
+    """
+    Tests that the time spent in each supported event of each plugin is recorded and logged.
+    """
+    pc = PluginCollection([{SLOW: {"delay": 0.05}}, FAST], "", {})
+
+    config = {}
+    pc.run("before_grading", config)
+    assert pc.before_execution("x") == "x\nslow\nfast"
+    assert config == {"slow": True}
+
+    timings = pc.timings
+    assert set(timings) == {SLOW, FAST}
+    assert set(timings[SLOW]) == {"before_grading", "before_execution"}
+    assert set(timings[FAST]) == {"before_execution"}
+    assert timings[SLOW]["before_grading"] >= 0.05
+
+    with mock.patch("otter.plugins.LOGGER") as logger:
+        report = pc.generate_report()
+
+    assert "fast report" in report
+    assert "before_grading" not in report
+    assert f"{SLOW}:\n    before_grading: " in logger.info.call_args.args[0]
+    assert "generate_report" in pc.timings[FAST]
+
+
+def test_time_budget():
+    """
+    Tests that events exceeding their plugin's time budget are abandoned and the plugin's remaining
+    events are skipped.
+    """
+    pc = PluginCollection([{SLOW: {"delay": 1, "time_budget": 0.05}}, FAST], "", {})
+
+    start = time.perf_counter()
+    assert pc.before_execution("x") == "x\nfast"
+    assert time.perf_counter() - start < 1
+
+    results = []
+    pc.run("after_grading", results)
+    assert results == []
+    assert "exceeded its time budget" in pc.format_timings()
+
+    # an abandoned plugin is given copies of its arguments, so it can't modify them
+    submission = ["x"]
+    pc = PluginCollection([{SLOW: {"delay": 0.2, "time_budget": 0.05}}], "", {})
+    assert pc.before_execution(submission) is submission
+    time.sleep(0.3)
+    assert submission == ["x"]
+
+    config = {}
+    pc = PluginCollection([{SLOW: {"delay": 0.2, "time_budget": 0.05}}], "", {})
+    pc.run("before_grading", config)
+    pc.run("after_grading", results)
+    time.sleep(0.3)
+    assert config == {}
+    assert results == []
+
+    # changes made by plugins within their budget are copied back to the arguments
+    pc = PluginCollection([{SLOW: {"time_budget": 5}}], "", {})
+    assert pc.before_execution("x") == "x\nslow"
+    pc.run("before_grading", config)
+    assert config == {"slow": True}
+    pc.run("after_grading", results)
+    assert results == ["slow"]
+
+    results = types.SimpleNamespace(scores=[])
+    pc = PluginCollection([{SCORING: {"time_budget": 5}}], "", {})
+    pc.run("after_grading", results)
+    assert results.scores == [1]
+
+
+@pytest.mark.parametrize("budget", ["10", True, 0, -1, [1]])
+def test_invalid_time_budget(budget):
+    """
+    Tests that invalid time budgets are rejected when the plugin configurations are parsed.
+    """
+    with pytest.raises(ValueError, match=f"Invalid time budget for plugin {SLOW}"):
+        PluginCollection([{SLOW: {"time_budget": budget}}], "", {})
+
+
+def test_time_budget_error():
+    """
+    Tests that ``PluginTimeoutError`` is raised when a plugin's ``catch_timeout`` configuration is
+    false.
+    """
+    pc = PluginCollection(
+        [{SLOW: {"delay": 1, "time_budget": 0.05, "catch_timeout": False}}], "", {}
+    )
+    with pytest.raises(PluginTimeoutError, match=f"Plugin {SLOW} event before_grading exceeded"):
+        pc.run("before_grading", {})
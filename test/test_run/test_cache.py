@@ -0,0 +1,151 @@
+"""Tests for ``otter.run.cache``"""
+
+import os
+import pytest
+import time
+import zipfile
+
+from unittest import mock
+
+from otter.run.cache import (
+    _lock_extraction,
+    clone_tree,
+    copy_extracted_autograder,
+    evict_stale_autograders,
+    get_extracted_autograder,
+    LOCK_FILENAME,
+)
+
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    return str(tmp_path / "cache")
+
+
+def make_zip(path, contents):
+    with zipfile.ZipFile(path, "w") as zf:
+        for name, data in contents.items():
+            zf.writestr(name, data)
+    return str(path)
+
+
+def test_get_extracted_autograder(tmp_path, cache_dir):
+    """
+    Tests that autograder zip files are extracted once and keyed by their contents.
+    """
+    zip_path = make_zip(tmp_path / "autograder.zip", {"otter_config.json": "{}", "tests/q1.py": ""})
+
+    path = get_extracted_autograder(zip_path, cache_dir)
+    assert os.path.dirname(path) == cache_dir
+    assert sorted(os.listdir(path)) == [LOCK_FILENAME, "otter_config.json", "tests"]
+
+    with mock.patch("otter.run.cache.zipfile.ZipFile") as mocked_zipfile:
+        assert get_extracted_autograder(zip_path, cache_dir) == path
+        mocked_zipfile.assert_not_called()
+
+    # a zip file with the same contents at a different path should reuse the extraction
+    other_zip_path = tmp_path / "other.zip"
+    other_zip_path.write_bytes(open(zip_path, "rb").read())
+    assert get_extracted_autograder(str(other_zip_path), cache_dir) == path
+
+    # a zip file with different contents should be extracted separately
+    new_zip_path = make_zip(tmp_path / "new.zip", {"otter_config.json": '{"debug": true}'})
+    new_path = get_extracted_autograder(new_zip_path, cache_dir)
+    assert new_path != path
+    assert sorted(os.listdir(cache_dir)) == sorted([os.path.basename(p) for p in [path, new_path]])
+
+
+def test_evict_stale_autograders(tmp_path, cache_dir):
+    """
+    Tests that the least recently used and expired extractions are evicted.
+    """
+    paths = []
+    for i in range(4):
+        zip_path = make_zip(tmp_path / f"{i}.zip", {"file": str(i)})
+        paths.append(get_extracted_autograder(zip_path, cache_dir))
+
+    now = time.time()
+    for i, p in enumerate(paths):
+        os.utime(p, (now - 100 * (4 - i), now - 100 * (4 - i)))
+
+    # an abandoned partial extraction
+    temp_path = os.path.join(cache_dir, ".tmp-abandoned")
+    os.mkdir(temp_path)
+    os.utime(temp_path, (now - 1000, now - 1000))
+
+    evict_stale_autograders(cache_dir, keep=paths[0], max_age=350)
+    assert sorted(os.listdir(cache_dir)) == sorted(os.path.basename(p) for p in paths)
+
+    evict_stale_autograders(cache_dir, keep=paths[0], max_age=250)
+    assert sorted(os.listdir(cache_dir)) == sorted(
+        os.path.basename(p) for p in [paths[0], paths[2], paths[3]]
+    )
+
+    evict_stale_autograders(cache_dir, max_entries=1)
+    assert os.listdir(cache_dir) == [os.path.basename(paths[3])]
+
+
+def test_evict_stale_autograders_in_use(tmp_path, cache_dir):
+    """
+    Tests that extractions that are in use by another process are not evicted.
+    """
+    paths = []
+    for i in range(2):
+        zip_path = make_zip(tmp_path / f"{i}.zip", {"file": str(i)})
+        paths.append(get_extracted_autograder(zip_path, cache_dir))
+
+    with _lock_extraction(paths[0]) as locked:
+        assert locked
+        evict_stale_autograders(cache_dir, max_entries=0)
+        assert os.listdir(cache_dir) == [os.path.basename(paths[0])]
+
+    evict_stale_autograders(cache_dir, max_entries=0)
+    assert os.listdir(cache_dir) == []
+
+
+def test_copy_extracted_autograder(tmp_path, cache_dir):
+    """
+    Tests that ``copy_extracted_autograder`` copies the cached extraction and that changes to the
+    copy don't affect the cache.
+    """
+    zip_path = make_zip(tmp_path / "autograder.zip", {"otter_config.json": "{}", "tests/q1.py": ""})
+
+    dst = tmp_path / "source"
+    dst.mkdir()
+    copy_extracted_autograder(zip_path, str(dst), cache_dir)
+    assert sorted(os.listdir(dst)) == ["otter_config.json", "tests"]
+
+    path = get_extracted_autograder(zip_path, cache_dir)
+    assert not os.path.samefile(dst / "otter_config.json", os.path.join(path, "otter_config.json"))
+
+    with open(dst / "otter_config.json", "w") as f:
+        f.write("modified")
+
+    with open(os.path.join(path, "otter_config.json")) as f:
+        assert f.read() == "{}"
+
+    # the zip file is extracted directly if the extraction can't be locked
+    dst2 = tmp_path / "source2"
+    with mock.patch("otter.run.cache._lock_extraction") as mocked_lock:
+        mocked_lock.return_value.__enter__.return_value = False
+        copy_extracted_autograder(zip_path, str(dst2), cache_dir)
+
+    assert sorted(os.listdir(dst2)) == ["otter_config.json", "tests"]
+
+
+def test_clone_tree(tmp_path):
+    """
+    Tests that ``clone_tree`` copies files into the destination directory.
+    """
+    src = tmp_path / "src"
+    (src / "sub").mkdir(parents=True)
+    (src / "a").write_text("a")
+    (src / "sub" / "b").write_text("b")
+
+    dst = tmp_path / "dst"
+    dst.mkdir()
+    clone_tree(str(src), str(dst))
+
+    assert (dst / "a").read_text() == "a"
+    assert (dst / "sub" / "b").read_text() == "b"
+    assert not os.path.samefile(src / "a", dst / "a")
@@ -10,12 +10,15 @@ import pathlib
 import pytest
 import re
 import shutil
+import threading
+import time
 import zipfile
 
 from contextlib import contextmanager, nullcontext
 from textwrap import dedent
 from unittest import mock
 
+from otter.execute import grade_notebook
 from otter.generate.token import APIClient
 from otter.run import main as run_main
 
@@ -296,6 +299,7 @@ def load_config(get_config_path):
 @mock.patch("otter.run.run_autograder_main")
 def test_otter_run_main(mocked_run_autograder_main, mocked_tempfile, tmp_path):
     """Tests ``otter.run.main``."""
+
     zf_path = tmp_path / "autograder.zip"
     with zipfile.ZipFile(zf_path, mode="w") as zf:
         zf.writestr("a_file", "ooh-ee-ooh-ah-ah-ting-tang-walla-walla-bing-bang")
@@ -384,6 +388,126 @@ def test_pdf_generation_failure(mocked_export, get_config_path, load_config, exp
     ), f"Actual results did not matched expected:\n{actual_results}"
 
 
+@mock.patch("otter.run.run_autograder.runners.python_runner.grade_notebook")
+@mock.patch("otter.run.run_autograder.runners.python_runner.export_notebook")
+def test_pdf_generated_concurrently(
+    mocked_export, mocked_grade_notebook, get_config_path, load_config, expected_results
+):
+    """
+    Tests that the PDF is generated from a snapshot of the submission while it is being executed.
+    """
+    config = load_config()
+    config.pop("token")
+    config["pdf"] = True
+
+    subm_path = FILE_MANAGER.get_path("autograder/submission/fails2and6H.ipynb")
+    with open(subm_path) as f:
+        orig_nb = nbformat.read(f, as_version=nbformat.NO_CONVERT)
+
+    grading_done = threading.Event()
+
+    def grade(*args, **kwargs):
+        results = grade_notebook(*args, **kwargs)
+
+        # the submission changing the notebook on disk shouldn't change the PDF
+        nbformat.write(nbformat.v4.new_notebook(), "fails2and6H.ipynb")
+
+        grading_done.set()
+        return results
+
+    def export(*args, **kwargs):
+        # this would time out if the PDF were generated before the submission was graded
+        assert grading_done.wait(timeout=30)
+        assert threading.current_thread() is not threading.main_thread()
+        assert kwargs["notebook"] == orig_nb
+
+    mocked_grade_notebook.side_effect = grade
+    mocked_export.side_effect = export
+
+    with (
+        alternate_config(get_config_path(), config),
+        alternate_submission(subm_path, orig_nb),
+    ):
+        run_autograder(config["autograder_dir"])
+
+    with FILE_MANAGER.open("autograder/results/results.json") as f:
+        actual_results = json.load(f)
+
+    mocked_export.assert_called_once()
+    assert (
+        actual_results == expected_results
+    ), f"Actual results did not matched expected:\n{actual_results}"
+
+
+@mock.patch("otter.run.run_autograder.runners.python_runner.grade_notebook")
+@mock.patch("otter.run.run_autograder.runners.python_runner.export_notebook")
+def test_pdf_thread_joined_on_grading_error(
+    mocked_export, mocked_grade_notebook, get_config_path, load_config
+):
+    """
+    Tests that the PDF is finished before leaving the submission directory if grading fails.
+    """
+    config = load_config()
+    config.pop("token")
+    config["pdf"] = True
+
+    grading_started, export_cwds = threading.Event(), []
+
+    def grade(*args, **kwargs):
+        grading_started.set()
+        raise ValueError("grading failed")
+
+    def export(*args, **kwargs):
+        assert grading_started.wait(timeout=30)
+        time.sleep(0.5)
+        export_cwds.append(os.getcwd())
+
+    mocked_grade_notebook.side_effect = grade
+    mocked_export.side_effect = export
+
+    with alternate_config(get_config_path(), config), pytest.raises(ValueError, match="failed"):
+        run_autograder(config["autograder_dir"])
+
+    assert export_cwds == [os.path.abspath(FILE_MANAGER.get_path("autograder/submission"))]
+
+
+@mock.patch.object(APIClient, "upload_pdf_submission")
+@mock.patch("otter.run.run_autograder.runners.python_runner.grade_notebook")
+@mock.patch("otter.run.run_autograder.runners.python_runner.export_notebook")
+def test_pdf_uploaded_before_execution(
+    mocked_export,
+    mocked_grade_notebook,
+    mocked_upload_pdf_submission,
+    get_config_path,
+    load_config,
+    expected_results,
+):
+    """
+    Tests that PDFs are uploaded before the submission is executed so that the token can be
+    sanitized first.
+    """
+    config = load_config()
+
+    def grade(*args, **kwargs):
+        mocked_upload_pdf_submission.assert_called_once()
+        return grade_notebook(*args, **kwargs)
+
+    mocked_grade_notebook.side_effect = grade
+    mocked_upload_pdf_submission.return_value.status_code = 200
+
+    with alternate_config(get_config_path(), config):
+        run_autograder(config["autograder_dir"])
+
+    with FILE_MANAGER.open("autograder/results/results.json") as f:
+        actual_results = json.load(f)
+
+    mocked_export.assert_called_once()
+    mocked_grade_notebook.assert_called_once()
+    assert (
+        actual_results == expected_results
+    ), f"Actual results did not matched expected:\n{actual_results}"
+
+
 @mock.patch.object(APIClient, "upload_pdf_submission")
 @mock.patch("otter.run.run_autograder.runners.python_runner.export_notebook")
 def test_use_submission_pdf(
@@ -805,4 +929,5 @@ def test_pdf_via_html(_, mock_export_notebook, get_config_path, load_config, exp
         filtering=False,
         pagebreaks=False,
         exporter_type="html",
+        notebook=None,
     )
@@ -0,0 +1,123 @@
+"""Tests for ``otter.run.run_autograder.runners.r_session``"""
+
+import os
+import pytest
+
+from textwrap import dedent
+from unittest import mock
+
+from otter.run.run_autograder.runners import r_session
+
+
+@pytest.fixture
+def fake_rpy2():
+    """
+    Replaces rpy2 with a mock and resets the state of the R session module.
+    """
+    rpy2 = mock.MagicMock()
+    restore = mock.Mock()
+    rpy2.robjects.r.return_value = restore
+
+    with (
+        mock.patch.dict("sys.modules", {"rpy2": rpy2, "rpy2.robjects": rpy2.robjects}),
+        mock.patch.object(r_session, "_restore_state", None),
+        mock.patch.object(r_session, "get_package") as mocked_get_package,
+    ):
+        yield mocked_get_package, rpy2.robjects.r, restore
+
+
+def test_submission_session(fake_rpy2):
+    """
+    Tests that the R session is started once and reset after each submission.
+    """
+    get_package, r, restore = fake_rpy2
+
+    for _ in range(3):
+        with r_session.submission_session():
+            pass
+
+    assert [c.args[0] for c in get_package.call_args_list] == r_session.PRELOADED_PACKAGES
+    r.assert_called_once_with(r_session.SNAPSHOT_R_CODE)
+    assert restore.call_count == 3
+
+    # the session is reset even if grading fails
+    with pytest.raises(RuntimeError):
+        with r_session.submission_session():
+            raise RuntimeError()
+
+    assert restore.call_count == 4
+
+
+def test_missing_packages(fake_rpy2):
+    """
+    Tests that missing optional packages are skipped but a missing ottr is an error.
+    """
+    get_package, r, _ = fake_rpy2
+
+    def import_package(name):
+        if name == "quarto":
+            raise ImportError(name)
+
+    get_package.side_effect = import_package
+    r_session.start_session()
+    r.assert_called_once()
+
+    r_session._restore_state = None
+    get_package.side_effect = ImportError("ottr")
+    with pytest.raises(ImportError, match="ottr"):
+        r_session.start_session()
+
+
+@pytest.fixture
+def robjects():
+    """
+    Yields ``rpy2.robjects`` with a fresh R session state, skipping the test if R, rpy2, or ottr
+    aren't installed.
+    """
+    try:
+        from rpy2 import robjects
+    except Exception as e:
+        pytest.skip(f"rpy2 is not available: {e}")
+
+    if not robjects.r('requireNamespace("ottr", quietly = TRUE)')[0]:
+        pytest.skip("ottr is not installed")
+
+    cwd = os.getcwd()
+    with mock.patch.object(r_session, "_restore_state", None):
+        yield robjects
+
+    os.chdir(cwd)
+
+
+@pytest.mark.rpy2
+def test_submission_session_in_r(robjects, tmp_path):
+    """
+    Tests that global variables, attached packages, options, environment variables, and the working
+    directory set by one submission aren't visible to the next submission graded in the same R
+    session.
+    """
+    r = robjects.r
+    digits, wd = r("getOption('digits')")[0], r("getwd()")[0]
+
+    with r_session.submission_session():
+        r(
+            dedent(
+                f"""\
+                leaked_global <- 1
+                library(tools)
+                options(otter_test_option = TRUE, digits = {digits + 1})
+                Sys.setenv(OTTER_TEST_VAR = "leaked")
+                setwd("{tmp_path.as_posix()}")
+                """
+            )
+        )
+        assert r("exists('leaked_global')")[0]
+        assert r("'package:tools' %in% search()")[0]
+
+    with r_session.submission_session():
+        assert not r("exists('leaked_global')")[0]
+        assert not r("'package:tools' %in% search()")[0]
+        assert r("is.null(getOption('otter_test_option'))")[0]
+        assert r("getOption('digits')")[0] == digits
+        assert r("is.na(Sys.getenv('OTTER_TEST_VAR', unset = NA))")[0]
+        assert r("getwd()")[0] == wd
@@ -0,0 +1,166 @@
+"""Tests for ``otter.run.run_autograder.runners.rmd_converter``"""
+
+import os
+import pytest
+import time
+
+from textwrap import dedent
+from unittest import mock
+
+from otter.run import AutograderConfig
+from otter.run.run_autograder.runners import rmd_converter
+from otter.run.run_autograder.runners.r_runner import RRunner
+from otter.run.run_autograder.runners.rmd_converter import (
+    convert_to_r_script,
+    UnsupportedDocumentError,
+)
+from otter.utils import chdir
+
+
+RMD = dedent(
+    """\
+    ---
+    title: hw01
+    ---
+
+    Some text with `r 1 + 1` inline code.
+
+    ```{r setup, include=FALSE}
+    library(testthat)
+    ```
+
+    ```{r}
+    #| label: q1
+    # the answer
+    x <- 2
+    ```
+
+    ```{python}
+    y = 3
+    ```
+
+    ````{r, eval = FALSE, fig.cap = paste("a", "b")}
+    ottr::export("hw01.Rmd")
+    ````
+
+    ```{r}
+    #| eval: false
+    z <- 4
+    ```
+
+    ```{r, purl=FALSE}
+    w <- 5
+    ```
+    """
+)
+
+
+@pytest.fixture
+def cache_dir(otter_cache_dir):
+    return otter_cache_dir / rmd_converter.R_SCRIPT_CACHE_NAME
+
+
+def test_convert_to_r_script():
+    """
+    Tests converting a document with R chunks, chunks for other engines, and chunk options.
+    """
+    assert convert_to_r_script(RMD, "set.seed(42)") == dedent(
+        """\
+        ## ----setup, include=FALSE----
+        set.seed(42)
+        library(testthat)
+
+        ## --------
+        #| label: q1
+        # the answer
+        set.seed(42)
+        x <- 2
+
+        ## ----eval = FALSE, fig.cap = paste("a", "b")----
+        # set.seed(42)
+        # ottr::export("hw01.Rmd")
+
+        ## --------
+        # #| eval: false
+        # set.seed(42)
+        # z <- 4
+        """
+    )
+
+
+@pytest.mark.parametrize(
+    "chunk",
+    [
+        "```{r}\n<<setup>>\n```",
+        "```{r, ref.label='setup'}\n```",
+        "```{r, child='other.Rmd'}\n```",
+        "```{r, eval=c(1, 2)}\nx <- 1\n```",
+        "```{r}\n#| eval: !expr 'a > 1'\nx <- 1\n```",
+        "  ```{r}\n  x <- 1\n  ```",
+        "```{r}\nx <- 1\n",
+    ],
+)
+def test_unsupported_documents(chunk):
+    """
+    Tests that documents that can't be converted without R raise an error.
+    """
+    with pytest.raises(UnsupportedDocumentError):
+        convert_to_r_script(f"# hw01\n\n{chunk}\n")
+
+
+def test_resolve_submission_path(cache_dir, tmp_path):
+    """
+    Tests that ``RRunner`` converts Rmd submissions without R and falls back to knitr for
+    unsupported documents, caching only the scripts converted by knitr.
+    """
+    runner = RRunner(AutograderConfig({"seed": 42}))
+    subm_dir = tmp_path / "submission"
+    subm_dir.mkdir()
+    (subm_dir / "hw01.Rmd").write_text(RMD)
+
+    with (
+        chdir(subm_dir),
+        mock.patch("otter.run.run_autograder.runners.r_runner.get_package") as get_package,
+    ):
+        script_path = runner.resolve_submission_path()
+        with open(script_path) as f:
+            assert f.read() == convert_to_r_script(RMD, "set.seed(42)")
+        os.remove(script_path)
+
+        get_package.assert_not_called()
+        assert not os.path.exists(cache_dir)
+
+        # the submission is converted with knitr if it can't be converted in Python
+        get_package.return_value.purl.side_effect = lambda _, p: open(p, "w").write("x <- 1\n")
+        (subm_dir / "hw01.Rmd").write_text("```{r}\n<<setup>>\n```\n")
+        os.remove(runner.resolve_submission_path())
+
+        get_package.assert_called_once_with("knitr")
+        get_package.return_value.purl.assert_called_once()
+        assert len(os.listdir(cache_dir)) == 1
+
+        # the script converted by knitr is reused for the same document (which is rewritten because
+        # seeds were added to it before it was converted)
+        (subm_dir / "hw01.Rmd").write_text("```{r}\n<<setup>>\n```\n")
+        script_path = runner.resolve_submission_path()
+        with open(script_path) as f:
+            assert f.read() == "x <- 1\n"
+        os.remove(script_path)
+
+    get_package.return_value.purl.assert_called_once()
+
+
+def test_cache_eviction(cache_dir):
+    """
+    Tests that the least recently used scripts are evicted from the cache.
+    """
+    now = time.time()
+    with mock.patch.object(rmd_converter, "MAX_CACHED_R_SCRIPTS", 2):
+        for i in range(3):
+            rmd_converter.cache_r_script(f"doc{i}", ".Rmd", None, f"x <- {i}")
+            t = now - 100 * (3 - i)
+            os.utime(rmd_converter._get_cache_path(f"doc{i}", ".Rmd", None), (t, t))
+
+    assert len(os.listdir(cache_dir)) == 2
+    assert rmd_converter.get_cached_r_script("doc0", ".Rmd", None) is None
+    assert rmd_converter.get_cached_r_script("doc2", ".Rmd", None) == "x <- 2"
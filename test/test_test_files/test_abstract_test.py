@@ -559,6 +559,8 @@ def test_to_dict():
                 "test_case": asdict(tc),
                 "message": None if tc.name != "q1H" else ":(",
                 "passed": tc.name != "q1H",
+                "wall_time": None,
+                "peak_rss_delta": None,
             }
             for tc in MockTestFile._test_cases
         ],
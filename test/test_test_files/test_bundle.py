@@ -0,0 +1,149 @@
+"""Tests for ``otter.test_files.bundle``"""
+
+import os
+import pickle
+import pytest
+
+from textwrap import dedent
+from unittest import mock
+
+from otter.nbmeta_config import NBMetadataConfig
+from otter.test_files import create_test_file
+from otter.test_files.bundle import BUNDLE_FILENAME, create_bundle, load_bundle
+from otter.test_files.exception_test import ExceptionTestFile
+from otter.test_files.ok_test import OKTestFile
+
+
+EXCEPTION_TEST = dedent(
+    """\
+    from otter.test_files import test_case
+
+    OK_FORMAT = False
+
+    name = "q1"
+
+    @test_case(points=1)
+    def q1_1(x):
+        assert x % 2 == 0
+    """
+)
+
+OK_TEST = dedent(
+    """\
+    OK_FORMAT = True
+
+    test = {
+        "name": "q2",
+        "points": 2,
+        "suites": [{"cases": [{"code": ">>> x == 4\\nTrue", "hidden": False}]}],
+    }
+    """
+)
+
+
+@pytest.fixture
+def tests_dir(tmp_path):
+    files = {"q1.py": EXCEPTION_TEST, "q2.py": OK_TEST, "q3.py": "name = 'q3'"}
+    for name, contents in files.items():
+        (tmp_path / name).write_text(contents)
+
+    paths = [str(tmp_path / name) for name in files]
+    (tmp_path / BUNDLE_FILENAME).write_bytes(create_bundle(paths))
+    return tmp_path
+
+
+def test_bundle(tests_dir):
+    """
+    Tests that bundled tests are loaded from the bundle once and give the same results as loose
+    test files.
+    """
+    # the test files are removed so that they can only be loaded from the bundle
+    os.remove(tests_dir / "q1.py")
+    os.remove(tests_dir / "q2.py")
+
+    with mock.patch("otter.test_files.bundle.pickle.load", wraps=pickle.load) as load:
+        q1 = create_test_file(str(tests_dir / "q1.py"), NBMetadataConfig())
+        q2 = create_test_file(str(tests_dir / "q2.py"), NBMetadataConfig())
+
+    load.assert_called_once()
+    assert load_bundle(str(tests_dir)) is load_bundle(str(tests_dir))
+
+    assert isinstance(q1, ExceptionTestFile)
+    assert q1.name == "q1"
+    assert q1.source == EXCEPTION_TEST
+    q1.run({"x": 4})
+    assert q1.grade == 1
+
+    assert isinstance(q2, OKTestFile)
+    assert q2.name == "q2"
+    q2.run({"x": 3})
+    assert q2.score == 0
+
+    # malformed test files aren't bundled and are still loaded from their files
+    with pytest.raises(RuntimeError, match="does not define the global variable 'OK_FORMAT'"):
+        create_test_file(str(tests_dir / "q3.py"), NBMetadataConfig())
+
+
+def test_stale_bundle(tests_dir):
+    """
+    Tests that test files that have changed since they were bundled are loaded from their files.
+    """
+    bundle_mtime = os.stat(tests_dir / BUNDLE_FILENAME).st_mtime_ns
+
+    # the edit doesn't change the size of the file, so its hash is compared
+    (tests_dir / "q1.py").write_text(EXCEPTION_TEST.replace("points=1", "points=2"))
+    os.utime(tests_dir / "q1.py", ns=(bundle_mtime + 10**9, bundle_mtime + 10**9))
+
+    q1 = create_test_file(str(tests_dir / "q1.py"), NBMetadataConfig())
+    q1.run({"x": 4})
+    assert q1.grade == 1
+    assert q1.test_cases[0].points == 2
+
+    (tests_dir / "q1.py").write_text(EXCEPTION_TEST.replace("points=1", "points=10"))
+    os.utime(tests_dir / "q1.py", ns=(bundle_mtime, bundle_mtime))
+
+    q1 = create_test_file(str(tests_dir / "q1.py"), NBMetadataConfig())
+    assert q1.test_cases[0].points == 10
+
+    # unchanged test files are still loaded from the bundle
+    with mock.patch("otter.test_files.bundle.OKTestFile.from_spec") as from_spec:
+        create_test_file(str(tests_dir / "q2.py"), NBMetadataConfig())
+
+    from_spec.assert_called_once()
+
+
+def test_bundle_not_reading_test_files(tests_dir):
+    """
+    Tests that test files that haven't changed since they were bundled are not read, unless they
+    were modified after the bundle was written.
+    """
+    bundle_mtime = os.stat(tests_dir / BUNDLE_FILENAME).st_mtime_ns
+    os.utime(tests_dir / "q1.py", ns=(bundle_mtime, bundle_mtime))
+    load_bundle(str(tests_dir))
+
+    with mock.patch("otter.test_files.bundle.open", side_effect=open, create=True) as mocked_open:
+        q1 = create_test_file(str(tests_dir / "q1.py"), NBMetadataConfig())
+
+    mocked_open.assert_not_called()
+    assert q1.source == EXCEPTION_TEST
+
+    # touching a test file without changing it doesn't make its bundle entry stale
+    os.utime(tests_dir / "q1.py", ns=(bundle_mtime + 10**9, bundle_mtime + 10**9))
+    with mock.patch("otter.test_files.bundle.open", side_effect=open, create=True) as mocked_open:
+        q1 = create_test_file(str(tests_dir / "q1.py"), NBMetadataConfig())
+
+    mocked_open.assert_called_once_with(str(tests_dir / "q1.py"), "rb")
+    assert q1.source == EXCEPTION_TEST
+
+
+def test_different_python_version(tests_dir):
+    """
+    Tests that exception-based tests are compiled from their source if the bundle was created by a
+    different version of Python.
+    """
+    with mock.patch("otter.test_files.bundle.importlib.util.MAGIC_NUMBER", b"\x00\x00\r\n"):
+        q1 = create_test_file(str(tests_dir / "q1.py"), NBMetadataConfig())
+
+    q1.run({"x": 3})
+    assert q1.grade == 0
+    assert "assert x % 2 == 0" in q1.test_case_results[0].message
@@ -191,6 +191,11 @@ def test_run(exception_test_contents, expected_test_cases):
     assert "assert x == 4" in tf.test_case_results[1].message
     assert "AssertionError" in tf.test_case_results[1].message
 
+    # check that each test case was profiled
+    for tcr in tf.test_case_results:
+        assert tcr.wall_time >= 0
+        assert tcr.peak_rss_delta is None or tcr.peak_rss_delta >= 0
+
 
 def test_all_or_nothing(exception_test_contents, tmp_path):
     """Tests the ``all_or_nothing`` config."""
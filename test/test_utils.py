@@ -1,10 +1,26 @@
 """Tests for ``otter.utils``"""
 
+import io
+import json
+import nbformat as nbf
+import os
 import pandas as pd
+import pytest
+import stat
+import time
 
 from unittest import mock
 
-from otter.utils import get_variable_type, hide_outputs
+from otter.utils import (
+    clone_file,
+    evict_cache_entries,
+    get_cache_dir,
+    get_variable_type,
+    hide_outputs,
+    JSONObjectScanner,
+    read_notebook_without_outputs,
+    write_file_atomically,
+)
 
 
 @mock.patch("otter.utils.get_ipython")
@@ -29,3 +45,142 @@ def test_get_variable_type():
     """
     assert get_variable_type(Foo()) == "test.test_utils.Foo"
     assert get_variable_type(pd.DataFrame()) == "pandas.core.frame.DataFrame"
+
+
+def test_json_object_scanner():
+    """
+    Tests for ``otter.utils.JSONObjectScanner``.
+    """
+    doc = {
+        "a": 'a "quoted" {string} with \\ [brackets] and ünïcødé ✓',
+        "b": [1, -2.5e3, True, None, {"c": ["]]}}", '\\"']}],
+        "c": {"d": {}, "e": [], "f": "✓"},
+        "g": False,
+    }
+    data = json.dumps(doc, ensure_ascii=False).encode("utf-8")
+
+    # test with small chunk sizes so that tokens straddle chunk boundaries
+    for chunk_size in [1, 2, 7, 1 << 20]:
+        for key, value in doc.items():
+            assert JSONObjectScanner(io.BytesIO(data), chunk_size=chunk_size).get(key) == value
+
+        assert JSONObjectScanner(io.BytesIO(data), chunk_size=chunk_size).get("h", 1) == 1
+
+        scanner = JSONObjectScanner(io.BytesIO(data), chunk_size=chunk_size)
+        got = {}
+        for key in scanner.iter_object():
+            if key == "b":
+                got[key] = [scanner.read_value() for _ in scanner.iter_array()]
+            else:
+                got[key] = scanner.read_value()
+
+        assert got == doc
+
+    assert JSONObjectScanner(io.BytesIO(b" { } ")).get("a") is None
+
+    for invalid in [b"[]", b'{"a": [1, 2', b'{"a": "foo', b'{"a" 1}', b"{1: 2}"]:
+        with pytest.raises(ValueError):
+            JSONObjectScanner(io.BytesIO(invalid)).get("b")
+
+
+def test_read_notebook_without_outputs(tmp_path):
+    """
+    Tests for ``otter.utils.read_notebook_without_outputs``.
+    """
+    nb_path = str(tmp_path / "nb.ipynb")
+    nb = nbf.v4.new_notebook(
+        metadata={"kernelspec": {"name": "python3", "display_name": "Python 3"}}
+    )
+    md_cell = nbf.v4.new_markdown_cell("![img](attachment:img.png)")
+    md_cell.attachments = {"img.png": {"image/png": "A" * 1000}}
+    code_cell = nbf.v4.new_code_cell("print(1)", execution_count=3, metadata={"tags": ["foo"]})
+    code_cell.outputs.append(nbf.v4.new_output("stream", text="1\n"))
+    code_cell.outputs.append(nbf.v4.new_output("display_data", data={"image/png": "B" * 1000}))
+    nb.cells.extend([md_cell, code_cell, nbf.v4.new_raw_cell("raw")])
+    nbf.write(nb, nb_path)
+
+    for validate in [True, False]:
+        got = read_notebook_without_outputs(nb_path, validate=validate)
+
+        assert isinstance(got, nbf.NotebookNode)
+        assert got.metadata == nb.metadata
+        assert [c.source for c in got.cells] == [c.source for c in nb.cells]
+        assert [c.id for c in got.cells] == [c.id for c in nb.cells]
+        assert "attachments" not in got.cells[0]
+        assert got.cells[1].outputs == []
+        assert got.cells[1].execution_count is None
+        assert got.cells[1].metadata == {"tags": ["foo"]}
+        nbf.validate(got)
+
+
+def test_clone_file(tmp_path):
+    src = tmp_path / "src.txt"
+    src.write_text("foo")
+    (tmp_path / "dir").mkdir()
+
+    assert clone_file(str(src), str(tmp_path / "dst.txt")) == str(tmp_path / "dst.txt")
+    assert (tmp_path / "dst.txt").read_text() == "foo"
+
+    # the file should be copied into directories
+    assert clone_file(str(src), str(tmp_path / "dir")) == str(tmp_path / "dir" / "src.txt")
+    assert (tmp_path / "dir" / "src.txt").read_text() == "foo"
+
+    # the file should be copied normally if it can't be cloned
+    with mock.patch("fcntl.ioctl", side_effect=OSError):
+        clone_file(str(src), str(tmp_path / "dst2.txt"))
+
+    assert (tmp_path / "dst2.txt").read_text() == "foo"
+
+
+def test_get_cache_dir(tmp_path, monkeypatch):
+    """
+    Tests that ``otter.utils.get_cache_dir`` creates private cache directories and refuses to use
+    directories owned by other users.
+    """
+    monkeypatch.setenv("OTTER_CACHE_DIR", str(tmp_path / "cache"))
+    path = get_cache_dir("foo")
+    assert path == str(tmp_path / "cache" / "foo")
+    for p in [path, os.path.dirname(path)]:
+        assert stat.S_IMODE(os.stat(p).st_mode) == 0o700
+
+    # existing directories have their permissions restricted
+    os.chmod(path, 0o777)
+    assert get_cache_dir("foo") == path
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o700
+
+    with mock.patch("otter.utils.os.getuid", return_value=os.getuid() + 1):
+        with pytest.raises(PermissionError, match="owned by another user"):
+            get_cache_dir("foo")
+
+    # the user's cache directory is used if OTTER_CACHE_DIR isn't set
+    monkeypatch.delenv("OTTER_CACHE_DIR")
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg"))
+    assert get_cache_dir("foo") == str(tmp_path / "xdg" / "otter" / "foo")
+
+
+def test_evict_cache_entries(tmp_path):
+    """
+    Tests that ``otter.utils.evict_cache_entries`` evicts expired and least recently used entries.
+    """
+    now = time.time()
+    paths = []
+    for i in range(4):
+        path = tmp_path / str(i)
+        write_file_atomically(str(path), str(i))
+        os.utime(path, (now - 100 * (4 - i), now - 100 * (4 - i)))
+        paths.append(str(path))
+
+    # an abandoned partial write
+    temp_path = tmp_path / ".tmp-abandoned"
+    temp_path.mkdir()
+    os.utime(temp_path, (now - 1000, now - 1000))
+
+    evict_cache_entries(str(tmp_path), keep=paths[0], max_age=350)
+    assert sorted(os.listdir(tmp_path)) == ["0", "1", "2", "3"]
+
+    evict_cache_entries(str(tmp_path), keep=paths[0], max_age=250)
+    assert sorted(os.listdir(tmp_path)) == ["0", "2", "3"]
+
+    evict_cache_entries(str(tmp_path), max_entries=1)
+    assert os.listdir(tmp_path) == ["3"]
+    assert (tmp_path / "3").read_text() == "3"